@@ -1,33 +1,37 @@
 import functools
-import time
-from flask import Blueprint, request, jsonify
-from .services.ai_router import AIRouter
+import hashlib
+from flask import Blueprint, Response, render_template, request, jsonify
+from . import ratelimit as limits
+from .bulk import BulkError, apply_changes
+from .models import Task
+from .queries import (
+    CHANGES_PAGE, PAGE_SIZE, changes_since, filtered_tasks, has_change_journal, list_version, paginate,
+    parse_fields, project, task_stats, task_to_dict,
+)
+from .scheduler import on_tasks_changed, on_tasks_deleted
+from .services.feed import feed_stats
+from .services.ai_router import AIRouter, fast_path_stats
+from .services.hf_client import backend_name
+from .services.interpret_cache import cache_stats, interpret as cached_interpret
+from .services.notify import delivery_stats
+from .sockets.preview import preview_stats
 from .utils.logging import redact_pii
 
 bp = Blueprint("api", __name__)
 
-
-_rate_limiter = {}
-
-
-def ratelimit(key: str, limit_per_minute=10):
-    now = time.time()
-    window = 60
-    lst = _rate_limiter.get(key, [])
-    lst = [t for t in lst if now - t < window]
-    if len(lst) >= limit_per_minute:
-        return False
-    lst.append(now)
-    _rate_limiter[key] = lst
-    return True
+MAX_PAGE_SIZE = 200
+MAX_CHANGES_PAGE = 5000
 
 
 def require_ai_ratelimit(f):
     @functools.wraps(f)
     def wrapper(*args, **kwargs):
-        key = request.remote_addr or "anon"
-        if not ratelimit(key):
-            return jsonify({"error": "rate_limited"}), 429
+        ok, retry_after = limits.check(request.remote_addr)
+        if not ok:
+            resp = jsonify({"error": "rate_limited", "retry_after": retry_after})
+            resp.status_code = 429
+            resp.headers["Retry-After"] = str(retry_after)
+            return resp
         return f(*args, **kwargs)
 
     return wrapper
@@ -42,17 +46,158 @@ def ai_interpret():
     tz = context.get("now_tz") or "Asia/Kuwait"
     if not utterance:
         return jsonify({"error": "empty_utterance"}), 400
-    router = AIRouter()
-    parsed = router.build_action(utterance, tz=tz, user_id="demo")
+
+    def _compute():
+        router = AIRouter()
+        parsed = router.build_action(utterance, tz=tz, user_id="demo")
+        try:
+            from flask import current_app
+
+            current_app.logger.info({
+                "ai_interpret": {
+                    "utterance": redact_pii(utterance),
+                    "parsed": parsed,
+                    "timings_ms": router.last_timings,
+                }
+            })
+        except Exception:
+            pass
+        return parsed, dict(router.last_timings)
+
+    def _resolve():
+        # never cached: ids move as tasks are renamed and deleted
+        target = AIRouter().resolve_target(utterance, "demo")
+        return target.model_dump() if target else None
+
+    # Identical utterances in the same tz/day bucket share one parse, and
+    # concurrent ones wait on the parse already running
+    entry, source, max_age = cached_interpret(utterance, tz, backend_name(), _compute, _resolve)
+    if request.if_none_match.contains(entry["etag"]):
+        resp = Response(status=304)
+    else:
+        resp = jsonify(entry["parsed"])
+    resp.set_etag(entry["etag"])
+    resp.headers["Cache-Control"] = f"private, max-age={max_age}"
+    resp.headers["X-Cache"] = source.upper()
+    if source == "miss":
+        resp.headers["Server-Timing"] = ", ".join(
+            f"{stage};dur={ms}" for stage, ms in entry["timings"].items()
+        )
+    return resp
+
+
+@bp.get("/tasks")
+def list_tasks():
+    """The index view's filters, sorts and cursor pages as JSON."""
+    args = request.args
+    status_f = args.get("status") or ""
+    priority_f = args.get("priority") or ""
+    q_text = args.get("q") or ""
+    tag_f = (args.get("tag") or "").strip()
+    sort = args.get("sort") or "deadline"
+    cursor = args.get("cursor") or None
+    fields, unknown = parse_fields(args.get("fields"))
+    if unknown:
+        return jsonify({"error": "unknown_fields", "fields": unknown}), 400
+    try:
+        limit = min(max(int(args.get("limit") or PAGE_SIZE), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "bad_limit"}), 400
+
+    # Validate against the table state before running (and serializing) the page
+    key = "|".join([list_version(), status_f, priority_f, q_text, tag_f, sort, cursor or "",
+                    ",".join(fields), str(limit)])
+    etag = hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    else:
+        q, rank = filtered_tasks(status_f, priority_f, q_text, tag_f)
+        items, next_cursor = paginate(project(q, fields), sort, rank=rank, cursor=cursor, limit=limit)
+        body = {"tasks": [task_to_dict(t, fields) for t in items], "next_cursor": next_cursor}
+        if not cursor:
+            # counts (unfiltered) for the stats bar, as on the first index page
+            body["stats"] = task_stats()
+        resp = jsonify(body)
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+
+@bp.get("/tasks/changes")
+def task_changes():
+    """Tasks changed since journal version ``since`` (0 = everything).
+
+    Each entry is ``{"version", "op", "id"}`` plus ``task`` for upserts;
+    send the returned ``version`` as the next ``since``, and again right
+    away while ``more`` is true.
+    """
+    if not has_change_journal():
+        return jsonify({"error": "change_journal_unavailable"}), 501
+    fields, unknown = parse_fields(request.args.get("fields"))
+    if unknown:
+        return jsonify({"error": "unknown_fields", "fields": unknown}), 400
+    try:
+        since = int(request.args.get("since") or 0)
+        limit = min(max(int(request.args.get("limit") or CHANGES_PAGE), 1), MAX_CHANGES_PAGE)
+    except ValueError:
+        return jsonify({"error": "bad_since_or_limit"}), 400
+
+    entries, version, more = changes_since(since, limit)
+    upserts = [task_id for _, task_id, op in entries if op == "upsert"]
+    tasks = {}
+    if upserts:
+        tasks = {t.id: t for t in project(Task.query.filter(Task.id.in_(upserts)), fields)}
+    changes = []
+    for v, task_id, op in entries:
+        if op == "delete":
+            changes.append({"version": v, "op": op, "id": task_id})
+        elif task_id in tasks:
+            # a task deleted since the journal was read has a later tombstone
+            changes.append({"version": v, "op": op, "id": task_id, "task": task_to_dict(tasks[task_id], fields)})
+    return jsonify({"changes": changes, "version": version, "more": more})
+
+
+@bp.post("/tasks/bulk")
+def bulk_tasks():
+    """Apply ``{"changes": [{"id", "op", "fields"}]}`` in one transaction.
+
+    Returns the changed tasks as JSON and, with ``"html": true``, their
+    re-rendered rows keyed by id for swapping in place.
+    """
+    data = request.get_json(silent=True) or {}
+    changes = data.get("changes")
+    if not isinstance(changes, list) or not changes:
+        return jsonify({"error": "no_changes"}), 400
     try:
-        from flask import current_app
-
-        current_app.logger.info({
-            "ai_interpret": {
-                "utterance": redact_pii(utterance),
-                "parsed": parsed,
-            }
-        })
-    except Exception:
-        pass
-    return jsonify(parsed)
+        result = apply_changes(changes)
+    except BulkError as e:
+        return jsonify({"error": "bad_change", "index": e.index, "message": e.message}), 400
+    on_tasks_changed(result.updated)
+    on_tasks_deleted(result.deleted)
+    body = {
+        "tasks": [task_to_dict(t) for t in result.updated],
+        "deleted": result.deleted,
+        "missing": result.missing,
+    }
+    if data.get("html"):
+        body["rows"] = {str(t.id): render_template("tasks/item_row.html", task=t) for t in result.updated}
+    return jsonify(body)
+
+
+@bp.get("/ai/stats")
+def ai_stats():
+    return jsonify({
+        "fast_path": fast_path_stats.snapshot(),
+        "interpret_cache": cache_stats(),
+        "previews": preview_stats(),
+    })
+
+
+@bp.get("/feed/stats")
+def change_feed_stats():
+    return jsonify(feed_stats())
+
+
+@bp.get("/notify/stats")
+def notify_stats():
+    return jsonify(delivery_stats())
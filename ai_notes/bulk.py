@@ -0,0 +1,209 @@
+"""Multi-task changes applied in one transaction.
+
+``apply_changes`` takes ``[{"id", "op", "fields"}]`` and turns them into a
+handful of set-based statements: changes are folded per task, tasks that
+end up with the same column values share one ``UPDATE ... WHERE id IN``,
+deletes are one ``DELETE ... WHERE id IN`` (child rows go by cascade), and
+reminder fire times for moved deadlines are rewritten in one executemany.
+Those statements skip the ORM's before_flush hook, which is why fire times
+are handled here. Tag and alert lists still go through Task.set_tags /
+set_notify_offsets, on tasks loaded in one query, inside the same commit.
+The set-based statements are invisible to the change feed's session hooks,
+so their events are published here after the commit.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Tuple
+from dateutil import tz as dzt
+from sqlalchemy import delete, update
+from .db import db
+from .models import Task, TaskNotification
+from .queries import PRIORITIES, STATUSES, task_to_dict
+from .services.feed import delete_event, publish_local, upsert_event
+from .utils.time import parse_natural_datetime
+
+OPS = ("status", "priority", "deadline", "duration", "edit", "alerts", "tags", "delete")
+MAX_CHANGES = 500
+
+
+class BulkError(ValueError):
+    """A change that cannot be applied; nothing in the batch is written."""
+
+    def __init__(self, index: int, message: str):
+        super().__init__(f"change {index}: {message}")
+        self.index = index
+        self.message = message
+
+
+class BulkResult(NamedTuple):
+    updated: List[Task]
+    deleted: List[int]
+    missing: List[int]
+    statements: int
+
+
+def _deadline(fields: Dict[str, Any], index: int):
+    if "deadline_utc" in fields:
+        raw = fields["deadline_utc"]
+        if not raw:
+            return None
+        try:
+            dt = datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
+        except ValueError:
+            raise BulkError(index, "bad deadline_utc")
+    else:
+        text = (fields.get("deadline_text") or "").strip()
+        if not text:
+            return None
+        try:
+            dt = parse_natural_datetime(text, default_tz=fields.get("tz") or "Asia/Kuwait")
+        except (ValueError, OverflowError):
+            raise BulkError(index, "unparsed deadline_text")
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(dzt.UTC).replace(tzinfo=None)
+    return dt
+
+
+def _column_values(op: str, fields: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """Column assignments for the column-only ops (same rules as routes.py)."""
+    if op == "status":
+        if fields.get("status") not in STATUSES:
+            raise BulkError(index, "bad status")
+        return {"status": fields["status"]}
+    if op == "priority":
+        if fields.get("priority") not in PRIORITIES:
+            raise BulkError(index, "bad priority")
+        return {"priority": fields["priority"]}
+    if op == "deadline":
+        return {"deadline_utc": _deadline(fields, index)}
+    if op == "duration":
+        try:
+            return {"estimated_duration_minutes": int(fields.get("minutes") or 0) or None}
+        except (TypeError, ValueError):
+            raise BulkError(index, "bad minutes")
+    # edit
+    values = {}
+    if "title" in fields:
+        title = str(fields["title"] or "").strip()
+        if not title:
+            raise BulkError(index, "empty title")
+        values["title"] = title[:255]
+    if "description" in fields:
+        values["description"] = str(fields["description"] or "").strip() or None
+    return values
+
+
+def _fold(changes: List[Dict[str, Any]]):
+    """Per task: merged column values, list edits, and whether it is deleted."""
+    columns: Dict[int, Dict[str, Any]] = {}
+    lists: Dict[int, Dict[str, List]] = {}
+    deleted: List[int] = []
+    for i, ch in enumerate(changes):
+        op = ch.get("op") if isinstance(ch, dict) else None
+        if op not in OPS:
+            raise BulkError(i, "unknown op")
+        try:
+            task_id = int(ch.get("id"))
+        except (TypeError, ValueError):
+            raise BulkError(i, "bad id")
+        fields = ch.get("fields") or {}
+        if not isinstance(fields, dict):
+            raise BulkError(i, "fields must be an object")
+        if op == "delete":
+            if task_id not in deleted:
+                deleted.append(task_id)
+        elif op == "alerts":
+            try:
+                mins = [int(m) for m in fields.get("notify_offsets_minutes") or []]
+            except (TypeError, ValueError):
+                raise BulkError(i, "bad notify_offsets_minutes")
+            lists.setdefault(task_id, {})["alerts"] = mins
+        elif op == "tags":
+            tags = fields.get("tags") or []
+            if not isinstance(tags, (list, str)):
+                raise BulkError(i, "bad tags")
+            lists.setdefault(task_id, {})["tags"] = tags
+        else:
+            columns.setdefault(task_id, {}).update(_column_values(op, fields, i))
+    for task_id in deleted:
+        columns.pop(task_id, None)
+        lists.pop(task_id, None)
+    return columns, lists, deleted
+
+
+def _fire_time_rows(deadlines: Dict[int, Any]) -> List[Dict[str, Any]]:
+    """Primary-key rows re-arming reminders whose fire time moved."""
+    rows = []
+    notifications = db.session.query(
+        TaskNotification.task_id, TaskNotification.offset_minutes, TaskNotification.next_fire_at
+    ).filter(TaskNotification.task_id.in_(list(deadlines)))
+    for task_id, offset, fire_at in notifications:
+        deadline = deadlines[task_id]
+        when = deadline - timedelta(minutes=offset) if deadline else None
+        if when != fire_at:
+            rows.append({"task_id": task_id, "offset_minutes": offset, "next_fire_at": when, "sent_at": None})
+    return rows
+
+
+def apply_changes(changes: List[Dict[str, Any]]) -> BulkResult:
+    """Validate then apply every change in one commit; raises BulkError first."""
+    if len(changes) > MAX_CHANGES:
+        raise BulkError(MAX_CHANGES, f"at most {MAX_CHANGES} changes per request")
+    columns, lists, deleted = _fold(changes)
+    wanted = set(columns) | set(lists) | set(deleted)
+    existing = {i for (i,) in db.session.query(Task.id).filter(Task.id.in_(wanted))} if wanted else set()
+    missing = sorted(wanted - existing)
+    deleted = [i for i in deleted if i in existing]
+    now = datetime.utcnow()
+    statements = 0
+
+    # tasks assigned identical values share one UPDATE
+    groups: Dict[Tuple, List[int]] = {}
+    for task_id, values in columns.items():
+        if task_id in existing and values:
+            groups.setdefault(tuple(sorted(values.items())), []).append(task_id)
+    try:
+        for key, ids in groups.items():
+            db.session.execute(
+                update(Task).where(Task.id.in_(ids)).values(**dict(key), updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            statements += 1
+
+        deadlines = {i: v["deadline_utc"] for i, v in columns.items() if i in existing and "deadline_utc" in v}
+        if deadlines:
+            rows = _fire_time_rows(deadlines)
+            statements += 1
+            if rows:
+                db.session.execute(update(TaskNotification), rows)
+                statements += 1
+
+        list_ids = [i for i in lists if i in existing]
+        if list_ids:
+            db.session.expire_all()
+            for t in Task.query.filter(Task.id.in_(list_ids)):
+                edits = lists[t.id]
+                if "tags" in edits:
+                    t.set_tags(edits["tags"])
+                if "alerts" in edits:
+                    t.set_notify_offsets(edits["alerts"])
+            statements += 1
+
+        if deleted:
+            db.session.execute(
+                delete(Task).where(Task.id.in_(deleted)).execution_options(synchronize_session=False)
+            )
+            statements += 1
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    changed = sorted((set(columns) | set(lists)) & existing)
+    updated = Task.query.filter(Task.id.in_(changed)).order_by(Task.id).all() if changed else []
+    # list edits went through the ORM and were published by its hooks
+    events = [
+        upsert_event(t.id, task_to_dict(t, [*columns[t.id], "updated_at"]))
+        for t in updated if columns.get(t.id)
+    ]
+    publish_local(events + [delete_event(i) for i in deleted])
+    return BulkResult(updated, deleted, missing, statements)
@@ -1,23 +1,29 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import text
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 db = SQLAlchemy()
 
 
+@event.listens_for(Engine, "connect")
+def _sqlite_foreign_keys(dbapi_conn, _record):
+    # ON DELETE CASCADE for task_tag / task_notification
+    if type(dbapi_conn).__module__.startswith("sqlite3"):
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA foreign_keys=ON")
+        cur.close()
+
+
 def init_db(app):
+    from .migrations import db_cli, upgrade
+
     db.init_app(app)
+    app.cli.add_command(db_cli)
     with app.app_context():
         from . import models  # noqa: F401
 
-        db.create_all()
-        # Lightweight SQLite migration: add description column if missing
-        try:
-            engine = db.engine
-            with engine.begin() as conn:
-                res = conn.execute(text("PRAGMA table_info(task)"))
-                cols = [r[1] for r in res.fetchall()]
-                if "description" not in cols:
-                    conn.execute(text("ALTER TABLE task ADD COLUMN description TEXT"))
-        except Exception:
-            # Best-effort; ignore if not SQLite or already applied
-            pass
+        # Schema is owned by ai_notes/migrations; when already at head this is
+        # a single version lookup. Set AUTO_MIGRATE=0 to run `flask db upgrade`
+        # as a deploy step instead.
+        if app.config.get("AUTO_MIGRATE", True):
+            upgrade(db.engine, log=app.logger.info)
@@ -0,0 +1,142 @@
+"""Versioned schema migrations.
+
+Each ``vNNNN_<name>.py`` module in this package defines ``VERSION``,
+``DESCRIPTION`` and ``upgrade(conn)``. Applied versions are recorded in
+``schema_version``; ``upgrade()`` runs only the pending ones, each in its
+own transaction. That transaction first takes a database-wide lock
+(``BEGIN IMMEDIATE`` on SQLite, an advisory lock on PostgreSQL) and
+re-reads the version, so workers booting together apply each migration
+once. Migrations are written to be safe on databases created
+before this framework existed (they check for existing tables/columns).
+
+CLI: ``flask --app app.py db upgrade`` / ``db current`` / ``db history``.
+"""
+import importlib
+import pkgutil
+from datetime import datetime
+from types import ModuleType
+from typing import List, Optional
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import inspect, text
+
+
+# Shared helpers for migration modules
+
+def has_table(conn, name: str) -> bool:
+    return inspect(conn).has_table(name)
+
+
+def column_names(conn, table: str) -> set:
+    return {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def index_names(conn, table: str) -> set:
+    return {i["name"] for i in inspect(conn).get_indexes(table)}
+
+
+def _load() -> List[ModuleType]:
+    mods = []
+    for info in pkgutil.iter_modules(__path__):
+        if info.name.startswith("v") and info.name[1:5].isdigit():
+            mods.append(importlib.import_module(f"{__name__}.{info.name}"))
+    mods.sort(key=lambda m: m.VERSION)
+    versions = [m.VERSION for m in mods]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"duplicate migration versions: {versions}")
+    return mods
+
+
+MIGRATIONS = _load()
+HEAD = MIGRATIONS[-1].VERSION if MIGRATIONS else 0
+# pg_advisory_xact_lock key shared by every upgrader
+_LOCK_KEY = 0x61695F6E6F746573
+
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        " version INTEGER PRIMARY KEY, description VARCHAR(255), applied_at TIMESTAMP)"
+    ))
+
+
+def _lock(conn):
+    # Held until the transaction ends; other dialects fall back on the
+    # schema_version primary key rejecting the second insert
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    elif conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": _LOCK_KEY})
+
+
+def _version(conn) -> int:
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar() or 0
+
+
+def current_version(engine) -> int:
+    if not inspect(engine).has_table("schema_version"):
+        return 0
+    with engine.connect() as conn:
+        return _version(conn)
+
+
+def pending(engine) -> List[ModuleType]:
+    cur = current_version(engine)
+    return [m for m in MIGRATIONS if m.VERSION > cur]
+
+
+def upgrade(engine, target: Optional[int] = None, log=None) -> int:
+    """Apply pending migrations up to ``target`` (default: all); returns the new version."""
+    todo = [m for m in pending(engine) if target is None or m.VERSION <= target]
+    if not todo:
+        return current_version(engine)
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+    for mod in todo:
+        with engine.begin() as conn:
+            _lock(conn)
+            if _version(conn) >= mod.VERSION:
+                continue  # another worker got here first
+            mod.upgrade(conn)
+            conn.execute(
+                text("INSERT INTO schema_version (version, description, applied_at) VALUES (:v, :d, :t)"),
+                {"v": mod.VERSION, "d": mod.DESCRIPTION, "t": datetime.utcnow()},
+            )
+        if log:
+            log(f"applied {mod.VERSION:04d} {mod.DESCRIPTION}")
+    return current_version(engine)
+
+
+@click.group("db")
+def db_cli():
+    """Schema migrations."""
+
+
+@db_cli.command("upgrade")
+@click.option("--to", "target", type=int, default=None, help="Stop at this version.")
+@with_appcontext
+def upgrade_cmd(target):
+    from ..db import db
+
+    version = upgrade(db.engine, target=target, log=click.echo)
+    click.echo(f"schema at version {version}")
+
+
+@db_cli.command("current")
+@with_appcontext
+def current_cmd():
+    from ..db import db
+
+    cur = current_version(db.engine)
+    click.echo(f"{cur} (head {HEAD})")
+
+
+@db_cli.command("history")
+@with_appcontext
+def history_cmd():
+    from ..db import db
+
+    cur = current_version(db.engine)
+    for mod in MIGRATIONS:
+        mark = "x" if mod.VERSION <= cur else " "
+        click.echo(f"[{mark}] {mod.VERSION:04d} {mod.DESCRIPTION}")
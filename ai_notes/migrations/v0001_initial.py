@@ -0,0 +1,26 @@
+import sqlalchemy as sa
+from . import column_names, has_table
+
+VERSION = 1
+DESCRIPTION = "task table"
+
+
+def upgrade(conn):
+    if not has_table(conn, "task"):
+        md = sa.MetaData()
+        sa.Table(
+            "task", md,
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("title", sa.String(255), nullable=False),
+            sa.Column("description", sa.Text, nullable=True),
+            sa.Column("status", sa.String(32)),
+            sa.Column("priority", sa.String(16)),
+            sa.Column("estimated_duration_minutes", sa.Integer, nullable=True),
+            sa.Column("deadline_utc", sa.DateTime, nullable=True),
+            sa.Column("created_at", sa.DateTime),
+            sa.Column("updated_at", sa.DateTime),
+        ).create(conn)
+        return
+    # Databases from before migrations got description via an ad-hoc ALTER
+    if "description" not in column_names(conn, "task"):
+        conn.execute(sa.text("ALTER TABLE task ADD COLUMN description TEXT"))
@@ -0,0 +1,17 @@
+import sqlalchemy as sa
+from . import column_names
+
+VERSION = 2
+DESCRIPTION = "task.priority_rank generated column"
+
+RANK_SQL = "CASE priority WHEN 'low' THEN 0 WHEN 'medium' THEN 1 WHEN 'high' THEN 2 WHEN 'urgent' THEN 3 ELSE 1 END"
+
+
+def upgrade(conn):
+    if "priority_rank" in column_names(conn, "task"):
+        return
+    # SQLite can only ADD a VIRTUAL generated column; Postgres only has STORED
+    kind = "VIRTUAL" if conn.dialect.name == "sqlite" else "STORED"
+    conn.execute(sa.text(
+        f"ALTER TABLE task ADD COLUMN priority_rank INTEGER GENERATED ALWAYS AS ({RANK_SQL}) {kind}"
+    ))
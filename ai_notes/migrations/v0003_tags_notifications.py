@@ -0,0 +1,66 @@
+import sqlalchemy as sa
+from . import column_names, has_table
+
+VERSION = 3
+DESCRIPTION = "task_tag / task_notification tables; migrate CSV columns"
+
+BATCH = 500
+
+
+def _split_tags(raw):
+    seen = []
+    for t in (raw or "").split(","):
+        t = t.strip()[:64]
+        if t and t not in seen:
+            seen.append(t)
+    return seen
+
+
+def _split_offsets(raw):
+    mins = set()
+    for x in (raw or "").split(","):
+        try:
+            mins.add(int(x))
+        except ValueError:
+            pass
+    return sorted(mins)
+
+
+def upgrade(conn):
+    md = sa.MetaData()
+    sa.Table("task", md, sa.Column("id", sa.Integer, primary_key=True))
+    if not has_table(conn, "task_tag"):
+        sa.Table(
+            "task_tag", md,
+            sa.Column("task_id", sa.Integer, sa.ForeignKey("task.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("tag", sa.String(64), primary_key=True),
+        ).create(conn)
+    if not has_table(conn, "task_notification"):
+        sa.Table(
+            "task_notification", md,
+            sa.Column("task_id", sa.Integer, sa.ForeignKey("task.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("offset_minutes", sa.Integer, primary_key=True),
+        ).create(conn)
+
+    # Legacy CSV columns: copy in batches and clear them behind us
+    if not {"tags", "notify_offsets_minutes"} <= column_names(conn, "task"):
+        return
+    clear = sa.text(
+        "UPDATE task SET tags = NULL, notify_offsets_minutes = NULL WHERE id IN :ids"
+    ).bindparams(sa.bindparam("ids", expanding=True))
+    while True:
+        rows = conn.execute(sa.text(
+            "SELECT id, tags, notify_offsets_minutes FROM task"
+            " WHERE tags IS NOT NULL OR notify_offsets_minutes IS NOT NULL LIMIT :n"
+        ), {"n": BATCH}).fetchall()
+        if not rows:
+            return
+        tag_rows = [{"task_id": r[0], "tag": t} for r in rows for t in _split_tags(r[1])]
+        notif_rows = [{"task_id": r[0], "offset_minutes": m} for r in rows for m in _split_offsets(r[2])]
+        if tag_rows:
+            conn.execute(sa.text("INSERT INTO task_tag (task_id, tag) VALUES (:task_id, :tag)"), tag_rows)
+        if notif_rows:
+            conn.execute(sa.text(
+                "INSERT INTO task_notification (task_id, offset_minutes) VALUES (:task_id, :offset_minutes)"
+            ), notif_rows)
+        conn.execute(clear, {"ids": [r[0] for r in rows]})
@@ -0,0 +1,19 @@
+import sqlalchemy as sa
+
+VERSION = 4
+DESCRIPTION = "indexes for list sorts, filters and tag lookups"
+
+# (name, table, columns) — keep in sync with __table_args__ in models.py
+INDEXES = [
+    ("ix_task_deadline_id", "task", "deadline_utc, id"),
+    ("ix_task_created_id", "task", "created_at, id"),
+    ("ix_task_title_id", "task", "title, id"),
+    ("ix_task_status", "task", "status"),
+    ("ix_task_status_prank_deadline", "task", "status, priority_rank, deadline_utc"),
+    ("ix_task_tag_tag_task", "task_tag", "tag, task_id"),
+]
+
+
+def upgrade(conn):
+    for name, table, cols in INDEXES:
+        conn.execute(sa.text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({cols})"))
@@ -0,0 +1,72 @@
+import sqlalchemy as sa
+
+VERSION = 5
+DESCRIPTION = "SQLite FTS5 title (trigram) and search (bm25) indexes"
+
+TITLE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_title_fts USING fts5("
+    " title, content='task', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS task_title_fts_ai AFTER INSERT ON task BEGIN"
+    " INSERT INTO task_title_fts(rowid, title) VALUES (new.id, new.title); END",
+    "CREATE TRIGGER IF NOT EXISTS task_title_fts_ad AFTER DELETE ON task BEGIN"
+    " INSERT INTO task_title_fts(task_title_fts, rowid, title) VALUES ('delete', old.id, old.title); END",
+    "CREATE TRIGGER IF NOT EXISTS task_title_fts_au AFTER UPDATE OF title ON task BEGIN"
+    " INSERT INTO task_title_fts(task_title_fts, rowid, title) VALUES ('delete', old.id, old.title);"
+    " INSERT INTO task_title_fts(rowid, title) VALUES (new.id, new.title); END",
+]
+
+# The search table stores its own copy (rowid = task.id) because tags come
+# from task_tag; triggers on both tables keep it current.
+_TAGS_OF = "(SELECT group_concat(tag, ' ') FROM task_tag WHERE task_id = {})"
+SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+    " title, description, tags, tokenize='porter unicode61', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN"
+    " INSERT INTO task_fts(rowid, title, description, tags)"
+    f" VALUES (new.id, new.title, new.description, {_TAGS_OF.format('new.id')}); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN"
+    " DELETE FROM task_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title, description ON task BEGIN"
+    " UPDATE task_fts SET title = new.title, description = new.description WHERE rowid = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_tag_ai AFTER INSERT ON task_tag BEGIN"
+    f" UPDATE task_fts SET tags = {_TAGS_OF.format('new.task_id')} WHERE rowid = new.task_id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_tag_ad AFTER DELETE ON task_tag BEGIN"
+    f" UPDATE task_fts SET tags = {_TAGS_OF.format('old.task_id')} WHERE rowid = old.task_id; END",
+]
+
+
+def _table_sql(conn, name):
+    row = conn.execute(sa.text("SELECT sql FROM sqlite_master WHERE name = :n"), {"n": name}).first()
+    return row[0] if row else None
+
+
+def upgrade(conn):
+    # Other databases use the LIKE fallbacks in ai_notes/search.py
+    if conn.dialect.name != "sqlite":
+        return
+    try:
+        with conn.begin_nested():
+            conn.execute(sa.text("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)"))
+            conn.execute(sa.text("DROP TABLE temp.fts5_probe"))
+    except sa.exc.OperationalError:
+        return  # SQLite built without FTS5
+
+    if _table_sql(conn, "task_title_fts") is None:
+        for stmt in TITLE_DDL:
+            conn.execute(sa.text(stmt))
+        conn.execute(sa.text("INSERT INTO task_title_fts(task_title_fts) VALUES ('rebuild')"))
+
+    sql = _table_sql(conn, "task_fts")
+    if sql and "content='task'" in sql:
+        # pre-task_tag layout mirrored task.tags; rebuild it
+        for trg in ("task_fts_ai", "task_fts_ad", "task_fts_au"):
+            conn.execute(sa.text(f"DROP TRIGGER IF EXISTS {trg}"))
+        conn.execute(sa.text("DROP TABLE task_fts"))
+        sql = None
+    for stmt in SEARCH_DDL:
+        conn.execute(sa.text(stmt))
+    if sql is None:
+        conn.execute(sa.text(
+            "INSERT INTO task_fts(rowid, title, description, tags)"
+            f" SELECT id, title, description, {_TAGS_OF.format('task.id')} FROM task"
+        ))
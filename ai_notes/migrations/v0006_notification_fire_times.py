@@ -0,0 +1,46 @@
+from datetime import timedelta
+import sqlalchemy as sa
+from . import column_names
+
+VERSION = 6
+DESCRIPTION = "task_notification.next_fire_at / sent_at for windowed scheduling"
+
+BATCH = 500
+
+
+def upgrade(conn):
+    cols = column_names(conn, "task_notification")
+    if "next_fire_at" not in cols:
+        conn.execute(sa.text("ALTER TABLE task_notification ADD COLUMN next_fire_at TIMESTAMP"))
+    if "sent_at" not in cols:
+        conn.execute(sa.text("ALTER TABLE task_notification ADD COLUMN sent_at TIMESTAMP"))
+    conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_task_notification_fire ON task_notification (next_fire_at)"
+    ))
+
+    # Backfill deadline - offset; date arithmetic differs per dialect, so do it here
+    tn = sa.table(
+        "task_notification",
+        sa.column("task_id", sa.Integer),
+        sa.column("offset_minutes", sa.Integer),
+        sa.column("next_fire_at", sa.DateTime),
+    )
+    task = sa.table("task", sa.column("id", sa.Integer), sa.column("deadline_utc", sa.DateTime))
+    select = (
+        sa.select(tn.c.task_id, tn.c.offset_minutes, task.c.deadline_utc)
+        .join(task, task.c.id == tn.c.task_id)
+        .where(tn.c.next_fire_at.is_(None), task.c.deadline_utc.is_not(None))
+        .limit(BATCH)
+    )
+    update = (
+        tn.update()
+        .where(tn.c.task_id == sa.bindparam("b_task"), tn.c.offset_minutes == sa.bindparam("b_offset"))
+        .values(next_fire_at=sa.bindparam("b_when"))
+    )
+    while True:
+        rows = conn.execute(select).fetchall()
+        if not rows:
+            return
+        conn.execute(update, [
+            {"b_task": r[0], "b_offset": r[1], "b_when": r[2] - timedelta(minutes=r[1])} for r in rows
+        ])
@@ -0,0 +1,29 @@
+from datetime import datetime
+import sqlalchemy as sa
+from . import has_table
+
+VERSION = 7
+DESCRIPTION = "scheduler_lease for leader-elected notification dispatch"
+
+# Seeded expired so the first worker's UPDATE takes it
+LEASES = ("notify",)
+
+
+def upgrade(conn):
+    lease = sa.table(
+        "scheduler_lease",
+        sa.column("name", sa.String),
+        sa.column("owner", sa.String),
+        sa.column("expires_at", sa.DateTime),
+    )
+    if not has_table(conn, "scheduler_lease"):
+        sa.Table(
+            "scheduler_lease", sa.MetaData(),
+            sa.Column("name", sa.String(64), primary_key=True),
+            sa.Column("owner", sa.String(128), nullable=True),
+            sa.Column("expires_at", sa.DateTime, nullable=False),
+        ).create(conn)
+    existing = {r[0] for r in conn.execute(sa.select(lease.c.name))}
+    for name in LEASES:
+        if name not in existing:
+            conn.execute(lease.insert().values(name=name, owner=None, expires_at=datetime(1970, 1, 1)))
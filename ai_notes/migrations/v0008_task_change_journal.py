@@ -0,0 +1,57 @@
+import sqlalchemy as sa
+from . import has_table, index_names
+
+VERSION = 8
+DESCRIPTION = "task_change journal for delta sync, kept by SQLite triggers"
+
+# One row per task: each change deletes the task's previous entry and
+# appends a new one, so ``version > ?`` yields every task changed since a
+# cursor exactly once. Deletes leave a 'delete' tombstone. AUTOINCREMENT
+# keeps versions from ever being reused; SQLite's single writer commits
+# them in order.
+_TOUCH = (
+    "DELETE FROM task_change WHERE task_id = {id};"
+    " INSERT INTO task_change(task_id, op, changed_at) VALUES ({id}, '{op}', CURRENT_TIMESTAMP);"
+)
+# Tag and reminder rows count as a change to their task, unless the task
+# itself is being deleted (ON DELETE CASCADE), which must stay a tombstone.
+_LIVE = "EXISTS (SELECT 1 FROM task WHERE id = {id})"
+_TOUCH_PARENT = (
+    "DELETE FROM task_change WHERE task_id = {id} AND " + _LIVE + ";"
+    " INSERT INTO task_change(task_id, op, changed_at)"
+    " SELECT {id}, 'upsert', CURRENT_TIMESTAMP WHERE " + _LIVE + ";"
+)
+TRIGGERS = {
+    "task_change_ai": ("AFTER INSERT ON task", _TOUCH.format(id="new.id", op="upsert")),
+    "task_change_au": ("AFTER UPDATE ON task", _TOUCH.format(id="new.id", op="upsert")),
+    "task_change_ad": ("AFTER DELETE ON task", _TOUCH.format(id="old.id", op="delete")),
+    "task_change_tag_ai": ("AFTER INSERT ON task_tag", _TOUCH_PARENT.format(id="new.task_id")),
+    "task_change_tag_ad": ("AFTER DELETE ON task_tag", _TOUCH_PARENT.format(id="old.task_id")),
+    "task_change_notification_ai": ("AFTER INSERT ON task_notification", _TOUCH_PARENT.format(id="new.task_id")),
+    "task_change_notification_ad": ("AFTER DELETE ON task_notification", _TOUCH_PARENT.format(id="old.task_id")),
+}
+
+
+def upgrade(conn):
+    if not has_table(conn, "task_change"):
+        sa.Table(
+            "task_change", sa.MetaData(),
+            sa.Column("version", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("task_id", sa.Integer, nullable=False),
+            sa.Column("op", sa.String(8), nullable=False),
+            sa.Column("changed_at", sa.DateTime, nullable=True),
+            sqlite_autoincrement=True,
+        ).create(conn)
+    if "ix_task_change_task" not in index_names(conn, "task_change"):
+        conn.execute(sa.text("CREATE INDEX ix_task_change_task ON task_change (task_id)"))
+    # Other databases have no journal; /api/tasks/changes reports it unavailable
+    if conn.dialect.name != "sqlite":
+        return
+    for name, (when, body) in TRIGGERS.items():
+        conn.execute(sa.text(f"CREATE TRIGGER IF NOT EXISTS {name} {when} BEGIN {body} END"))
+    # existing tasks are all "changed since 0"
+    conn.execute(sa.text(
+        "INSERT INTO task_change(task_id, op, changed_at)"
+        " SELECT id, 'upsert', CURRENT_TIMESTAMP FROM task"
+        " WHERE id NOT IN (SELECT task_id FROM task_change) ORDER BY id"
+    ))
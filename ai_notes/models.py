@@ -1,31 +1,146 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from .db import db
 
 
+PRIORITY_RANKS = {"low": 0, "medium": 1, "high": 2, "urgent": 3}
+# Ordinal for server-side priority sorting; unknown/NULL sorts as medium
+PRIORITY_RANK_SQL = (
+    "CASE priority "
+    + " ".join(f"WHEN '{k}' THEN {v}" for k, v in PRIORITY_RANKS.items())
+    + " ELSE 1 END"
+)
+
+
 class Task(db.Model):
+    # Schema changes go through ai_notes/migrations; these declarations
+    # mirror what the migrations create.
+    __table_args__ = (
+        # keyset pagination for the list sorts
+        db.Index("ix_task_deadline_id", "deadline_utc", "id"),
+        db.Index("ix_task_created_id", "created_at", "id"),
+        db.Index("ix_task_title_id", "title", "id"),
+        db.Index("ix_task_status", "status"),
+        db.Index("ix_task_status_prank_deadline", "status", "priority_rank", "deadline_utc"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text, nullable=True)
     status = db.Column(db.String(32), default="pending")  # pending|in_progress|done
     priority = db.Column(db.String(16), default="medium")  # low|medium|high|urgent
+    # generated by the database (migrations/v0002); the ORM never writes it.
+    # VIRTUAL as SQLite creates it (STORED on PostgreSQL, which has no other kind)
+    priority_rank = db.Column(db.Integer, db.Computed(PRIORITY_RANK_SQL, persisted=False))
     estimated_duration_minutes = db.Column(db.Integer, nullable=True)
     deadline_utc = db.Column(db.DateTime, nullable=True)
-    notify_offsets_minutes = db.Column(db.String(255), nullable=True)  # CSV list
-    tags = db.Column(db.String(255), nullable=True)  # CSV list of tags
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
+    tag_rows = db.relationship(
+        "TaskTag", cascade="all, delete-orphan", lazy="selectin", order_by="TaskTag.tag"
+    )
+    notification_rows = db.relationship(
+        "TaskNotification", cascade="all, delete-orphan", lazy="selectin",
+        order_by="TaskNotification.offset_minutes",
+    )
+
     def notify_list(self):
-        if not self.notify_offsets_minutes:
-            return []
-        try:
-            return [int(x) for x in self.notify_offsets_minutes.split(",") if x]
-        except Exception:
-            return []
+        return [n.offset_minutes for n in self.notification_rows]
 
     def tag_list(self):
-        if not self.tags:
-            return []
-        return [t.strip() for t in self.tags.split(",") if t.strip()]
+        return [t.tag for t in self.tag_rows]
+
+    def set_notify_offsets(self, offsets):
+        wanted = sorted({int(x) for x in (offsets or [])})
+        if wanted == self.notify_list():
+            return
+        keep = {n.offset_minutes: n for n in self.notification_rows}
+        self.notification_rows = [keep.get(m) or TaskNotification(offset_minutes=m) for m in wanted]
+        self.updated_at = datetime.utcnow()
+
+    def set_tags(self, tags):
+        if isinstance(tags, str):
+            tags = tags.split(",")
+        wanted = []
+        for t in tags or []:
+            t = str(t).strip()[:64]
+            if t and t not in wanted:
+                wanted.append(t)
+        if sorted(wanted) == self.tag_list():
+            return
+        keep = {r.tag: r for r in self.tag_rows}
+        self.tag_rows = [keep.get(t) or TaskTag(tag=t) for t in sorted(wanted)]
+        self.updated_at = datetime.utcnow()
+
+    def sync_fire_times(self):
+        """Recompute ``next_fire_at`` for each reminder from the deadline.
+
+        A reminder whose fire time moves is armed again (``sent_at`` cleared).
+        """
+        for n in self.notification_rows:
+            when = self.deadline_utc - timedelta(minutes=n.offset_minutes) if self.deadline_utc else None
+            if n.next_fire_at != when:
+                n.next_fire_at = when
+                n.sent_at = None
+
+
+class TaskTag(db.Model):
+    __tablename__ = "task_tag"
+    __table_args__ = (
+        # tag filter: WHERE tag = ? -> task ids without touching task
+        db.Index("ix_task_tag_tag_task", "tag", "task_id"),
+    )
+
+    task_id = db.Column(db.Integer, db.ForeignKey("task.id", ondelete="CASCADE"), primary_key=True)
+    tag = db.Column(db.String(64), primary_key=True)
+
+
+class TaskNotification(db.Model):
+    __tablename__ = "task_notification"
+    __table_args__ = (
+        # due-reminder scans: WHERE next_fire_at BETWEEN ? AND ?
+        db.Index("ix_task_notification_fire", "next_fire_at"),
+    )
+
+    task_id = db.Column(db.Integer, db.ForeignKey("task.id", ondelete="CASCADE"), primary_key=True)
+    offset_minutes = db.Column(db.Integer, primary_key=True)
+    # deadline_utc - offset_minutes, kept current by Task.sync_fire_times
+    next_fire_at = db.Column(db.DateTime, nullable=True)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+
+@event.listens_for(Session, "before_flush")
+def _sync_fire_times(session, _ctx, _instances):
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Task):
+            obj.sync_fire_times()
+
+
+class TaskChange(db.Model):
+    """Delta-sync journal; written only by the triggers in migrations/v0008."""
+
+    __tablename__ = "task_change"
+    __table_args__ = (
+        db.Index("ix_task_change_task", "task_id"),
+        {"sqlite_autoincrement": True},
+    )
+
+    version = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    # no FK: tombstones outlive their task
+    task_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(8), nullable=False)  # upsert|delete
+    changed_at = db.Column(db.DateTime, nullable=True)
+
+
+class SchedulerLease(db.Model):
+    """Named lease row; whoever holds an unexpired lease owns that duty."""
+
+    __tablename__ = "scheduler_lease"
+
+    name = db.Column(db.String(64), primary_key=True)
+    owner = db.Column(db.String(128), nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False)
@@ -0,0 +1,302 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import String, and_, cast, false, func, or_, select, text, update
+from sqlalchemy.orm import lazyload
+from .db import db
+from .models import Task, TaskChange, TaskNotification, TaskTag
+from .search import apply_search
+from .utils.time import to_utc_iso
+
+
+STATUSES = ("pending", "in_progress", "done")
+PRIORITIES = ("low", "medium", "high", "urgent")
+SORTS = ("deadline", "created_desc", "title", "priority", "relevance")
+PAGE_SIZE = 30
+
+# JSON representation of a task; the relationship-backed fields are only
+# loaded when asked for
+TASK_FIELDS = (
+    "id", "title", "description", "status", "priority", "priority_rank",
+    "estimated_duration_minutes", "deadline_utc", "created_at", "updated_at",
+    "tags", "notify_offsets_minutes",
+)
+_DATETIME_FIELDS = {"deadline_utc", "created_at", "updated_at"}
+_RELATION_FIELDS = {"tags": Task.tag_rows, "notify_offsets_minutes": Task.notification_rows}
+
+
+def task_stats() -> Dict[str, int]:
+    """Unfiltered counts per status in one grouped query."""
+    rows = db.session.query(Task.status, func.count(Task.id)).group_by(Task.status).all()
+    counts = {s: 0 for s in STATUSES}
+    total = 0
+    for status, n in rows:
+        total += n
+        if status in counts:
+            counts[status] = n
+    counts["total"] = total
+    return counts
+
+
+def filtered_tasks(status: str = "", priority: str = "", q_text: str = "", tag: str = ""):
+    """Task query for the list filters; returns ``(query, rank)`` where rank
+    is the BM25 column when a full-text search is active."""
+    q = Task.query
+    if status in STATUSES:
+        q = q.filter(Task.status == status)
+    if priority in PRIORITIES:
+        q = q.filter(Task.priority == priority)
+    if tag:
+        # served by ix_task_tag_tag_task
+        q = q.filter(Task.id.in_(db.session.query(TaskTag.task_id).filter(TaskTag.tag == tag.strip())))
+    rank = None
+    if q_text:
+        q, rank = apply_search(q, q_text)
+    return q, rank
+
+
+def _enc(v: Any) -> Any:
+    return {"dt": v.isoformat()} if isinstance(v, datetime) else v
+
+
+def _dec(v: Any) -> Any:
+    if isinstance(v, dict) and "dt" in v:
+        return datetime.fromisoformat(v["dt"])
+    return v
+
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps([_enc(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[List[Any]]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or not values:
+            return None
+        return [_dec(v) for v in values]
+    except Exception:
+        return None
+
+
+def _sort_keys(sort: str, rank) -> List[Tuple[Any, bool, bool]]:
+    """Ordered ``(column, descending, nullable)`` keys; always ends with id."""
+    if sort == "relevance" and rank is not None:
+        return [(rank, False, False), (Task.id, False, False)]
+    if sort == "created_desc":
+        return [(Task.created_at, True, False), (Task.id, True, False)]
+    if sort == "title":
+        return [(Task.title, False, False), (Task.id, False, False)]
+    if sort == "priority":
+        # urgent first, then soonest deadline; served by ix_task_status_prank_deadline
+        return [(Task.priority_rank, True, False), (Task.deadline_utc, False, True), (Task.id, False, False)]
+    return [(Task.deadline_utc, False, True), (Task.id, False, False)]
+
+
+def _after(col, desc: bool, nullable: bool, value):
+    if nullable:
+        # NULLS LAST: nothing follows NULL; NULLs follow every value
+        return false() if value is None else or_(col > value, col.is_(None))
+    return col < value if desc else col > value
+
+
+def _equal(col, value):
+    return col.is_(None) if value is None else col == value
+
+
+def paginate(q, sort: str, rank=None, cursor: Optional[str] = None, limit: Optional[int] = None):
+    """Keyset page of ``q`` ordered by ``sort``; returns ``(items, next_cursor)``.
+
+    Seeks past the last row's sort key (ending in id) instead of using
+    OFFSET, so every page costs the same regardless of depth.
+    """
+    limit = limit or PAGE_SIZE
+    keys = _sort_keys(sort, rank)
+    after = decode_cursor(cursor) if cursor else None
+    if after is not None and len(after) == len(keys):
+        branches = []
+        for i, (col, desc, nullable) in enumerate(keys):
+            prefix = [_equal(keys[j][0], after[j]) for j in range(i)]
+            branches.append(and_(*prefix, _after(col, desc, nullable, after[i])))
+        q = q.filter(or_(*branches))
+
+    for col, desc, nullable in keys:
+        if desc:
+            q = q.order_by(col.desc())
+        elif nullable:
+            q = q.order_by(col.asc().nullslast())
+        else:
+            q = q.order_by(col.asc())
+
+    if rank is not None and keys[0][0] is rank:
+        rows = q.add_columns(rank).limit(limit + 1).all()
+        items: List[Task] = [r[0] for r in rows]
+        ranks = [r[1] for r in rows]
+    else:
+        items = q.limit(limit + 1).all()
+        ranks = []
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        values = [
+            ranks[limit - 1] if col is rank else getattr(last, col.key)
+            for col, _, _ in keys
+        ]
+        next_cursor = encode_cursor(values)
+    return items, next_cursor
+
+
+def parse_fields(raw: Optional[str]) -> Tuple[Tuple[str, ...], List[str]]:
+    """``fields=`` projection; returns ``(fields, unknown)``, all fields when empty."""
+    if not raw:
+        return TASK_FIELDS, []
+    wanted = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in TASK_FIELDS]
+    # id always comes along so clients can key rows
+    fields = tuple(f for f in TASK_FIELDS if f == "id" or f in wanted)
+    return fields, unknown
+
+
+def project(q, fields):
+    """Skip the selectin loads for tag/reminder rows the projection leaves out."""
+    skipped = [rel for name, rel in _RELATION_FIELDS.items() if name not in fields]
+    return q.options(*(lazyload(rel) for rel in skipped)) if skipped else q
+
+
+def task_to_dict(t: Task, fields=TASK_FIELDS) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for f in fields:
+        if f == "tags":
+            out[f] = [r.tag for r in t.tag_rows]
+        elif f == "notify_offsets_minutes":
+            out[f] = [n.offset_minutes for n in t.notification_rows]
+        elif f in _DATETIME_FIELDS:
+            v = getattr(t, f)
+            out[f] = to_utc_iso(v) if v else None
+        else:
+            out[f] = getattr(t, f)
+    return out
+
+
+def list_version() -> str:
+    """Changes whenever any task is added, edited or deleted.
+
+    One aggregate over the table: edits bump ``updated_at`` (tag and
+    reminder edits included, see Task.set_tags), inserts raise ``max(id)``
+    and deletes lower the count.
+    """
+    n, last_update, last_id = db.session.query(
+        func.count(Task.id), func.max(Task.updated_at), func.max(Task.id)
+    ).one()
+    return f"{n}-{last_id or 0}-{last_update.isoformat() if last_update else ''}"
+
+
+# tasks/item_row.html reads these columns plus the tag and reminder lists;
+# the lists come back as one aggregated string each
+_ROW_COLUMNS = (
+    Task.id, Task.title, Task.description, Task.status, Task.priority,
+    Task.estimated_duration_minutes, Task.deadline_utc, Task.updated_at,
+)
+_SEP = "\x1f"
+_ROW_LISTS = (
+    select(func.aggregate_strings(TaskTag.tag, _SEP))
+    .where(TaskTag.task_id == Task.id).correlate(Task).scalar_subquery(),
+    select(func.aggregate_strings(cast(TaskNotification.offset_minutes, String), _SEP))
+    .where(TaskNotification.task_id == Task.id).correlate(Task).scalar_subquery(),
+)
+
+
+class TaskRow:
+    """What a task card renders, without an ORM instance behind it."""
+
+    __slots__ = ("id", "title", "description", "status", "priority",
+                 "estimated_duration_minutes", "deadline_utc", "updated_at", "_tags", "_offsets")
+
+    def __init__(self, row):
+        (self.id, self.title, self.description, self.status, self.priority,
+         self.estimated_duration_minutes, self.deadline_utc, self.updated_at, tags, offsets) = row
+        self._tags = sorted(tags.split(_SEP)) if tags else []
+        self._offsets = sorted(int(m) for m in offsets.split(_SEP)) if offsets else []
+
+    def tag_list(self):
+        return self._tags
+
+    def notify_list(self):
+        return self._offsets
+
+
+def load_task_row(task_id: int) -> Optional[TaskRow]:
+    row = db.session.execute(select(*_ROW_COLUMNS, *_ROW_LISTS).where(Task.id == task_id)).first()
+    return TaskRow(row) if row else None
+
+
+def load_task_rows(ids: List[int]) -> Dict[int, TaskRow]:
+    if not ids:
+        return {}
+    rows = db.session.execute(select(*_ROW_COLUMNS, *_ROW_LISTS).where(Task.id.in_(ids)))
+    return {r[0]: TaskRow(r) for r in rows}
+
+
+def update_task_row(task_id: int, **values) -> Optional[TaskRow]:
+    """One ``UPDATE ... RETURNING`` that writes ``values`` (SQL expressions
+    allowed) and hands back the card's columns; None if there is no such task.
+
+    Core statements skip before_flush, so this is only for columns that
+    reminder fire times do not depend on.
+    """
+    row = db.session.execute(
+        update(Task).where(Task.id == task_id)
+        .values(**values, updated_at=datetime.utcnow())
+        .returning(*_ROW_COLUMNS, *_ROW_LISTS)
+        .execution_options(synchronize_session=False)
+    ).first()
+    db.session.commit()
+    if row is None:
+        return None
+    task = TaskRow(row)
+    # the ORM's change-feed hooks never see this statement
+    from .services.feed import publish_local, upsert_event
+
+    publish_local([upsert_event(task.id, task_to_dict(task, [*values, "updated_at"]))])
+    return task
+
+
+CHANGES_PAGE = 500
+_journal_state: Dict[str, bool] = {}
+
+
+def has_change_journal() -> bool:
+    """Whether task_change is kept current (its triggers are SQLite only)."""
+    engine = db.engine
+    key = str(engine.url)
+    if key not in _journal_state:
+        ok = False
+        if engine.dialect.name == "sqlite":
+            with engine.connect() as conn:
+                ok = bool(conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type='trigger' AND name='task_change_au'")
+                ).first())
+        _journal_state[key] = ok
+    return _journal_state[key]
+
+
+def changes_since(since: int, limit: Optional[int] = None) -> Tuple[List[Tuple[int, int, str]], int, bool]:
+    """Tasks changed after journal version ``since``, oldest first.
+
+    Returns ``([(version, task_id, op)], version, more)``; pass ``version``
+    back as the next ``since``. The journal holds one entry per task, so
+    this is one primary-key range scan sized by what changed.
+    """
+    limit = limit or CHANGES_PAGE
+    rows = db.session.execute(
+        select(TaskChange.version, TaskChange.task_id, TaskChange.op)
+        .where(TaskChange.version > since).order_by(TaskChange.version).limit(limit + 1)
+    ).all()
+    more = len(rows) > limit
+    rows = [tuple(r) for r in rows[:limit]]
+    return rows, (rows[-1][0] if rows else since), more
@@ -0,0 +1,136 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+
+# Token buckets: each key holds up to ``burst`` tokens refilled at ``rate``
+# per second; a check refills from the elapsed time and takes ``cost``.
+# allow() returns (allowed, retry_after_seconds).
+
+
+class MemoryLimiter:
+    """Per-process buckets; keys idle longer than ``idle_ttl`` are evicted."""
+
+    def __init__(self, rate: float, burst: float, idle_ttl: float = 600.0, max_keys: int = 100000):
+        self.rate = rate
+        self.burst = burst
+        self.idle_ttl = idle_ttl
+        self.max_keys = max_keys
+        # key -> [tokens, last_seen]; least recently seen first
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key: str, cost: float = 1.0, now: Optional[float] = None) -> Tuple[bool, float]:
+        now = time.time() if now is None else now
+        with self._lock:
+            b = self._buckets.get(key)
+            if b is None:
+                b = self._buckets[key] = [self.burst, now]
+            else:
+                b[0] = min(self.burst, b[0] + (now - b[1]) * self.rate)
+                b[1] = now
+                self._buckets.move_to_end(key)
+            self._evict(now)
+            if b[0] >= cost:
+                b[0] -= cost
+                return True, 0.0
+            return False, (cost - b[0]) / self.rate
+
+    def _evict(self, now: float):
+        # Oldest-first, so this stops at the first live key (amortized O(1))
+        while self._buckets:
+            key, (_, seen) = next(iter(self._buckets.items()))
+            if now - seen <= self.idle_ttl and len(self._buckets) <= self.max_keys:
+                break
+            del self._buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteLimiter:
+    """Buckets in a SQLite file shared by every worker process on the host.
+
+    One UPSERT ... RETURNING per check; a denied check leaves the row as it
+    was, so the refill is still computed from the last granted request.
+    """
+
+    def __init__(self, path: str, rate: float, burst: float, idle_ttl: float = 600.0):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self.idle_ttl = idle_ttl
+        self._local = threading.local()
+        self._checks = 0
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_bucket ("
+            " key TEXT PRIMARY KEY, tokens REAL NOT NULL, ts REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_rate_bucket_ts ON rate_bucket (ts)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def allow(self, key: str, cost: float = 1.0, now: Optional[float] = None) -> Tuple[bool, float]:
+        now = time.time() if now is None else now
+        conn = self._conn()
+        refill = "MIN(:burst, tokens + (:now - ts) * :rate)"
+        row = conn.execute(
+            "INSERT INTO rate_bucket (key, tokens, ts) VALUES (:key, :burst - :cost, :now)"
+            f" ON CONFLICT(key) DO UPDATE SET tokens = {refill} - :cost, ts = :now"
+            f" WHERE {refill} >= :cost"
+            " RETURNING tokens",
+            {"key": key, "burst": self.burst, "rate": self.rate, "cost": cost, "now": now},
+        ).fetchone()
+        self._checks += 1
+        if self._checks % 1000 == 0:
+            conn.execute("DELETE FROM rate_bucket WHERE ts < ?", (now - self.idle_ttl,))
+        if row is not None:
+            return True, 0.0
+        got = conn.execute("SELECT tokens, ts FROM rate_bucket WHERE key = ?", (key,)).fetchone()
+        tokens = min(self.burst, got[0] + (now - got[1]) * self.rate) if got else 0.0
+        return False, (cost - tokens) / self.rate
+
+
+def limiter_from_env():
+    per_minute = float(os.getenv("RATE_LIMIT_PER_MINUTE", "10"))
+    rate = per_minute / 60.0
+    burst = float(os.getenv("RATE_LIMIT_BURST") or per_minute)
+    idle_ttl = float(os.getenv("RATE_LIMIT_IDLE_TTL", "600"))
+    path = os.getenv("RATE_LIMIT_PATH")
+    if path:
+        return SQLiteLimiter(path, rate, burst, idle_ttl)
+    return MemoryLimiter(rate, burst, idle_ttl)
+
+
+_limiter_lock = threading.Lock()
+_limiter = None
+
+
+def _get_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = limiter_from_env()
+    return _limiter
+
+
+def check(key: str, cost: float = 1.0) -> Tuple[bool, int]:
+    """Shared AI-entry-point limiter; returns (allowed, whole seconds to wait)."""
+    lim = _get_limiter()
+    # a cost above the burst could never be granted
+    ok, wait = lim.allow(key or "anon", min(cost, lim.burst))
+    return ok, int(math.ceil(wait))
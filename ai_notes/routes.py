@@ -1,11 +1,26 @@
-from flask import Blueprint, render_template, request, redirect, url_for, Response
+from flask import Blueprint, abort, render_template, request, redirect, url_for, Response
+from sqlalchemy import case
 from .models import Task
 from .db import db
-from .scheduler import on_task_changed
+from .queries import load_task_row, update_task_row
+from .scheduler import on_task_changed, on_task_deleted
 from .utils.time import parse_natural_datetime, to_utc_iso
 
 bp = Blueprint("routes", __name__)
 
+# Status, priority, duration, title and description do not move reminders,
+# so their routes write with one UPDATE ... RETURNING (no load, no reload)
+# and leave the scheduler alone. Deadline and alert edits go through the ORM,
+# whose before_flush hook keeps fire times in step.
+
+
+def _row_response(row):
+    if row is None:
+        abort(404)
+    if request.headers.get("HX-Request"):
+        return render_template("tasks/item_row.html", task=row)
+    return redirect(url_for("index"))
+
 
 @bp.get("/help")
 def help_page():
@@ -28,39 +43,23 @@ def create_task():
 
 @bp.route("/tasks/<int:task_id>/toggle", methods=["GET", "POST"])
 def toggle_task(task_id: int):
-    t = Task.query.get_or_404(task_id)
-    t.status = "done" if t.status != "done" else "pending"
-    db.session.commit()
-    on_task_changed(t)
-    if request.headers.get("HX-Request"):
-        return render_template("tasks/item_row.html", task=t)
-    return redirect(url_for("index"))
+    return _row_response(update_task_row(task_id, status=case((Task.status == "done", "pending"), else_="done")))
 
 
 @bp.post("/tasks/<int:task_id>/status")
 def set_status(task_id: int):
-    t = Task.query.get_or_404(task_id)
     val = (request.form.get("status") or "").strip()
     if val in {"pending", "in_progress", "done"}:
-        t.status = val
-        db.session.commit()
-        on_task_changed(t)
-    if request.headers.get("HX-Request"):
-        return render_template("tasks/item_row.html", task=t)
-    return redirect(url_for("index"))
+        return _row_response(update_task_row(task_id, status=val))
+    return _row_response(load_task_row(task_id))
 
 
 @bp.post("/tasks/<int:task_id>/priority")
 def set_priority(task_id: int):
-    t = Task.query.get_or_404(task_id)
     val = (request.form.get("priority") or "").strip()
     if val in {"low", "medium", "high", "urgent"}:
-        t.priority = val
-        db.session.commit()
-        on_task_changed(t)
-    if request.headers.get("HX-Request"):
-        return render_template("tasks/item_row.html", task=t)
-    return redirect(url_for("index"))
+        return _row_response(update_task_row(task_id, priority=val))
+    return _row_response(load_task_row(task_id))
 
 
 @bp.post("/tasks/<int:task_id>/deadline")
@@ -86,17 +85,11 @@ def set_deadline(task_id: int):
 
 @bp.post("/tasks/<int:task_id>/duration")
 def set_duration(task_id: int):
-    t = Task.query.get_or_404(task_id)
     try:
         val = int(request.form.get("minutes") or 0)
-        t.estimated_duration_minutes = val or None
     except Exception:
-        pass
-    db.session.commit()
-    on_task_changed(t)
-    if request.headers.get("HX-Request"):
-        return render_template("tasks/item_row.html", task=t)
-    return redirect(url_for("index"))
+        return _row_response(load_task_row(task_id))
+    return _row_response(update_task_row(task_id, estimated_duration_minutes=val or None))
 
 
 @bp.post("/tasks/<int:task_id>/alerts")
@@ -111,7 +104,7 @@ def set_alerts(task_id: int):
             n = int(m.group(1))
             unit = (m.group(2) or "m").lower()
             mins.append(n * 60 if unit.startswith("h") else n)
-    t.notify_offsets_minutes = ",".join(str(x) for x in sorted({int(x) for x in mins})) if mins else None
+    t.set_notify_offsets(mins)
     db.session.commit()
     on_task_changed(t)
     if request.headers.get("HX-Request"):
@@ -121,16 +114,12 @@ def set_alerts(task_id: int):
 
 @bp.post("/tasks/<int:task_id>/edit")
 def edit_task(task_id: int):
-    t = Task.query.get_or_404(task_id)
-    title = (request.form.get("title") or t.title).strip()
+    title = (request.form.get("title") or "").strip()
     desc = (request.form.get("description") or "").strip()
-    t.title = title or t.title
-    t.description = desc or None
-    db.session.commit()
-    on_task_changed(t)
-    if request.headers.get("HX-Request"):
-        return render_template("tasks/item_row.html", task=t)
-    return redirect(url_for("index"))
+    values = {"description": desc or None}
+    if title:
+        values["title"] = title
+    return _row_response(update_task_row(task_id, **values))
 
 
 @bp.post("/tasks/<int:task_id>/delete")
@@ -138,6 +127,7 @@ def delete_task(task_id: int):
     t = Task.query.get_or_404(task_id)
     db.session.delete(t)
     db.session.commit()
+    on_task_deleted(task_id)
     if request.headers.get("HX-Request"):
         return Response("", status=200)
     return redirect(url_for("index"))
@@ -148,10 +138,13 @@ def delete_task_delete(task_id: int):
     t = Task.query.get_or_404(task_id)
     db.session.delete(t)
     db.session.commit()
+    on_task_deleted(task_id)
     return Response("", status=204)
 
 
 @bp.route("/tasks/<int:task_id>/row")
 def task_row(task_id: int):
-    t = Task.query.get_or_404(task_id)
-    return render_template("tasks/item_row.html", task=t)
+    row = load_task_row(task_id)
+    if row is None:
+        abort(404)
+    return render_template("tasks/item_row.html", task=row)
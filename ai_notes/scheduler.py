@@ -1,66 +1,307 @@
 import os
 import atexit
+import socket
+import threading
+import uuid
+from apscheduler.jobstores.base import JobLookupError
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.date import DateTrigger
-from datetime import datetime, timedelta
-from flask import current_app
-from .models import Task
+from apscheduler.triggers.interval import IntervalTrigger
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import or_, tuple_
+from .models import SchedulerLease, Task, TaskNotification
 from .db import db
+from .services import notify
 
 
+# Reminders live in task_notification (next_fire_at / sent_at).
+#
+# SCHEDULER_MODE=local (default): APScheduler only holds the ones due within
+# the next window, and a loader job tops the window up as time passes. Job
+# ids are deterministic per (task, offset), so a task edit replaces or
+# removes exactly its own jobs.
+#
+# SCHEDULER_MODE=leader: for multi-worker deployments. Every process polls,
+# but only the holder of the "notify" row in scheduler_lease drains due rows
+# in batches; the rest just write rows. A dead leader's lease expires and
+# the next poller takes over.
+
 _scheduler = None
+_app = None
+_mode = "local"
+_jobs_by_task: Dict[int, Set[str]] = {}
+_index_lock = threading.Lock()
+
+LOADER_JOB_ID = "notify-window-loader"
+LEADER_JOB_ID = "notify-leader-tick"
+LEASE_NAME = "notify"
+OWNER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _window() -> timedelta:
+    return timedelta(minutes=int(os.getenv("NOTIFY_WINDOW_MINUTES", "60")))
+
+
+def _job_id(task_id: int, offset_min: int) -> str:
+    return f"task-{task_id}-notify-{offset_min}"
+
+
+def _poll_seconds() -> float:
+    return float(os.getenv("NOTIFY_POLL_SECONDS", "5"))
+
+
+def _lease_ttl() -> timedelta:
+    return timedelta(seconds=float(os.getenv("NOTIFY_LEASE_SECONDS", "30")))
+
+
+def _dispatch(keys: List[Tuple[int, int]]):
+    """Hand claimed reminders to the delivery pipeline (services/notify.py)."""
+    if not keys:
+        return
+    rows = (
+        db.session.query(
+            TaskNotification.task_id, TaskNotification.offset_minutes,
+            Task.title, Task.deadline_utc, TaskNotification.next_fire_at,
+        )
+        .join(Task, Task.id == TaskNotification.task_id)
+        .filter(tuple_(TaskNotification.task_id, TaskNotification.offset_minutes).in_(keys))
+        .all()
+    )
+    notify.submit(notify.Notification(*r) for r in rows)
 
 
 def _send_notification(task_id: int, offset_min: int):
-    # Placeholder: In real app, integrate with email/push.
-    current_app.logger.info(f"[notify] Task {task_id} offset {offset_min}m")
+    with _index_lock:
+        _jobs_by_task.get(task_id, set()).discard(_job_id(task_id, offset_min))
+    with _app.app_context():
+        # Claim the row first: skips reminders already sent, deleted, or
+        # re-armed, and keeps several local-mode workers from double-sending
+        claimed = db.session.execute(
+            db.update(TaskNotification)
+            .where(
+                TaskNotification.task_id == task_id,
+                TaskNotification.offset_minutes == offset_min,
+                TaskNotification.sent_at.is_(None),
+            )
+            .values(sent_at=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            _dispatch([(task_id, offset_min)])
+        db.session.remove()
+
+
+def _add_job(task_id: int, offset_min: int, when: datetime):
+    job_id = _job_id(task_id, offset_min)
+    _scheduler.add_job(
+        _send_notification,
+        trigger=DateTrigger(run_date=when, timezone="UTC"),
+        args=[task_id, offset_min],
+        id=job_id,
+        name=job_id,
+        replace_existing=True,
+    )
+    with _index_lock:
+        _jobs_by_task.setdefault(task_id, set()).add(job_id)
+
+
+def _remove_task_jobs(task_id: int):
+    with _index_lock:
+        job_ids = _jobs_by_task.pop(task_id, set())
+    for job_id in job_ids:
+        try:
+            _scheduler.remove_job(job_id)
+        except JobLookupError:
+            pass
 
 
 def _schedule_task_notifications(task: Task):
-    global _scheduler
-    if not _scheduler:
+    # leader mode: the row written by this commit is all the leader needs
+    if not _scheduler or _mode != "local":
         return
-    # Remove existing jobs for this task
-    for job in list(_scheduler.get_jobs()):
-        if job.name and job.name.startswith(f"task-{task.id}-"):
-            _scheduler.remove_job(job.id)
+    _remove_task_jobs(task.id)
+    now = datetime.utcnow()
+    horizon = now + _window()
+    for n in task.notification_rows:
+        if n.sent_at is None and n.next_fire_at and now < n.next_fire_at <= horizon:
+            _add_job(task.id, n.offset_minutes, n.next_fire_at)
+
+
+def load_window(now: Optional[datetime] = None) -> int:
+    """Schedule unsent reminders due within the next window; returns how many."""
+    if not _scheduler or _mode != "local":
+        return 0
+    now = now or datetime.utcnow()
+    rows = (
+        db.session.query(TaskNotification.task_id, TaskNotification.offset_minutes, TaskNotification.next_fire_at)
+        .filter(
+            TaskNotification.sent_at.is_(None),
+            TaskNotification.next_fire_at > now,
+            TaskNotification.next_fire_at <= now + _window(),
+        )
+        .all()
+    )
+    for task_id, offset, when in rows:
+        _add_job(task_id, offset, when)
+    return len(rows)
 
-    if not task.deadline_utc:
-        return
-    for offset in task.notify_list():
-        when = task.deadline_utc - timedelta(minutes=offset)
-        if when > datetime.utcnow():
-            _scheduler.add_job(
-                _send_notification,
-                trigger=DateTrigger(run_date=when),
-                args=[task.id, offset],
-                name=f"task-{task.id}-notify-{offset}",
-                replace_existing=True,
-            )
+
+def _load_window_job():
+    with _app.app_context():
+        load_window()
+        db.session.remove()
 
 
 def reschedule_all():
-    from .models import Task
+    return load_window()
+
+
+def acquire_lease(owner: str = OWNER_ID, now: Optional[datetime] = None) -> bool:
+    """Take or renew the dispatch lease; True while ``owner`` is the leader."""
+    now = now or datetime.utcnow()
+    won = db.session.execute(
+        db.update(SchedulerLease)
+        .where(
+            SchedulerLease.name == LEASE_NAME,
+            or_(SchedulerLease.owner == owner, SchedulerLease.expires_at < now),
+        )
+        .values(owner=owner, expires_at=now + _lease_ttl())
+    ).rowcount
+    db.session.commit()
+    return bool(won)
+
+
+def release_lease(owner: str = OWNER_ID):
+    db.session.execute(
+        db.update(SchedulerLease)
+        .where(SchedulerLease.name == LEASE_NAME, SchedulerLease.owner == owner)
+        .values(owner=None, expires_at=datetime(1970, 1, 1))
+    )
+    db.session.commit()
+
+
+def _due_batch(now: datetime, limit: int) -> List[Tuple[int, int]]:
+    # Reminders missed by more than NOTIFY_MAX_LATE_MINUTES are skipped
+    oldest = now - timedelta(minutes=int(os.getenv("NOTIFY_MAX_LATE_MINUTES", "60")))
+    return (
+        db.session.query(TaskNotification.task_id, TaskNotification.offset_minutes)
+        .filter(
+            TaskNotification.sent_at.is_(None),
+            TaskNotification.next_fire_at <= now,
+            TaskNotification.next_fire_at > oldest,
+        )
+        .order_by(TaskNotification.next_fire_at)
+        .limit(limit)
+        .all()
+    )
+
+
+def drain_due(owner: str = OWNER_ID, now: Optional[datetime] = None, batch: Optional[int] = None) -> int:
+    """Leader step: claim and deliver due reminders in batches; returns how many.
+
+    The lease is renewed before every batch, so a leader that stalls past
+    its TTL stops draining instead of racing its successor.
+    """
+    batch = batch or int(os.getenv("NOTIFY_BATCH_SIZE", "200"))
+    sent = 0
+    while True:
+        now_ = now or datetime.utcnow()
+        if not acquire_lease(owner, now_):
+            return sent
+        rows = _due_batch(now_, batch)
+        if not rows:
+            return sent
+        keys = [(r[0], r[1]) for r in rows]
+        # Only rows this UPDATE claimed are ours; another sender may have
+        # marked some of the selected ones in between
+        claimed = db.session.execute(
+            db.update(TaskNotification)
+            .where(
+                tuple_(TaskNotification.task_id, TaskNotification.offset_minutes).in_(keys),
+                TaskNotification.sent_at.is_(None),
+            )
+            .values(sent_at=now_)
+            .returning(TaskNotification.task_id, TaskNotification.offset_minutes)
+        ).all()
+        db.session.commit()
+        if claimed:
+            _dispatch([(r[0], r[1]) for r in claimed])
+        sent += len(claimed)
+        if len(keys) < batch:
+            return sent
 
-    tasks = Task.query.all()
-    for t in tasks:
-        _schedule_task_notifications(t)
+
+def _leader_tick():
+    with _app.app_context():
+        try:
+            drain_due()
+        except Exception:
+            db.session.rollback()
+            _app.logger.exception("[notify] leader tick failed")
+        finally:
+            db.session.remove()
+
+
+def _release_on_exit():
+    with _app.app_context():
+        release_lease()
 
 
 def init_scheduler(app):
-    global _scheduler
+    global _scheduler, _app, _mode
     if _scheduler:
         return
     # Avoid starting scheduler in the reloader parent process
     if app.debug and os.environ.get("WERKZEUG_RUN_MAIN") != "true":
         return
+    _app = app
+    _mode = os.getenv("SCHEDULER_MODE", "local").lower()
     _scheduler = BackgroundScheduler(timezone="UTC")
     _scheduler.start()
     # Shutdown on process exit instead of per-request teardown
     atexit.register(lambda: _scheduler.shutdown(wait=False))
+    if _mode == "leader":
+        atexit.register(_release_on_exit)
+        _scheduler.add_job(
+            _leader_tick,
+            trigger=IntervalTrigger(seconds=_poll_seconds()),
+            id=LEADER_JOB_ID,
+            name=LEADER_JOB_ID,
+            next_run_time=datetime.now(timezone.utc),
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+        )
+        return
+    # Refill at half the window so nothing due slips between two loads
+    _scheduler.add_job(
+        _load_window_job,
+        trigger=IntervalTrigger(seconds=max(_window().total_seconds() / 2, 30)),
+        id=LOADER_JOB_ID,
+        name=LOADER_JOB_ID,
+        replace_existing=True,
+    )
     with app.app_context():
         reschedule_all()
 
 
 def on_task_changed(task: Task):
     _schedule_task_notifications(task)
+
+
+def on_task_deleted(task_id: int):
+    if _scheduler and _mode == "local":
+        _remove_task_jobs(task_id)
+
+
+def on_tasks_changed(tasks: List[Task]):
+    """Batch form of on_task_changed; reminder rows come from the tasks'
+    already loaded notification_rows (one selectin query for the lot)."""
+    for task in tasks:
+        _schedule_task_notifications(task)
+
+
+def on_tasks_deleted(task_ids: List[int]):
+    for task_id in task_ids:
+        on_task_deleted(task_id)
@@ -0,0 +1,153 @@
+import difflib
+import re
+from typing import Dict, List, NamedTuple, Optional
+from sqlalchemy import Float, Integer, text
+from .db import db
+
+
+# FTS5 tables (task_title_fts, task_fts) and their sync triggers are
+# created by migrations/v0005_sqlite_fts.py; without them every lookup
+# here falls back to LIKE.
+
+# BM25 column weights: title, description, tags
+BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+STRONG_MATCH = 0.8
+_WORD = re.compile(r"\w+", re.UNICODE)
+_fts_state: Dict[str, bool] = {}
+
+
+class TitleMatch(NamedTuple):
+    id: int
+    title: str
+    score: float
+
+    @property
+    def strong(self) -> bool:
+        return self.score >= STRONG_MATCH
+
+
+def _has_fts(table: str) -> bool:
+    engine = db.engine
+    key = f"{engine.url}::{table}"
+    if key not in _fts_state:
+        ok = False
+        if engine.dialect.name == "sqlite":
+            with engine.connect() as conn:
+                ok = bool(conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:n"), {"n": table}
+                ).first())
+        _fts_state[key] = ok
+    return _fts_state[key]
+
+
+def _words(s: str) -> List[str]:
+    return [w.lower() for w in _WORD.findall(s or "")]
+
+
+def title_score(query: str, title: str) -> float:
+    """Rank a title against a (possibly partial or misspelled) query in [0, 1.5].
+
+    Substring containment scores highest (the old resolver's rule), then a
+    blend of token overlap and edit-distance similarity.
+    """
+    q, t = (query or "").lower().strip(), (title or "").lower()
+    if not q or not t:
+        return 0.0
+    qw, tw = set(_words(q)), set(_words(t))
+    overlap = len(qw & tw) / len(qw) if qw else 0.0
+    ratio = difflib.SequenceMatcher(None, q, t).ratio()
+    score = 0.6 * overlap + 0.4 * ratio
+    if q in t:
+        score += 0.5
+    return round(score, 4)
+
+
+def _fts_query(query: str, op: str = "OR") -> Optional[str]:
+    # trigram tokens need >= 3 chars
+    words = [w for w in _words(query) if len(w) >= 3]
+    if not words:
+        return None
+    return f" {op} ".join('"' + w.replace('"', '""') + '"' for w in words)
+
+
+def _fts_rows(match: str, pool: int):
+    return db.session.execute(
+        text(
+            "SELECT t.id, t.title FROM task_title_fts f JOIN task t ON t.id = f.rowid"
+            " WHERE task_title_fts MATCH :m ORDER BY f.rank LIMIT :n"
+        ),
+        {"m": match, "n": pool},
+    ).all()
+
+
+def title_candidates(query: str, k: int = 5, pool: int = 20) -> List[TitleMatch]:
+    """Top-k tasks whose titles best match ``query``, best first."""
+    from .models import Task
+
+    query = (query or "").strip()
+    if not query:
+        return []
+    rows = None
+    if _has_fts("task_title_fts") and _fts_query(query):
+        # Every word first (selective); widen to any word for typos/partials
+        rows = _fts_rows(_fts_query(query, "AND"), pool)
+        if len(rows) < k:
+            rows = _fts_rows(_fts_query(query, "OR"), pool)
+    if rows is None:
+        # Portable fallback (non-SQLite or very short queries)
+        rows = (
+            db.session.query(Task.id, Task.title)
+            .filter(Task.title.ilike(f"%{query}%"))
+            .limit(pool)
+            .all()
+        )
+    ranked = sorted(
+        (TitleMatch(r[0], r[1], title_score(query, r[1])) for r in rows),
+        key=lambda m: (-m.score, m.id),
+    )
+    return ranked[:k]
+
+
+def resolve_title(query: str) -> Optional[TitleMatch]:
+    """Best strong match, or None when nothing matches well."""
+    found = title_candidates(query, k=1)
+    if found and found[0].strong:
+        return found[0]
+    return None
+
+
+def search_match(query: str) -> Optional[str]:
+    """FTS5 MATCH expression: every word must match, the last one as a prefix
+    so results update while typing."""
+    words = _words(query)
+    if not words:
+        return None
+    quoted = ['"' + w.replace('"', '""') + '"' for w in words]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def apply_search(q, query: str):
+    """Restrict a Task query to ``query`` matches.
+
+    Returns ``(query, rank)`` where ``rank`` is a BM25 column to order by
+    (lower is better), or None when the LIKE fallback was used.
+    """
+    from .models import Task
+
+    match = search_match(query)
+    if match and _has_fts("task_fts"):
+        w = ", ".join(str(x) for x in BM25_WEIGHTS)
+        hits = (
+            text(f"SELECT rowid AS id, bm25(task_fts, {w}) AS rank FROM task_fts WHERE task_fts MATCH :m")
+            .bindparams(m=match)
+            .columns(id=Integer, rank=Float)
+            .subquery("fts_hits")
+        )
+        return q.join(hits, hits.c.id == Task.id), hits.c.rank
+    from .models import TaskTag
+
+    like = f"%{query}%"
+    tagged = db.session.query(TaskTag.task_id).filter(TaskTag.tag.ilike(like))
+    return q.filter((Task.title.ilike(like)) | (Task.description.ilike(like)) | (Task.id.in_(tagged))), None
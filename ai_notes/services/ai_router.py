@@ -1,11 +1,17 @@
 from __future__ import annotations
+import os
 import re
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from pydantic import BaseModel, Field, ValidationError
 from .hf_client import hf_zero_shot, hf_ner, hf_text2json
+from .rules import PRIORITY_MAP, classify_intent, retargets, scan_utterance
 from ..models import Task
 from ..db import db
-from ..scheduler import on_task_changed
+from ..search import resolve_title, title_candidates
+from ..scheduler import on_task_changed, on_task_deleted
 from ..utils.time import parse_natural_datetime, to_utc_iso
 
 
@@ -32,20 +38,149 @@ class ParsedAction(BaseModel):
     notes: Optional[str] = None
 
 
-PRIORITY_MAP = {
-    "low": "low",
-    "medium": "medium",
-    "normal": "medium",
-    "high": "high",
-    "urgent": "urgent",
-    "asap": "urgent",
-    "today": "high",
-}
-
 INTENT_LABELS = ["create", "update", "delete", "complete", "reopen", "query"]
 
 
+_executor_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # Shared pool for remote HF stages; sized so a few concurrent utterances
+    # can each keep their three calls in flight.
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = int(os.getenv("AI_ROUTER_WORKERS", "12"))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-router")
+    return _executor
+
+
+def _concurrent_default() -> bool:
+    return os.getenv("AI_ROUTER_CONCURRENT", "1").lower() not in {"0", "false", "no", "off"}
+
+
+def _fast_threshold_default() -> float:
+    return float(os.getenv("AI_FAST_PATH_THRESHOLD", "0.85"))
+
+
+class FastPathStats:
+    """How many parses skipped the remote stages, and roughly what that saved.
+
+    The saving of a rule-only parse is estimated from a running average of
+    the remote-stage latency of parses that did go to HF.
+    """
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self.parsed = 0
+        self.fast = 0
+        self.saved_ms = 0.0
+        self._remote_ms: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record_remote(self, remote_ms: float):
+        with self._lock:
+            self.parsed += 1
+            if self._remote_ms is None:
+                self._remote_ms = remote_ms
+            else:
+                self._remote_ms += self.alpha * (remote_ms - self._remote_ms)
+
+    def record_fast(self, fast_ms: float):
+        with self._lock:
+            self.parsed += 1
+            self.fast += 1
+            if self._remote_ms is not None:
+                self.saved_ms += max(0.0, self._remote_ms - fast_ms)
+
+    def record(self, timings: Dict[str, float], concurrent: bool):
+        """Count a finished parse from its timings."""
+        if "fast_path" in timings:
+            self.record_fast(timings["fast_path"])
+        else:
+            self.record_remote(_remote_ms(timings, concurrent))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "parsed": self.parsed,
+                "fast_path": self.fast,
+                "fast_fraction": round(self.fast / self.parsed, 4) if self.parsed else 0.0,
+                "remote_ms_avg": round(self._remote_ms, 2) if self._remote_ms is not None else None,
+                "saved_ms_total": round(self.saved_ms, 2),
+            }
+
+
+fast_path_stats = FastPathStats()
+
+
+def _remote_ms(timings: Dict[str, float], concurrent: bool) -> float:
+    # Latency the remote stages added: the slowest of them when run in parallel
+    stages = [timings[k] for k in ("intent", "ner", "t2t") if k in timings]
+    if not stages:
+        return 0.0
+    return max(stages) if concurrent else sum(stages)
+
+
+class CancelToken:
+    """Stops a build_actions run: remote stages not yet started are cancelled
+    (so they never reach HF) and no further fragments are yielded."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._futures: List[Future] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def track(self, futures):
+        with self._lock:
+            if self._event.is_set():
+                for f in futures:
+                    f.cancel()
+            else:
+                self._futures.extend(futures)
+
+    def cancel(self):
+        with self._lock:
+            self._event.set()
+            futures, self._futures = self._futures, []
+        for f in futures:
+            f.cancel()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """True once cancelled; False if ``timeout`` passed first."""
+        return self._event.wait(timeout)
+
+
+def _timed(timings: Dict[str, float], stage: str, fn: Callable, *args):
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        timings[stage] = round((time.perf_counter() - start) * 1000.0, 2)
+
+
 class AIRouter:
+    def __init__(
+        self,
+        concurrent: Optional[bool] = None,
+        fast_threshold: Optional[float] = None,
+        record_stats: bool = True,
+    ):
+        # concurrent: run zero-shot, NER and text2json in parallel (default from AI_ROUTER_CONCURRENT)
+        self.concurrent = _concurrent_default() if concurrent is None else concurrent
+        # fast_threshold: rule confidence at or above which HF is skipped (AI_FAST_PATH_THRESHOLD)
+        self.fast_threshold = _fast_threshold_default() if fast_threshold is None else fast_threshold
+        # record_stats=False keeps speculative parses (previews) out of fast_path_stats
+        self.record_stats = record_stats
+        # Per-stage wall time in ms for the last build_action call
+        self.last_timings: Dict[str, float] = {}
+
     def infer_intent(self, utterance: str) -> str:
         try:
             label, _ = hf_zero_shot(utterance, INTENT_LABELS)
@@ -68,100 +203,50 @@ class AIRouter:
         m = re.search(r"[\"'“”‘’]([^\"'“”‘’]+)[\"'“”‘’]", utterance)
         title = m.group(1) if m else None
         if title:
-            # fuzzy match titles by simple substring
-            tasks = Task.query.all()
-            best = None
-            for t in tasks:
-                if title.lower() in t.title.lower():
-                    best = t
-                    break
-            if best:
-                return TargetModel(by="id", value=best.id)
+            # Ranked fuzzy match over the title index; only bind to an id when
+            # exactly one candidate is strong, otherwise leave it for clarification
+            strong = [c for c in title_candidates(title, k=2) if c.strong]
+            if len(strong) == 1:
+                return TargetModel(by="id", value=strong[0].id)
             return TargetModel(by="title", value=title)
         return None
 
-    def _extract_duration(self, utterance: str) -> Optional[int]:
-        m = re.search(r"\b(\d+)\s*(min|m|minutes|hour|h|hours)\b", utterance, re.I)
-        if not m:
-            return None
-        n = int(m.group(1))
-        unit = m.group(2).lower()
-        if unit.startswith("h"):
-            return n * 60
-        return n
-
-    def _extract_priority(self, utterance: str) -> Optional[str]:
-        for k, v in PRIORITY_MAP.items():
-            if re.search(rf"\b{k}\b", utterance, re.I):
-                return v
-        return None
-
-    def _extract_notifications(self, utterance: str) -> Optional[List[int]]:
-        mins: List[int] = []
-        # Find first alert-like keyword, accept plural/synonyms
-        kw = re.search(r"\b(alerts?|notif(y|ies|ication|ications)|remind(ers?)?|alarms?)\b", utterance, re.I)
-        if kw:
-            start = kw.start()
-            # Capture all durations after the keyword (supports 'and', ',', '/'), e.g., "alerts 12h and 1h"
-            for m in re.finditer(r"(\d+)\s*(h|hour|hours|m|min|minute)s?", utterance[start:], re.I):
-                n = int(m.group(1))
-                unit = (m.group(2) or "m").lower()
-                mins.append(n * 60 if unit.startswith("h") else n)
-        # pattern B: "12h|30m before|prior"
-        for m in re.finditer(r"(\d+)\s*(h|hour|hours|m|min|minute)s?\s*(before|prior)\b", utterance, re.I):
-            n = int(m.group(1))
-            unit = (m.group(2) or "m").lower()
-            mins.append(n * 60 if unit.startswith("h") else n)
-        if mins:
-            mins = sorted({int(x) for x in mins})
-            return mins
-        return None
-
     def _extract_deadline(self, utterance: str, tz: str) -> Optional[str]:
-        # try dateutil first; rely on words like tomorrow, Friday 9:30
+        # relative-date rules first (tomorrow, Friday 9:30), dateutil for the rest
         try:
             dt = parse_natural_datetime(utterance, default_tz=tz)
             return to_utc_iso(dt)
         except Exception:
             return None
 
-    def extract_fields(self, utterance: str, tz: str) -> Dict[str, Any]:
+    def _ner_entities(self, utterance: str) -> List[Dict[str, Any]]:
+        try:
+            return hf_ner(utterance) or []
+        except Exception:
+            return []
+
+    def extract_fields(self, utterance: str, tz: str, entities: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         fields: Dict[str, Any] = {}
-        # Rules first
-        dur = self._extract_duration(utterance)
-        if dur is not None:
-            fields["estimated_duration_minutes"] = dur
-        pr = self._extract_priority(utterance)
-        if pr is not None:
-            fields["priority"] = pr
-        # status
-        if re.search(r"\b(in\s*progress|ongoing)\b", utterance, re.I):
-            fields["status"] = "in_progress"
-        nt = self._extract_notifications(utterance)
-        if nt is not None:
-            fields["notify_offsets_minutes"] = nt
+        # Rules first: one scan yields every rule-derived field
+        rules = scan_utterance(utterance)
+        if rules.duration is not None:
+            fields["estimated_duration_minutes"] = rules.duration
+        if rules.priority is not None:
+            fields["priority"] = rules.priority
+        if rules.status is not None:
+            fields["status"] = rules.status
+        if rules.alerts:
+            fields["notify_offsets_minutes"] = list(rules.alerts)
         # Ambiguity guard: if the text contains 'maybe' or 'or' between days, skip setting a deadline
-        if not re.search(r"\bmaybe\b|\b(mon|tue|wed|thu|fri|sat|sun)\b\s*or\s*\b(mon|tue|wed|thu|fri|sat|sun)\b", utterance, re.I):
-            # handle 'before Sunday' as end-of-day Sunday
-            m = re.search(r"before\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b", utterance, re.I)
-            if m:
-                try:
-                    dow = m.group(1)
-                    from dateutil import tz as dzt
-                    local_dt = parse_natural_datetime(dow, default_tz=tz)
-                    # set to 23:59 local
-                    local_dt = local_dt.replace(hour=23, minute=59, second=0, microsecond=0)
-                    fields["deadline_utc"] = to_utc_iso(local_dt)
-                except Exception:
-                    pass
-            else:
-                dl = self._extract_deadline(utterance, tz)
-                if dl is not None:
-                    fields["deadline_utc"] = dl
+        if not rules.ambiguous_day:
+            # one parse; 'before Sunday' resolves to end-of-day Sunday there
+            dl = self._extract_deadline(utterance, tz)
+            if dl is not None:
+                fields["deadline_utc"] = dl
 
         # NER assist: find tags from ORG/MISC; also derive description from leftovers
         try:
-            ents = hf_ner(utterance)
+            ents = entities if entities is not None else self._ner_entities(utterance)
             tags = sorted({e.get("entity_group") for e in ents if e.get("entity_group") in {"ORG", "MISC"}})
             if tags:
                 fields["tags"] = tags
@@ -169,16 +254,8 @@ class AIRouter:
             pass
 
         # Lightweight description: remaining text after removing time/duration/notify keywords
-        try:
-            rem = utterance
-            rem = re.sub(r"\b(alerts?|notify|remind|alarm)s?\b[\s\S]*$", "", rem, flags=re.I)
-            rem = re.sub(r"\b(\d+)\s*(h|hour|hours|m|min|minute)s?(\s*(before|prior))?\b", "", rem, flags=re.I)
-            rem = re.sub(r"\b(tomorrow|today|tonight|this\s+afternoon|this\s+evening|next\s+\w+|monday|tuesday|wednesday|thursday|friday|saturday|sunday|\d{1,2}:\d{2}|\d{1,2}\s*(am|pm))\b", "", rem, flags=re.I)
-            rem = re.sub(r"\s+", " ", rem).strip(" .,-")
-            if rem and len(rem) > 0:
-                fields.setdefault("description", rem)
-        except Exception:
-            pass
+        if rules.description:
+            fields.setdefault("description", rules.description)
 
         return fields
 
@@ -191,19 +268,126 @@ class AIRouter:
         user = f'USER: "{utterance}"\n'
         return hf_text2json(sys + user) or {}
 
-    def build_action(self, utterance: str, tz: str, user_id: str, default_title: Optional[str] = None) -> Dict[str, Any]:
-        intent = self.infer_intent(utterance)
-        target = self.resolve_target(utterance, user_id)
-        fields = self.extract_fields(utterance, tz)
-
-        # If poor signal, ask T2T to help
-        t2t = {}
+    def _safe_t2t(self, utterance: str, tz: str) -> Dict[str, Any]:
         try:
-            if not fields or intent in {"create", "update"}:
-                t2t = self._t2t_schema(utterance, tz)
+            return self._t2t_schema(utterance, tz)
         except Exception:
-            t2t = {}
+            return {}
 
+    def _gather(self, utterance: str, tz: str, user_id: str, timings: Dict[str, float]):
+        """Sequential pipeline: each remote call waits for the previous one."""
+        intent = _timed(timings, "intent", self.infer_intent, utterance)
+        target = _timed(timings, "target", self.resolve_target, utterance, user_id)
+        ents = _timed(timings, "ner", self._ner_entities, utterance)
+        fields = _timed(timings, "rules", self.extract_fields, utterance, tz, ents)
+
+        # If poor signal, ask T2T to help
+        t2t: Dict[str, Any] = {}
+        if not fields or intent in {"create", "update"}:
+            t2t = _timed(timings, "t2t", self._safe_t2t, utterance, tz)
+        return intent, target, fields, t2t
+
+    def _submit_remote(self, utterance: str, tz: str, timings: Dict[str, float]):
+        """Launch the remote stages on the shared pool.
+
+        text2json has to start before the HF intent is known to overlap with
+        it, so it is launched only when the rule intent (leading verb) is
+        create, update or unknown. A confident delete/complete/reopen/query
+        saves the call; if HF then disagrees and wants text2json,
+        _finish_remote runs it late, after the other stages.
+        """
+        pool = _get_executor()
+        futures = [
+            pool.submit(_timed, timings, "intent", self.infer_intent, utterance),
+            pool.submit(_timed, timings, "ner", self._ner_entities, utterance),
+        ]
+        if classify_intent(utterance)[0] in (None, "create", "update"):
+            futures.append(pool.submit(_timed, timings, "t2t", self._safe_t2t, utterance, tz))
+        return tuple(futures)
+
+    def _finish_remote(self, utterance: str, tz: str, futures, timings: Dict[str, float]):
+        f_intent, f_ner, *f_t2t = futures
+        fields = _timed(timings, "rules", self.extract_fields, utterance, tz, f_ner.result())
+        intent = f_intent.result()
+        # Same condition as the sequential path
+        t2t: Dict[str, Any] = {}
+        if not fields or intent in {"create", "update"}:
+            if f_t2t:
+                t2t = f_t2t[0].result()
+            else:
+                t2t = _timed(timings, "t2t", self._safe_t2t, utterance, tz)
+        return intent, fields, t2t
+
+    def _gather_concurrent(self, utterance: str, tz: str, user_id: str, timings: Dict[str, float]):
+        """Fan the three remote calls out at once; total latency ~ the slowest one.
+
+        DB lookups stay on the calling thread (they need the app context).
+        """
+        futures = self._submit_remote(utterance, tz, timings)
+        target = _timed(timings, "target", self.resolve_target, utterance, user_id)
+        intent, fields, t2t = self._finish_remote(utterance, tz, futures, timings)
+        return intent, target, fields, t2t
+
+    def _rule_confidence(
+        self,
+        utterance: str,
+        intent: str,
+        score: float,
+        target: Optional[TargetModel],
+        fields: Dict[str, Any],
+        default_title: Optional[str],
+    ) -> float:
+        # Halve the intent confidence for each thing only the remote stages
+        # could still supply: a title for creates, a target, something to update
+        if intent == "create" and not (target or default_title):
+            score *= 0.5
+        # a create naming an existing task, or aimed at one ("add 'x' to high"), is an edit
+        if intent == "create" and ((target and target.by == "id") or retargets(utterance)):
+            return 0.0
+        if intent in {"update", "delete", "complete", "reopen"} and not target:
+            score *= 0.5
+        if intent == "update" and not set(fields) - {"description"}:
+            score *= 0.5
+        return score
+
+    def _fast_path(
+        self,
+        utterance: str,
+        tz: str,
+        user_id: str,
+        default_title: Optional[str],
+        timings: Dict[str, float],
+    ) -> Optional[Dict[str, Any]]:
+        """Rules-only parse, or None when the rules are not confident enough to skip HF."""
+        start = time.perf_counter()
+        intent, score = classify_intent(utterance)
+        # never delete without HF: "remove the alert from 'x'" starts like a delete
+        if intent is None or intent == "delete" or score < self.fast_threshold:
+            return None
+        target = _timed(timings, "target", self.resolve_target, utterance, user_id)
+        # no NER: tags only come from the remote path
+        fields = _timed(timings, "rules", self.extract_fields, utterance, tz, [])
+        score = self._rule_confidence(utterance, intent, score, target, fields, default_title)
+        if score < self.fast_threshold:
+            return None
+        parsed = self._assemble(
+            intent, target, fields, {}, default_title,
+            notes=f"Rule-only parse (confidence {score:.2f}); times normalized to UTC",
+        )
+        timings["fast_path"] = round((time.perf_counter() - start) * 1000.0, 2)
+        if self.record_stats:
+            fast_path_stats.record_fast(timings["fast_path"])
+        return parsed
+
+    def _assemble(
+        self,
+        intent: str,
+        target: Optional[TargetModel],
+        fields: Dict[str, Any],
+        t2t: Dict[str, Any],
+        default_title: Optional[str],
+        notes: str = "Rule-first parse with HF assist; times normalized to UTC",
+    ) -> Dict[str, Any]:
         # Merge fields (rules override t2t on conflict)
         if t2t.get("fields"):
             for k, v in t2t["fields"].items():
@@ -229,17 +413,101 @@ class AIRouter:
                 operation=intent,
                 target=target,
                 fields=FieldsModel(**fields),
-                notes=(
-                    "Rule-first parse with HF assist; times normalized to UTC"
-                ),
+                notes=notes,
             )
         except ValidationError as e:
             model = ParsedAction(operation=intent, fields=FieldsModel(), notes=f"validation_error: {e}")
 
         return model.model_dump(exclude_none=False)
 
+    def build_action(self, utterance: str, tz: str, user_id: str, default_title: Optional[str] = None) -> Dict[str, Any]:
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+        parsed = self._fast_path(utterance, tz, user_id, default_title, timings)
+        if parsed is None:
+            gather = self._gather_concurrent if self.concurrent else self._gather
+            intent, target, fields, t2t = gather(utterance, tz, user_id, timings)
+            parsed = self._assemble(intent, target, fields, t2t, default_title)
+            if self.record_stats:
+                fast_path_stats.record_remote(_remote_ms(timings, self.concurrent))
+        timings["total"] = round((time.perf_counter() - start) * 1000.0, 2)
+        self.last_timings = timings
+        return parsed
+
+    def build_actions(
+        self,
+        fragments: List[str],
+        tz: str,
+        user_id: str = "demo",
+        default_titles: Optional[List[Optional[str]]] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Parse many fragments at once, yielding ``(index, parsed)`` as each completes.
+
+        All remote stages for all fragments go onto the shared bounded pool up
+        front, so a 10-item utterance costs roughly one round-trip instead of 30.
+        Results arrive in completion order; ``last_timings`` holds the timings of
+        the fragment just yielded. Cancelling ``cancel`` ends the run early.
+        """
+        default_titles = default_titles or [None] * len(fragments)
+        if not self.concurrent:
+            for i, frag in enumerate(fragments):
+                if cancel is not None and cancel.cancelled:
+                    return
+                yield i, self.build_action(frag, tz=tz, user_id=user_id, default_title=default_titles[i])
+            return
+
+        start = time.perf_counter()
+        owner: Dict[Future, int] = {}
+        pending: Dict[int, Tuple[Any, Dict[str, float]]] = {}
+        remaining: Dict[int, int] = {}
+        ready: List[Tuple[int, Dict[str, Any], Dict[str, float]]] = []
+        for i, frag in enumerate(fragments):
+            timings: Dict[str, float] = {}
+            parsed = self._fast_path(frag, tz, user_id, default_titles[i], timings)
+            if parsed is not None:
+                ready.append((i, parsed, timings))
+                continue
+            if cancel is not None and cancel.cancelled:
+                return
+            futures = self._submit_remote(frag, tz, timings)
+            if cancel is not None:
+                cancel.track(futures)
+            for f in futures:
+                owner[f] = i
+            pending[i] = (futures, timings)
+            remaining[i] = len(futures)
+
+        # Rule-only fragments are done already; the remote ones follow as they land
+        for i, parsed, timings in ready:
+            if cancel is not None and cancel.cancelled:
+                return
+            timings["total"] = round((time.perf_counter() - start) * 1000.0, 2)
+            self.last_timings = timings
+            yield i, parsed
+
+        for f in as_completed(owner):
+            if cancel is not None and cancel.cancelled:
+                return
+            i = owner[f]
+            remaining[i] -= 1
+            if remaining[i]:
+                continue
+            futures, timings = pending.pop(i)
+            frag = fragments[i]
+            target = _timed(timings, "target", self.resolve_target, frag, user_id)
+            intent, fields, t2t = self._finish_remote(frag, tz, futures, timings)
+            parsed = self._assemble(intent, target, fields, t2t, default_titles[i])
+            if self.record_stats:
+                fast_path_stats.record_remote(_remote_ms(timings, True))
+            timings["total"] = round((time.perf_counter() - start) * 1000.0, 2)
+            self.last_timings = timings
+            yield i, parsed
+
     # Apply to DB helpers (used by WebSocket flow)
-    def apply_action(self, action: Dict[str, Any]) -> Task:
+    def apply_action(self, action: Dict[str, Any], commit: bool = True) -> Task:
+        """Apply one parsed action; with ``commit=False`` only flush and leave
+        committing and rescheduling to the caller (see ``apply_actions``)."""
         op = action.get("operation")
         target = action.get("target") or {}
         fields = action.get("fields") or {}
@@ -258,9 +526,9 @@ class AIRouter:
                 except Exception:
                     t.deadline_utc = None
             if "notify_offsets_minutes" in fields and fields["notify_offsets_minutes"] is not None:
-                t.notify_offsets_minutes = ",".join(str(x) for x in fields["notify_offsets_minutes"])
+                t.set_notify_offsets(fields["notify_offsets_minutes"])
             if "tags" in fields and fields["tags"] is not None:
-                t.tags = ",".join(fields["tags"]) if isinstance(fields["tags"], list) else str(fields["tags"])
+                t.set_tags(fields["tags"] if isinstance(fields["tags"], list) else str(fields["tags"]))
             if "status" in fields and fields["status"]:
                 t.status = fields["status"]
             if "description" in fields and fields["description"]:
@@ -276,6 +544,9 @@ class AIRouter:
             db.session.add(t)
             db.session.flush()
             _apply_fields(t)
+            if not commit:
+                db.session.flush()
+                return t
             db.session.commit()
             on_task_changed(t)
             return t
@@ -285,12 +556,12 @@ class AIRouter:
             if target.get("by") == "id":
                 t = Task.query.get(target.get("value"))
             elif target.get("by") == "title" and target.get("value"):
-                v = str(target.get("value")).lower()
-                t = Task.query.filter(Task.title.ilike(f"%{v}%")).first()
+                match = resolve_title(str(target.get("value")))
+                t = db.session.get(Task, match.id) if match else None
             if not t:
                 # fall back to create on updates when no target
                 if op in {"update"}:
-                    return self.apply_action({"operation": "create", "target": target, "fields": fields})
+                    return self.apply_action({"operation": "create", "target": target, "fields": fields}, commit=commit)
                 # else create a basic task to proceed
                 t = Task(title=str((target or {}).get("value") or "Task"))
                 db.session.add(t)
@@ -304,9 +575,37 @@ class AIRouter:
                 t.status = "pending"
             elif op == "delete":
                 db.session.delete(t)
-                db.session.commit()
+                if commit:
+                    db.session.commit()
+                    on_task_deleted(t.id)
+                else:
+                    db.session.flush()
                 return t
 
+            if not commit:
+                db.session.flush()
+                return t
             db.session.commit()
             on_task_changed(t)
             return t
+
+    def apply_actions(self, actions: List[Dict[str, Any]]) -> List[Task]:
+        """Apply a batch of parsed actions in a single transaction.
+
+        Either every action lands or none does; notifications are rescheduled
+        once after the commit.
+        """
+        tasks: List[Task] = []
+        try:
+            for action in actions:
+                tasks.append(self.apply_action(action, commit=False))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        for action, t in zip(actions, tasks):
+            if action.get("operation") == "delete":
+                on_task_deleted(t.id)
+            else:
+                on_task_changed(t)
+        return tasks
@@ -0,0 +1,288 @@
+"""Task change feed: every committed insert/update/delete fanned out to
+subscribed sockets (``/ws/feed``).
+
+ORM writes are picked up from the session: ``after_flush`` records which
+tasks changed and the new values of the changed fields, ``after_commit``
+publishes them and ``after_rollback`` drops them. Core statements that
+bypass the unit of work (bulk.py, queries.update_task_row) publish their
+own events once committed.
+
+With ``FEED_SOURCE=local`` (the default) the hub only hears this
+process's commits, so under several workers a client misses changes
+written by the others. ``FEED_SOURCE=journal`` publishes from the
+task_change journal instead (migrations/v0008, SQLite): each process
+polls it every ``FEED_POLL_MS`` and its own commits are not published
+directly, so every client sees every worker's changes once.
+
+Publishing never blocks on a client. Each subscriber keeps at most one
+pending event per task, so a burst of edits to one task coalesces into
+the latest state, and a subscriber that falls more than ``max_pending``
+tasks behind is told to ``resync`` (reload) instead of buffering more.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from ..db import db
+from ..models import Task, TaskChange
+from ..queries import TASK_FIELDS, changes_since, has_change_journal, project, task_to_dict
+
+# priority_rank is generated by the database and unknown until reloaded
+_FEED_FIELDS = tuple(f for f in TASK_FIELDS if f not in ("id", "priority_rank"))
+_ATTRS = {"tags": "tag_rows", "notify_offsets_minutes": "notification_rows"}
+
+
+class Subscriber:
+    """One client's pending events, coalesced per task id."""
+
+    def __init__(self, max_pending: int, wake: Optional[Callable[[], None]] = None):
+        self.max_pending = max_pending
+        self.wake = wake
+        self._cond = threading.Condition()
+        self._pending: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._resync = False
+
+    def offer(self, ev: Dict[str, Any]) -> str:
+        """Queue ``ev``; returns "queued", "merged", "dropped" or "resync"."""
+        with self._cond:
+            if self._resync:
+                return "dropped"
+            cur = self._pending.get(ev["id"])
+            if cur is not None and cur["op"] == "upsert" and ev["op"] == "upsert":
+                cur["fields"].update(ev["fields"])
+                cur["version"] = ev["version"]
+                outcome = "merged"
+            else:
+                self._pending[ev["id"]] = {**ev, "fields": dict(ev.get("fields") or {})}
+                outcome = "merged" if cur is not None else "queued"
+            if len(self._pending) > self.max_pending:
+                self._pending.clear()
+                self._resync = True
+                outcome = "resync"
+            self._cond.notify()
+        if self.wake:
+            self.wake()
+        return outcome
+
+    def next_message(self, timeout: Optional[float] = None, linger: float = 0.0) -> Optional[Dict[str, Any]]:
+        """Wait for pending events and take them all as one socket message.
+
+        ``linger`` keeps collecting for that long after the first event so a
+        burst goes out as one message.
+        """
+        with self._cond:
+            if not self._pending and not self._resync:
+                self._cond.wait(timeout)
+            if linger and (self._pending or self._resync):
+                self._cond.release()
+                try:
+                    time.sleep(linger)
+                finally:
+                    self._cond.acquire()
+            if self._resync:
+                self._resync = False
+                return {"phase": "resync"}
+            if not self._pending:
+                return None
+            events = list(self._pending.values())
+            self._pending.clear()
+        return {"phase": "changes", "events": events}
+
+
+class ChangeHub:
+    def __init__(self, max_pending: int = 1000):
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._subscribers: List[Subscriber] = []
+        self._version = 0
+        self._counts = {"published": 0, "merged": 0, "dropped": 0, "resync": 0}
+
+    def subscribe(self, wake: Optional[Callable[[], None]] = None) -> Subscriber:
+        sub = Subscriber(self.max_pending, wake)
+        with self._lock:
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def publish(self, events: Iterable[Dict[str, Any]]):
+        with self._lock:
+            subs = list(self._subscribers)
+            stamped = []
+            for ev in events:
+                self._version += 1
+                stamped.append({**ev, "version": self._version})
+            self._counts["published"] += len(stamped)
+        outcomes = [sub.offer(ev) for sub in subs for ev in stamped]
+        with self._lock:
+            for outcome in outcomes:
+                if outcome != "queued":
+                    self._counts[outcome] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counts, "subscribers": len(self._subscribers), "version": self._version}
+
+
+_hub_lock = threading.Lock()
+_hub: Optional[ChangeHub] = None
+
+
+def get_hub() -> ChangeHub:
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = ChangeHub(max_pending=int(os.getenv("FEED_MAX_PENDING", "1000")))
+    return _hub
+
+
+_source = "local"
+_poller: Optional["JournalPoller"] = None
+
+
+class JournalPoller:
+    """Publishes task_change journal entries, whichever process wrote them."""
+
+    def __init__(self, app, hub: ChangeHub, interval: float):
+        self.app = app
+        self.hub = hub
+        self.interval = interval
+        self.cursor = 0
+        self._stop = threading.Event()
+
+    def start(self):
+        # Only changes from now on; earlier ones are in the page already
+        with self.app.app_context():
+            self.cursor = db.session.query(db.func.max(TaskChange.version)).scalar() or 0
+            db.session.remove()
+        threading.Thread(target=self._loop, name="feed-journal", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def poll(self) -> int:
+        """Publish everything journaled since the last poll; returns how many events."""
+        events: List[Dict[str, Any]] = []
+        with self.app.app_context():
+            try:
+                more = True
+                while more:
+                    entries, self.cursor, more = changes_since(self.cursor)
+                    events.extend(self._events(entries))
+            finally:
+                db.session.remove()
+        if events:
+            self.hub.publish(events)
+        return len(events)
+
+    def _events(self, entries) -> List[Dict[str, Any]]:
+        upserts = [task_id for _, task_id, op in entries if op == "upsert"]
+        fields = list(_FEED_FIELDS)
+        tasks = {t.id: t for t in project(Task.query.filter(Task.id.in_(upserts)), fields)} if upserts else {}
+        events = []
+        for _, task_id, op in entries:
+            if op == "delete":
+                events.append(delete_event(task_id))
+            elif task_id in tasks:
+                # a task gone since it was journaled has a delete entry further on
+                events.append(upsert_event(task_id, task_to_dict(tasks[task_id], fields)))
+        return events
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                self.app.logger.exception("[feed] journal poll failed")
+
+
+def init_feed(app):
+    """Pick the feed source (FEED_SOURCE) and start the journal poller if it is used."""
+    global _source, _poller
+    if _poller is not None:
+        return
+    if app.debug and os.environ.get("WERKZEUG_RUN_MAIN") != "true":
+        return
+    if os.getenv("FEED_SOURCE", "local").lower() != "journal":
+        return
+    with app.app_context():
+        journal = has_change_journal()
+    if not journal:
+        app.logger.warning("[feed] FEED_SOURCE=journal needs the task_change journal; using local")
+        return
+    _source = "journal"
+    _poller = JournalPoller(app, get_hub(), float(os.getenv("FEED_POLL_MS", "250")) / 1000.0)
+    _poller.start()
+
+
+def publish_local(events: List[Dict[str, Any]]):
+    """Publish this process's committed changes (the journal poller does it instead)."""
+    if events and _source == "local":
+        get_hub().publish(events)
+
+
+def coalesce_window() -> float:
+    return float(os.getenv("FEED_COALESCE_MS", "100")) / 1000.0
+
+
+def feed_stats() -> Dict[str, int]:
+    return get_hub().stats()
+
+
+def upsert_event(task_id: int, fields: Dict[str, Any]) -> Dict[str, Any]:
+    return {"op": "upsert", "id": task_id, "fields": fields}
+
+
+def delete_event(task_id: int) -> Dict[str, Any]:
+    return {"op": "delete", "id": task_id, "fields": {}}
+
+
+def stage(session: Session, events: Iterable[Dict[str, Any]]):
+    """Publish ``events`` when ``session`` commits (dropped on rollback)."""
+    session.info.setdefault("feed", []).extend(events)
+
+
+def _changed_fields(task: Task, is_new: bool) -> List[str]:
+    if is_new:
+        return list(_FEED_FIELDS)
+    attrs = inspect(task).attrs
+    return [f for f in _FEED_FIELDS if attrs[_ATTRS.get(f, f)].history.has_changes()]
+
+
+@event.listens_for(Session, "after_flush")
+def _collect(session, _ctx):
+    events = []
+    new = set(map(id, session.new))
+    touched: Dict[int, Task] = {}
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Task):
+            touched[obj.id] = obj
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            events.append(delete_event(obj.id))
+    for task_id, task in touched.items():
+        fields = _changed_fields(task, id(task) in new)
+        if fields:
+            events.append(upsert_event(task_id, task_to_dict(task, fields)))
+    if events:
+        stage(session, events)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session):
+    events = session.info.pop("feed", None)
+    if events:
+        publish_local(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop("feed", None)
+
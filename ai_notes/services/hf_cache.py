@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+_MISSING = object()
+
+
+def normalize_text(text: str) -> str:
+    # NFC + collapsed whitespace; case is kept because NER/T2T are case-sensitive
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def make_key(kind: str, model: str, text: str, labels: Iterable[str] = ()) -> str:
+    """Content-hashed key, stable across processes (unlike the salted builtin hash)."""
+    raw = "\x1f".join([kind, model, ",".join(labels), normalize_text(text)])
+    return f"{kind}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+
+class _DiskTier:
+    """SQLite-backed tier shared by every process pointing at the same file."""
+
+    def __init__(self, path: str, max_rows: int = 50000):
+        self.path = path
+        self.max_rows = max_rows
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS hf_cache ("
+            " key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_hf_cache_expires ON hf_cache (expires_at)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, now: float) -> Tuple[Any, float]:
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM hf_cache WHERE key = ? AND expires_at > ?",
+            (key, now),
+        ).fetchone()
+        if not row:
+            return _MISSING, 0.0
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, expires_at: float):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO hf_cache (key, expires_at, value) VALUES (?, ?, ?)",
+            (key, expires_at, json.dumps(value)),
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.purge(time.time())
+        conn.commit()
+
+    def purge(self, now: float):
+        conn = self._conn()
+        conn.execute("DELETE FROM hf_cache WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM hf_cache WHERE key IN ("
+            " SELECT key FROM hf_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
+
+
+class LRUCache:
+    """Size- and TTL-bounded LRU with an optional on-disk second tier."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = _DiskTier(path) if path else None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, val = item
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return val
+                del self._data[key]
+                self.expirations += 1
+        if self._disk is not None:
+            try:
+                val, expires_at = self._disk.get(key, now)
+            except sqlite3.Error:
+                val = _MISSING
+            if val is not _MISSING:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._put(key, val, expires_at, now)
+                return val
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key: str, val: Any):
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._put(key, val, expires_at, now)
+        if self._disk is not None:
+            try:
+                self._disk.set(key, val, expires_at)
+            except (sqlite3.Error, TypeError, ValueError):
+                # Disk tier is best-effort; unserializable values stay memory-only
+                pass
+
+    def _put(self, key: str, val: Any, expires_at: float, now: float):
+        self._data[key] = (expires_at, val)
+        self._data.move_to_end(key)
+        # Drop expired entries sitting at the cold end before evicting live ones
+        while self._data:
+            oldest_key, (oldest_exp, _) = next(iter(self._data.items()))
+            if oldest_exp > now or oldest_key == key:
+                break
+            del self._data[oldest_key]
+            self.expirations += 1
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "disk": bool(self._disk),
+            }
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one computation.
+
+    The first caller runs ``fn``; callers arriving while it runs wait for
+    its result (or exception) instead of starting their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Returns ``(value, shared)``; ``shared`` is True for waiters."""
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._calls[key] = Future()
+        if not leader:
+            return fut.result(), True
+        try:
+            val = fn()
+            fut.set_result(val)
+            return val, False
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+def cache_from_env() -> LRUCache:
+    return LRUCache(
+        maxsize=int(os.getenv("HF_CACHE_SIZE", "1024")),
+        ttl=float(os.getenv("HF_CACHE_TTL", "60")),
+        path=os.getenv("HF_CACHE_PATH") or None,
+    )
@@ -3,8 +3,10 @@ import json
 import re
 import time
 import threading
+from abc import ABC, abstractmethod
 from typing import Dict, List, Tuple, Any
 from huggingface_hub import InferenceClient
+from .hf_cache import LRUCache, cache_from_env, make_key
 
 
 _client_lock = threading.Lock()
@@ -20,21 +22,145 @@ def _get_client() -> InferenceClient:
     return _client
 
 
-_cache: Dict[str, Tuple[float, Any]] = {}
+_cache_lock = threading.Lock()
+_cache = None
 
 
-def _cache_get(key: str, ttl=60):
-    t = _cache.get(key)
-    if not t:
-        return None
-    ts, val = t
-    if time.time() - ts < ttl:
-        return val
-    return None
+def _get_cache() -> LRUCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = cache_from_env()
+    return _cache
+
+
+def _cache_get(key: str):
+    return _get_cache().get(key)
 
 
 def _cache_set(key: str, val: Any):
-    _cache[key] = (time.time(), val)
+    _get_cache().set(key, val)
+
+
+def cache_stats() -> Dict[str, Any]:
+    return _get_cache().stats()
+
+
+class InferenceBackend(ABC):
+    """Interface behind hf_zero_shot / hf_ner / hf_text2json.
+
+    Select with AI_BACKEND (``hf`` remote Inference API, ``local`` in-process CPU).
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def model_id(self, kind: str) -> str:
+        ...
+
+    @abstractmethod
+    def zero_shot(self, text: str, labels: List[str]) -> Tuple[str, Dict[str, float]]:
+        ...
+
+    @abstractmethod
+    def ner(self, text: str) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def text2json(self, prompt: str) -> dict:
+        ...
+
+    def warmup(self):
+        pass
+
+
+class HFBackend(InferenceBackend):
+    name = "hf"
+
+    def model_id(self, kind: str) -> str:
+        if kind == "zs":
+            return os.getenv("HF_CLASSIFIER_MODEL_ZEROSHOT", "facebook/bart-large-mnli")
+        if kind == "ner":
+            return os.getenv("HF_NER_MODEL", "dslim/bert-base-NER")
+        return os.getenv("HF_TASK_MODEL_TEXT2TEXT", "google/flan-t5-base")
+
+    def zero_shot(self, text: str, labels: List[str]) -> Tuple[str, Dict[str, float]]:
+        def _call():
+            client = _get_client()
+            res = client.zero_shot_classification(text, labels=labels, model=self.model_id("zs"), timeout=6.0)
+            # Older hubs return {labels:[], scores:[]}, newer a list of {label, score}
+            if isinstance(res, dict):
+                pairs = zip(res.get("labels", []), res.get("scores", []))
+            else:
+                pairs = ((r["label"], r["score"]) for r in res)
+            best = None
+            scores = {}
+            for l, s in pairs:
+                scores[l] = float(s)
+                if best is None or s > scores[best]:
+                    best = l
+            return best or labels[0], scores
+
+        return _retry(_call)
+
+    def ner(self, text: str) -> List[Dict[str, Any]]:
+        def _call():
+            client = _get_client()
+            return client.token_classification(text, model=self.model_id("ner"), timeout=6.0)
+
+        return _retry(_call)
+
+    def text2json(self, prompt: str) -> dict:
+        def _call():
+            client = _get_client()
+            raw = client.text_generation(
+                prompt=prompt,
+                model=self.model_id("t2j"),
+                max_new_tokens=256,
+                temperature=0.2,
+                timeout=10.0,
+            )
+            if isinstance(raw, dict) and "generated_text" in raw:
+                txt = raw["generated_text"]
+            elif isinstance(raw, list) and raw and isinstance(raw[0], dict) and "generated_text" in raw[0]:
+                txt = raw[0]["generated_text"]
+            else:
+                txt = str(raw)
+            return _strip_to_json(txt)
+
+        return _retry(_call)
+
+    def warmup(self):
+        _get_client()
+
+
+_backend_lock = threading.Lock()
+_backend = None
+
+
+def _get_backend() -> InferenceBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                kind = os.getenv("AI_BACKEND", "hf").lower()
+                if kind == "local":
+                    from .local_backend import LocalBackend
+
+                    _backend = LocalBackend()
+                else:
+                    _backend = HFBackend()
+    return _backend
+
+
+def backend_name() -> str:
+    return _get_backend().name
+
+
+def warmup():
+    """Load the selected backend once per process (called from create_app)."""
+    _get_backend().warmup()
 
 
 def _retry(fn, *, attempts=3, backoff=0.8):
@@ -49,41 +175,27 @@ def _retry(fn, *, attempts=3, backoff=0.8):
 
 
 def hf_zero_shot(text: str, labels: List[str]) -> Tuple[str, Dict[str, float]]:
-    key = f"zs::{hash(text)}::{','.join(labels)}::{os.getenv('HF_CLASSIFIER_MODEL_ZEROSHOT','facebook/bart-large-mnli')}"
+    backend = _get_backend()
+    key = make_key("zs", f"{backend.name}:{backend.model_id('zs')}", text, labels)
     cached = _cache_get(key)
     if cached is not None:
-        return cached
+        # disk tier round-trips through JSON, so rebuild the tuple
+        label, scores = cached
+        return label, scores
 
-    def _call():
-        client = _get_client()
-        model = os.getenv("HF_CLASSIFIER_MODEL_ZEROSHOT", "facebook/bart-large-mnli")
-        res = client.zero_shot_classification(text, labels=labels, model=model, timeout=6.0)
-        # Expected res: {labels:[], scores:[]}
-        best = None
-        scores = {}
-        for l, s in zip(res.get("labels", []), res.get("scores", [])):
-            scores[l] = float(s)
-            if best is None or s > scores[best]:
-                best = l
-        return best or labels[0], scores
-
-    val = _retry(_call)
+    val = backend.zero_shot(text, labels)
     _cache_set(key, val)
     return val
 
 
 def hf_ner(text: str):
-    key = f"ner::{hash(text)}::{os.getenv('HF_NER_MODEL','dslim/bert-base-NER')}"
+    backend = _get_backend()
+    key = make_key("ner", f"{backend.name}:{backend.model_id('ner')}", text)
     cached = _cache_get(key)
     if cached is not None:
         return cached
 
-    def _call():
-        client = _get_client()
-        model = os.getenv("HF_NER_MODEL", "dslim/bert-base-NER")
-        return client.token_classification(text, model=model, timeout=6.0)
-
-    val = _retry(_call)
+    val = backend.ner(text)
     _cache_set(key, val)
     return val
 
@@ -105,30 +217,12 @@ def _strip_to_json(text: str) -> dict:
 
 
 def hf_text2json(prompt: str) -> dict:
-    key = f"t2j::{hash(prompt)}::{os.getenv('HF_TASK_MODEL_TEXT2TEXT','google/flan-t5-base')}"
+    backend = _get_backend()
+    key = make_key("t2j", f"{backend.name}:{backend.model_id('t2j')}", prompt)
     cached = _cache_get(key)
     if cached is not None:
         return cached
 
-    def _call():
-        client = _get_client()
-        model = os.getenv("HF_TASK_MODEL_TEXT2TEXT", "google/flan-t5-base")
-        raw = client.text_generation(
-            prompt=prompt,
-            model=model,
-            max_new_tokens=256,
-            temperature=0.2,
-            timeout=10.0,
-        )
-        if isinstance(raw, dict) and "generated_text" in raw:
-            txt = raw["generated_text"]
-        elif isinstance(raw, list) and raw and isinstance(raw[0], dict) and "generated_text" in raw[0]:
-            txt = raw[0]["generated_text"]
-        else:
-            txt = str(raw)
-        return _strip_to_json(txt)
-
-    val = _retry(_call)
+    val = backend.text2json(prompt)
     _cache_set(key, val)
     return val
-
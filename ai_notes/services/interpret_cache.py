@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+from dateutil import tz as dtz
+from .hf_cache import LRUCache, SingleFlight, make_key, normalize_text
+from ..utils.time import get_zone, uses_current_time
+
+
+# Whole-parse cache for /api/ai/interpret. Relative dates ("friday 9am")
+# resolve against the caller's local day, so the key carries the timezone
+# and the local date; phrases relative to the current time ("in 20m",
+# "now", "tonight"), and days without a clock time (which keep the current
+# HH:MM), narrow that to the local minute. The target is looked up in the
+# database on every request, so a cached parse never names a task that has
+# since been renamed or deleted.
+
+_CLOCK_RELATIVE = re.compile(
+    r"\b(now|tonight|in\s+\d+\s*(m|mins?|minutes?|h|hrs?|hours?)|this\s+(morning|afternoon|evening))\b",
+    re.I,
+)
+
+_cache_lock = threading.Lock()
+_cache = None
+_flights = SingleFlight()
+
+
+def _get_cache() -> LRUCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LRUCache(
+                    maxsize=int(os.getenv("INTERPRET_CACHE_SIZE", "512")),
+                    ttl=float(os.getenv("INTERPRET_CACHE_TTL", "300")),
+                )
+    return _cache
+
+
+def bucket(utterance: str, tz: str, now: datetime = None) -> Tuple[str, datetime]:
+    """Return ``(bucket label, bucket end as UTC)`` for the caller's clock."""
+    zone = get_zone(tz)
+    local = (now or datetime.now(dtz.UTC)).astimezone(zone)
+    if _CLOCK_RELATIVE.search(utterance) or uses_current_time(utterance):
+        start = local.replace(second=0, microsecond=0)
+        return start.strftime("%Y-%m-%dT%H:%M"), (start + timedelta(minutes=1)).astimezone(dtz.UTC)
+    start = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    return start.strftime("%Y-%m-%d"), (start + timedelta(days=1)).astimezone(dtz.UTC)
+
+
+def etag_for(parsed: Dict[str, Any]) -> str:
+    raw = json.dumps(parsed, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:32]
+
+
+def _with_target(parsed: Dict[str, Any], target: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if target is None:
+        return parsed
+    return {**parsed, "target": target}
+
+
+def interpret(
+    utterance: str,
+    tz: str,
+    backend: str,
+    compute: Callable[[], Dict[str, Any]],
+    resolve: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+) -> Tuple[Dict[str, Any], str, int]:
+    """Cached/coalesced ``compute()``; returns ``(entry, source, max_age)``.
+
+    ``entry`` is ``{"parsed", "etag", "timings"}``, ``source`` is
+    ``hit``, ``miss`` or ``shared`` (joined an identical in-flight parse),
+    and ``max_age`` the seconds the entry stays valid for this bucket.
+    ``resolve()`` returns the current database target (or None to keep
+    the parsed one) and is applied to every response, cached or not.
+    """
+    label, ends = bucket(utterance, tz)
+    cache = _get_cache()
+    key = make_key("interpret", backend, normalize_text(utterance), (tz, label))
+    max_age = max(0, min(int(cache.ttl), int((ends - datetime.now(dtz.UTC)).total_seconds())))
+    entry = cache.get(key)
+    source = "hit"
+    if entry is None:
+        def _run():
+            parsed, timings = compute()
+            val = {"parsed": parsed, "timings": timings}
+            cache.set(key, val)
+            return val
+
+        entry, shared = _flights.do(key, _run)
+        source = "shared" if shared else "miss"
+    parsed = _with_target(entry["parsed"], resolve() if resolve else None)
+    return {"parsed": parsed, "etag": etag_for(parsed), "timings": entry["timings"]}, source, max_age
+
+
+def cache_stats() -> Dict[str, Any]:
+    return _get_cache().stats()
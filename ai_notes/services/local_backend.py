@@ -0,0 +1,196 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+from .hf_client import InferenceBackend
+
+
+# Small seed corpus for the six INTENT_LABELS; quoted titles and numbers are
+# normalized away by _tokens, so examples only need the command shape.
+SEED_CORPUS: Dict[str, List[str]] = {
+    "create": [
+        "create 'report' tomorrow 10am",
+        "new task 'renew car reg' next monday 8am urgent",
+        "add 'buy milk' to my list",
+        "add a task to call mom",
+        "remind me to pay rent on friday",
+        "write polite rejection email tomorrow 30m high",
+        "new todo prepare slides",
+        "create a task for the dentist appointment",
+        "i need to book flights",
+        "schedule 'team sync' friday 9:30",
+        "research project asap",
+        "grade students projects 2pm",
+        "plan the birthday party next week",
+    ],
+    "update": [
+        "move 'rise email' to friday 9:30",
+        "change the deadline of 'report' to tomorrow",
+        "set 'slides' to high priority",
+        "set in progress 20m notify 1h",
+        "reschedule 'dentist' to next tuesday",
+        "rename 'draft' to 'final draft'",
+        "push 'taxes' to next month",
+        "update 'report' duration 45m",
+        "make 'budget review' urgent",
+        "postpone the meeting to 3pm",
+        "edit the description of 'trip'",
+        "alerts 12h and 1h for 'launch'",
+    ],
+    "delete": [
+        "delete 'old task'",
+        "remove 'buy milk'",
+        "drop the 'gym' task",
+        "get rid of 'draft email'",
+        "cancel 'dentist appointment'",
+        "trash 'report'",
+        "erase the task 'slides'",
+        "delete it",
+    ],
+    "complete": [
+        "mark 'prepare slides' done",
+        "'report' is done",
+        "i finished 'taxes'",
+        "complete 'buy milk'",
+        "check off 'gym'",
+        "done with 'draft email'",
+        "mark as complete",
+        "finished the presentation",
+        "close 'budget review'",
+    ],
+    "reopen": [
+        "reopen 'prepare slides'",
+        "undo 'report' completion",
+        "mark 'taxes' as not done",
+        "reopen the task 'gym'",
+        "'buy milk' is not finished yet",
+        "set 'draft' back to pending",
+        "undo done on 'slides'",
+        "uncheck 'budget review'",
+    ],
+    "query": [
+        "what is due tomorrow",
+        "show my tasks",
+        "list urgent tasks",
+        "what do i have today",
+        "which tasks are overdue",
+        "how many tasks are pending",
+        "when is 'report' due",
+        "show done tasks",
+        "what's on my plate this week",
+    ],
+}
+
+
+_QUOTED = re.compile(r"[\"'“”‘’][^\"'“”‘’]+[\"'“”‘’]")
+_NUM = re.compile(r"\d+")
+_WORD = re.compile(r"[a-z_]+")
+
+
+def _tokens(text: str) -> List[str]:
+    t = _QUOTED.sub(" __title__ ", (text or "").lower())
+    t = _NUM.sub(" __num__ ", t)
+    words = _WORD.findall(t)
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class TfidfIntentClassifier:
+    """TF-IDF nearest-centroid classifier with softmax-normalized scores."""
+
+    def __init__(self, corpus: Dict[str, List[str]], temperature: float = 0.1):
+        self.temperature = temperature
+        docs = [(label, Counter(_tokens(s))) for label, samples in corpus.items() for s in samples]
+        df: Counter = Counter()
+        for _, tf in docs:
+            df.update(tf.keys())
+        n = len(docs)
+        self.idf = {term: math.log((1 + n) / (1 + c)) + 1.0 for term, c in df.items()}
+        sums: Dict[str, Counter] = {}
+        for label, tf in docs:
+            sums.setdefault(label, Counter()).update(self._vector(tf))
+        self.centroids = {label: self._normalize(vec) for label, vec in sums.items()}
+
+    def _vector(self, tf: Counter) -> Dict[str, float]:
+        return {term: (1.0 + math.log(c)) * self.idf[term] for term, c in tf.items() if term in self.idf}
+
+    @staticmethod
+    def _normalize(vec: Dict[str, float]) -> Dict[str, float]:
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        return {k: v / norm for k, v in vec.items()}
+
+    def predict(self, text: str, labels: List[str]) -> Tuple[str, Dict[str, float]]:
+        vec = self._normalize(self._vector(Counter(_tokens(text))))
+        sims = {}
+        for label in labels:
+            centroid = self.centroids.get(label)
+            sims[label] = sum(w * centroid.get(t, 0.0) for t, w in vec.items()) if centroid else 0.0
+        top = max(sims.values()) if sims else 0.0
+        exps = {l: math.exp((s - top) / self.temperature) for l, s in sims.items()}
+        total = sum(exps.values()) or 1.0
+        scores = {l: e / total for l, e in sorted(exps.items(), key=lambda kv: -kv[1])}
+        best = max(sims, key=sims.get) if top > 0 else labels[0]
+        return best, scores
+
+
+_ACRONYM = re.compile(r"\b[A-Z]{2,}[A-Z0-9]*\b")
+_PROPER = re.compile(r"(?<![.!?]\s)(?<!^)\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b")
+
+
+def heuristic_ner(text: str) -> List[Dict[str, Any]]:
+    """Capitalization-based entities in the HF token_classification shape.
+
+    Acronyms become ORG, mid-sentence capitalized spans MISC; weekday and
+    month names are skipped since the date rules already handle them.
+    """
+    skip = {
+        "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday",
+        "Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun",
+        "January", "February", "March", "April", "May", "June", "July",
+        "August", "September", "October", "November", "December",
+        "AM", "PM",
+    }
+    ents: List[Dict[str, Any]] = []
+    for m in _ACRONYM.finditer(text or ""):
+        if m.group(0) not in skip:
+            ents.append({"entity_group": "ORG", "word": m.group(0), "score": 0.6, "start": m.start(), "end": m.end()})
+    for m in _PROPER.finditer(text or ""):
+        if m.group(0) not in skip:
+            ents.append({"entity_group": "MISC", "word": m.group(0), "score": 0.5, "start": m.start(), "end": m.end()})
+    return sorted(ents, key=lambda e: e["start"])
+
+
+class LocalBackend(InferenceBackend):
+    """In-process CPU backend for air-gapped deployments.
+
+    Intent uses a TF-IDF classifier trained on SEED_CORPUS, NER is heuristic,
+    and text2json returns nothing so the rule layer supplies every field.
+    """
+
+    name = "local"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clf = None
+
+    def model_id(self, kind: str) -> str:
+        return {"zs": "tfidf-intent-v1", "ner": "caps-ner-v1"}.get(kind, "none")
+
+    def _classifier(self) -> TfidfIntentClassifier:
+        if self._clf is None:
+            with self._lock:
+                if self._clf is None:
+                    self._clf = TfidfIntentClassifier(SEED_CORPUS)
+        return self._clf
+
+    def zero_shot(self, text: str, labels: List[str]) -> Tuple[str, Dict[str, float]]:
+        return self._classifier().predict(text, labels)
+
+    def ner(self, text: str) -> List[Dict[str, Any]]:
+        return heuristic_ner(text)
+
+    def text2json(self, prompt: str) -> dict:
+        return {}
+
+    def warmup(self):
+        self._classifier()
@@ -0,0 +1,305 @@
+import json
+import logging
+import os
+import random
+import smtplib
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+
+log = logging.getLogger("ai_notes.notify")
+
+
+class Notification(NamedTuple):
+    task_id: int
+    offset_minutes: int
+    title: str
+    deadline_utc: Optional[datetime]
+    fire_at: Optional[datetime]
+
+    @property
+    def key(self) -> str:
+        # fire_at is part of the key so a re-armed reminder is not a duplicate
+        return f"{self.task_id}:{self.offset_minutes}:{self.fire_at.isoformat() if self.fire_at else ''}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "task_id": self.task_id,
+            "offset_minutes": self.offset_minutes,
+            "title": self.title,
+            "deadline_utc": self.deadline_utc.isoformat() + "Z" if self.deadline_utc else None,
+        }
+
+
+class Sink(ABC):
+    """Delivers one batch; raise to have the pipeline retry the whole batch."""
+
+    name = "base"
+
+    @abstractmethod
+    def send_batch(self, items: List[Notification]):
+        ...
+
+
+class LogSink(Sink):
+    name = "log"
+
+    def send_batch(self, items: List[Notification]):
+        for n in items:
+            log.info(f"[notify] Task {n.task_id} offset {n.offset_minutes}m: {n.title}")
+
+
+class WebhookSink(Sink):
+    """POSTs ``{"notifications": [...]}`` as JSON, one request per batch."""
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send_batch(self, items: List[Notification]):
+        body = json.dumps({"notifications": [n.to_dict() for n in items]}).encode("utf-8")
+        req = urllib.request.Request(
+            self.url, data=body, method="POST", headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            resp.read()
+
+
+class SmtpSink(Sink):
+    """One digest email per batch (e.g. ``python -m aiosmtpd -n -l localhost:1025``)."""
+
+    name = "smtp"
+
+    def __init__(self, host: str, port: int, sender: str, to: str, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.to = to
+        self.timeout = timeout
+
+    def send_batch(self, items: List[Notification]):
+        msg = EmailMessage()
+        msg["From"] = self.sender
+        msg["To"] = self.to
+        msg["Subject"] = (
+            f"Reminder: {items[0].title}" if len(items) == 1 else f"{len(items)} task reminders"
+        )
+        msg.set_content("\n".join(
+            f"- {n.title} (due {n.deadline_utc:%Y-%m-%d %H:%M} UTC, {n.offset_minutes}m alert)"
+            if n.deadline_utc else f"- {n.title}"
+            for n in items
+        ))
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            smtp.send_message(msg)
+
+
+_ws_clients_lock = threading.Lock()
+_ws_clients: set = set()
+
+
+def register_ws_client(ws):
+    # ``ws.send`` is called from pool threads, so it must be thread-safe
+    with _ws_clients_lock:
+        _ws_clients.add(ws)
+
+
+def unregister_ws_client(ws):
+    with _ws_clients_lock:
+        _ws_clients.discard(ws)
+
+
+class WebSocketSink(Sink):
+    """Pushes ``{"phase": "notify", ...}`` to every connected /ws/ai client."""
+
+    name = "ws"
+
+    def send_batch(self, items: List[Notification]):
+        payload = json.dumps({"phase": "notify", "notifications": [n.to_dict() for n in items]})
+        with _ws_clients_lock:
+            clients = list(_ws_clients)
+        for ws in clients:
+            try:
+                ws.send(payload)
+            except Exception:
+                # closed sockets are dropped, not retried
+                unregister_ws_client(ws)
+
+
+def sinks_from_env() -> List[Sink]:
+    sinks: List[Sink] = []
+    for name in (os.getenv("NOTIFY_SINKS") or "log").split(","):
+        name = name.strip().lower()
+        if name == "log":
+            sinks.append(LogSink())
+        elif name == "webhook" and os.getenv("NOTIFY_WEBHOOK_URL"):
+            sinks.append(WebhookSink(os.environ["NOTIFY_WEBHOOK_URL"]))
+        elif name == "smtp":
+            sinks.append(SmtpSink(
+                host=os.getenv("NOTIFY_SMTP_HOST", "localhost"),
+                port=int(os.getenv("NOTIFY_SMTP_PORT", "1025")),
+                sender=os.getenv("NOTIFY_SMTP_FROM", "ai-notes@localhost"),
+                to=os.getenv("NOTIFY_SMTP_TO", "me@localhost"),
+            ))
+        elif name == "ws":
+            sinks.append(WebSocketSink())
+        elif name:
+            log.warning(f"[notify] unknown or unconfigured sink {name!r}")
+    return sinks
+
+
+def _percentile(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 1)
+
+
+class DeliveryPipeline:
+    """Micro-batching fan-out of due reminders to every sink.
+
+    ``submit`` only buffers; a flusher thread collects whatever arrived in
+    the same ``batch_window`` slice and hands one batch per sink to a
+    bounded pool. Failed batches retry with full-jitter backoff; reminders
+    already seen (same task, offset and fire time) are dropped.
+    """
+
+    def __init__(
+        self,
+        sinks: Iterable[Sink],
+        batch_window: float = 0.25,
+        max_batch: int = 100,
+        workers: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+        dedupe_size: int = 10000,
+    ):
+        self.sinks = list(sinks)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.retries = retries
+        self.backoff = backoff
+        self.dedupe_size = dedupe_size
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="notify")
+        self._cond = threading.Condition()
+        self._buffer: List[Notification] = []
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._inflight: set = set()
+        self._latency_ms: deque = deque(maxlen=1000)
+        self._counts = {"submitted": 0, "deduped": 0, "batches": 0, "delivered": 0, "failed": 0, "retries": 0}
+        self._flusher = threading.Thread(target=self._run, name="notify-flusher", daemon=True)
+        self._flusher.start()
+
+    def submit(self, items: Iterable[Notification]) -> int:
+        """Queue reminders for delivery; returns how many were new."""
+        added = 0
+        with self._cond:
+            for n in items:
+                self._counts["submitted"] += 1
+                if n.key in self._seen:
+                    self._counts["deduped"] += 1
+                    continue
+                self._seen[n.key] = None
+                if len(self._seen) > self.dedupe_size:
+                    self._seen.popitem(last=False)
+                self._buffer.append(n)
+                added += 1
+            if added:
+                self._cond.notify()
+        return added
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._buffer:
+                    self._cond.wait()
+            # let the rest of this time slice arrive before cutting a batch
+            time.sleep(self.batch_window)
+            self._dispatch_buffer()
+
+    def _dispatch_buffer(self):
+        with self._cond:
+            items, self._buffer = self._buffer, []
+        for i in range(0, len(items), self.max_batch):
+            chunk = items[i:i + self.max_batch]
+            for sink in self.sinks:
+                fut = self._pool.submit(self._deliver, sink, chunk)
+                with self._cond:
+                    self._inflight.add(fut)
+                fut.add_done_callback(self._done)
+
+    def _done(self, fut):
+        with self._cond:
+            self._inflight.discard(fut)
+
+    def _deliver(self, sink: Sink, items: List[Notification]):
+        for attempt in range(self.retries + 1):
+            try:
+                sink.send_batch(items)
+                break
+            except Exception as exc:
+                if attempt >= self.retries:
+                    log.warning(f"[notify] {sink.name} gave up on {len(items)} reminders: {exc}")
+                    with self._cond:
+                        self._counts["failed"] += len(items)
+                    return
+                with self._cond:
+                    self._counts["retries"] += 1
+                time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+        now = datetime.utcnow()
+        with self._cond:
+            self._counts["batches"] += 1
+            self._counts["delivered"] += len(items)
+            for n in items:
+                if n.fire_at:
+                    self._latency_ms.append((now - n.fire_at).total_seconds() * 1000.0)
+
+    def flush(self, timeout: Optional[float] = None):
+        """Deliver everything buffered now and wait for in-flight batches."""
+        self._dispatch_buffer()
+        with self._cond:
+            pending = list(self._inflight)
+        wait(pending, timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            lat = list(self._latency_ms)
+            out: Dict[str, Any] = dict(self._counts)
+            out["queued"] = len(self._buffer)
+        out["sinks"] = [s.name for s in self.sinks]
+        out["latency_ms"] = {"p50": _percentile(lat, 0.5), "p95": _percentile(lat, 0.95), "max": _percentile(lat, 1.0)}
+        return out
+
+
+_pipeline_lock = threading.Lock()
+_pipeline = None
+
+
+def _get_pipeline() -> DeliveryPipeline:
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = DeliveryPipeline(
+                    sinks_from_env(),
+                    batch_window=float(os.getenv("NOTIFY_BATCH_MS", "250")) / 1000.0,
+                    workers=int(os.getenv("NOTIFY_WORKERS", "4")),
+                    retries=int(os.getenv("NOTIFY_RETRIES", "3")),
+                )
+    return _pipeline
+
+
+def submit(items: Iterable[Notification]) -> int:
+    return _get_pipeline().submit(items)
+
+
+def delivery_stats() -> Dict[str, Any]:
+    return _get_pipeline().stats()
@@ -0,0 +1,276 @@
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+
+# Rule layer behind AIRouter.extract_fields and the console's fragment
+# titles. One compiled pattern walks the text once and every match is a
+# named token (number + following unit, word, clock time, multi-word
+# phrase); the rules are then decided over those tokens instead of
+# re-searching the utterance once per rule. The behaviour is that of the
+# per-rule regexes this replaced, which are quoted above each rule.
+
+PRIORITY_MAP = {
+    "low": "low",
+    "medium": "medium",
+    "normal": "medium",
+    "high": "high",
+    "urgent": "urgent",
+    "asap": "urgent",
+    "today": "high",
+}
+
+_DOW3 = r"(?:mon|tue|wed|thu|fri|sat|sun)"
+
+_TOKEN = re.compile(
+    r"""
+      (?P<clock>\b\d{1,2}:\d{2}\b)
+    | (?P<ampm>\b\d{1,2}\s*(?:am|pm)\b)
+    | (?P<num>(?P<n>\d+)(?=(?P<usp>\s*)(?P<unit>[^\W\d_]*)(?:\s+(?P<after>[^\W\d_]+))?))
+    | (?P<idk>\bidk\s+when\b)
+    | (?P<amb>\b""" + _DOW3 + r"""\s+or\s+""" + _DOW3 + r"""\b)
+    | (?P<this>\bthis\s+(?:afternoon|evening)\b)
+    | (?P<status>\b(?:in\s*progress|ongoing)\b)
+    | (?P<before>before(?=\s+(?P<bw>\w+)))
+    | (?P<next>\bnext(?=\s+(?P<nw>\w+)))
+    | (?P<word>\b[^\W\d_]+\b)
+    """,
+    re.I | re.X,
+)
+_SPACE_WORD = re.compile(r"\s*(\w*)")
+_SPACES = re.compile(r"\s+")
+
+_DAYS = frozenset(("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"))
+_DATE_WORDS = _DAYS | {"tomorrow", "today", "tonight"}
+_STRICT_UNITS = frozenset(("min", "m", "minutes", "hour", "h", "hours"))
+_UNITS = ("h", "hour", "hours", "m", "min", "minute")
+_BEFORE = ("before", "prior")
+_ALERT_WORDS = frozenset((
+    "alert", "alerts", "notify", "notifies", "notification", "notifications",
+    "remind", "reminder", "reminders", "alarm", "alarms",
+))
+# The description is cut at a narrower set than the alert rule accepts
+_CUT_WORDS = frozenset(("alert", "alerts", "notify", "remind", "reminds", "alarm", "alarms"))
+_TITLE_WORDS = frozenset(("maybe", "asap"))
+_KEYWORDS = frozenset(PRIORITY_MAP) | _DATE_WORDS | _ALERT_WORDS | _CUT_WORDS | _TITLE_WORDS
+
+Span = Tuple[int, int]
+
+
+class RuleScan(NamedTuple):
+    duration: Optional[int]
+    priority: Optional[str]
+    status: Optional[str]
+    alerts: Tuple[int, ...]
+    ambiguous_day: bool
+    description: Optional[str]
+    title: str
+
+
+def _is_word(text: str, i: int) -> bool:
+    return 0 <= i < len(text) and (text[i].isalnum() or text[i] == "_")
+
+
+def _unit_end(text: str, m: "re.Match") -> Tuple[Optional[int], bool]:
+    # \d+\s*(h|hour|hours|m|min|minute)s?(\s*(before|prior))?\b at this number:
+    # (end of the match or None, whether it took the before/prior word)
+    unit = m.group("unit").lower()
+    unit_end = m.end("unit")
+    unit_bounded = not _is_word(text, unit_end)
+    after = (m.group("after") or "").lower()
+    after_ok = after in _BEFORE and not _is_word(text, m.end("after"))
+    for u in _UNITS:
+        if not unit.startswith(u):
+            continue
+        rest = unit[len(u):]
+        if rest[:1] == "s":
+            rest = rest[1:]
+        if rest == "":
+            if after_ok:
+                return m.end("after"), True
+            if unit_bounded:
+                return unit_end, False
+        elif rest in _BEFORE and unit_bounded:
+            return unit_end, True
+    return None, False
+
+
+def _word_after(text: str, pos: int, removed: Sequence[Span]) -> Optional[int]:
+    # End of the next \w+ run after ``pos``, as seen once ``removed`` is cut out
+    while True:
+        m = _SPACE_WORD.match(text, pos)
+        skip = next((e for s, e in removed if s == m.start(1)), None)
+        if skip is None:
+            return m.end(1) if m.group(1) else None
+        pos = skip
+
+
+def _strip_spans(text: str, spans: List[Span]) -> str:
+    out, pos = [], 0
+    for s, e in sorted(spans):
+        if s > pos:
+            out.append(text[pos:s])
+        pos = max(pos, e)
+    out.append(text[pos:])
+    return _SPACES.sub(" ", "".join(out)).strip(" .,-")
+
+
+def _inside(pos: int, spans: Sequence[Span]) -> bool:
+    return any(s <= pos < e for s, e in spans)
+
+
+@lru_cache(maxsize=2048)
+def scan_utterance(text: str) -> RuleScan:
+    """Every rule-derived field of ``text`` from a single tokenizing pass."""
+    words = set()
+    status = None
+    ambiguous = False
+    alert_at = cut_at = None
+    numbers = []
+    dates = []  # (start, end, start of the word a "next" binds to)
+    title_first: List[Span] = []  # idk when / maybe / asap
+    title_before = []  # (start, end of "before", span of its word)
+    title_times: List[Span] = []
+
+    for m in _TOKEN.finditer(text):
+        kind = m.lastgroup
+        if kind == "word":
+            w = m.group().lower()
+            if w not in _KEYWORDS:
+                continue
+            words.add(w)
+            if alert_at is None and w in _ALERT_WORDS:
+                alert_at = m.start()
+            if cut_at is None and w in _CUT_WORDS:
+                cut_at = m.start()
+            if w in _DATE_WORDS:
+                dates.append((m.start(), m.end(), None))
+            if w in _TITLE_WORDS:
+                title_first.append(m.span())
+            if w == "maybe":
+                ambiguous = True
+        elif kind == "num":
+            if m.group("unit"):
+                numbers.append(m)
+        elif kind == "before":
+            if not _is_word(text, m.start() - 1):
+                title_before.append((m.start(), m.end(), m.start("bw"), m.end("bw")))
+        elif kind in ("clock", "ampm"):
+            dates.append((m.start(), m.end(), None))
+            title_times.append(m.span())
+        elif kind == "this":
+            dates.append((m.start(), m.end(), None))
+        elif kind == "next":
+            dates.append((m.start(), m.end("nw"), m.start("nw")))
+        elif kind == "status":
+            status = "in_progress"
+        elif kind == "amb":
+            ambiguous = True
+        elif kind == "idk":
+            title_first.append(m.span())
+
+    priority = next((v for k, v in PRIORITY_MAP.items() if k in words), None)
+
+    duration = None
+    alerts = set()
+    removed: List[Span] = []
+    limit = len(text) if cut_at is None else cut_at
+    for m in numbers:
+        unit = m.group("unit")
+        n = int(m.group("n"))
+        minutes = n * 60 if unit[0] in "hH" else n
+        bounded = not _is_word(text, m.start() - 1)
+        # \b(\d+)\s*(min|m|minutes|hour|h|hours)\b -- first match only
+        if (duration is None and bounded and unit.lower() in _STRICT_UNITS
+                and not _is_word(text, m.end("unit"))):
+            duration = minutes
+        # after the alert keyword: (\d+)\s*(h|hour|hours|m|min|minute)s?
+        if alert_at is not None and m.start() >= alert_at and unit[0] in "hHmM":
+            alerts.add(minutes)
+        end, with_before = _unit_end(text, m)
+        # anywhere: (\d+)\s*(h|...)s?\s*(before|prior)\b
+        if with_before:
+            alerts.add(minutes)
+        if end is not None and bounded and end <= limit:
+            removed.append((m.start(), end))
+
+    # Date words leave the description left to right; "next" takes the word
+    # that follows it once the durations above are gone
+    durations = list(removed)
+    last = -1
+    for s, e, bound in dates:
+        if s >= limit:
+            break
+        if s < last:
+            continue
+        if bound is not None and _inside(bound, durations):
+            e = _word_after(text, s + 4, durations)
+            if e is None:
+                continue
+        removed.append((s, e))
+        last = e
+    description = _strip_spans(text[:limit], removed) or None
+
+    spans = list(title_first)
+    last = -1
+    for s, before_end, bound, e in title_before:
+        if s < last or _inside(s, title_first):
+            continue
+        if _inside(bound, title_first):
+            e = _word_after(text, before_end, title_first)
+            if e is None:
+                continue
+        spans.append((s, e))
+        last = e
+    spans.extend(sp for sp in title_times if not _inside(sp[0], spans))
+    title = _strip_spans(text, spans) or text.strip()
+
+    return RuleScan(
+        duration=duration,
+        priority=priority,
+        status=status,
+        alerts=tuple(sorted(alerts)),
+        ambiguous_day=ambiguous,
+        description=description,
+        title=title,
+    )
+
+
+def title_from_fragment(text: str) -> str:
+    """Fragment text minus hedges ("maybe", "idk when"), "before X" and clock times."""
+    return scan_utterance(text).title
+
+
+# Leading-verb intent rules with a confidence; the router lowers it when the
+# rest of the parse is missing something only the remote stages could add.
+# "make" is left out: "make 'x' urgent" is an update as often as a create.
+_INTENTS = [
+    ("create", 0.95, re.compile(r"^(?:please\s+)?(?:create|add|new)\b", re.I)),
+    ("delete", 0.95, re.compile(r"^(?:please\s+)?(?:delete|remove|drop)\b", re.I)),
+    ("reopen", 0.9, re.compile(r"^(?:please\s+)?(?:reopen|undo|unmark)\b", re.I)),
+    ("complete", 0.9, re.compile(
+        r"^(?:please\s+)?(?:complete|finish|mark\b.*\b(?:done|complete))\b|\b(?:done|finished|completed)[.!]?$", re.I)),
+    ("update", 0.85, re.compile(
+        r"^(?:please\s+)?(?:move|change|set|update|reschedule|rename|push|postpone|snooze)\b", re.I)),
+    ("query", 0.9, re.compile(r"^(?:show|list|find|what|which|when)\b", re.I)),
+]
+
+
+# "add an alert to 'x'", "add 'x' to high": a create verb aimed at a task
+_RETARGET = re.compile(r"\b(?:to|from|for|of)\b", re.I)
+_QUOTED = re.compile(r"[\"'“”‘’][^\"'“”‘’]+[\"'“”‘’]")
+
+
+def retargets(text: str) -> bool:
+    """Whether a leading create verb is followed by words that edit a task instead
+    (quoted titles do not count)."""
+    return bool(_RETARGET.search(_QUOTED.sub(" ", text)))
+
+
+def classify_intent(text: str) -> Tuple[Optional[str], float]:
+    """``(intent, confidence)`` from the leading verb, ``(None, 0.0)`` if there is none."""
+    t = text.strip()
+    for intent, score, pattern in _INTENTS:
+        if pattern.search(t):
+            return intent, score
+    return None, 0.0
@@ -1,8 +1,13 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, current_app, render_template, request
 from flask_sock import Sock
 import json
+import threading
+from ..db import db
 from ..services.ai_router import AIRouter
-from ..utils.logging import redact_pii
+from ..services.feed import coalesce_window, get_hub
+from ..services.notify import register_ws_client, unregister_ws_client
+from .pipeline import handle_message
+from .preview import PreviewSession
 
 bp = Blueprint("ai_ws", __name__)
 sock = Sock()
@@ -13,82 +18,62 @@ def ai_console():
     return render_template("ai/console.html")
 
 
+class _LockedClient:
+    """Serialized ``send()`` on a flask-sock socket, shared by its handler, its
+    previews and notify.WebSocketSink (simple-websocket is not thread-safe)."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self._lock = threading.Lock()
+
+    def send(self, payload: str):
+        with self._lock:
+            self.ws.send(payload)
+
+
 @sock.route("/ws/ai")
 def ai_ws(ws):
-    router = AIRouter()
-    while True:
-        raw = ws.receive()
-        if raw is None:
-            break
-        try:
-            data = json.loads(raw)
-        except Exception:
-            ws.send(json.dumps({"phase": "error", "message": "invalid_json"}))
-            continue
-        choose_id = data.get("choose_id")
-        utterance = (data.get("utterance") or "").strip()
-        tz = (data.get("context") or {}).get("now_tz") or "Asia/Kuwait"
-        if not utterance:
-            ws.send(json.dumps({"phase": "error", "message": "empty_utterance"}))
-            continue
-        ws.send(json.dumps({"phase": "thinking"}))
-        # Split into fragments (comma, semicolon, or plus as loose list separators)
-        import re as _re
-        fragments = [p.strip() for p in _re.split(r"[,;]|\s\+\s", utterance) if p and p.strip()]
-        if not fragments:
-            fragments = [utterance]
-        fragments = fragments[:10]
+    # Connected consoles also receive {"phase": "notify"} reminder pushes
+    client = _LockedClient(ws)
+    register_ws_client(client)
+    try:
+        _serve(ws, client)
+    finally:
+        unregister_ws_client(client)
 
-        def _title_from_fragment(text: str) -> str:
-            t = text.strip()
-            t = _re.sub(r"\b(idk\s+when|maybe|asap)\b", "", t, flags=_re.I)
-            t = _re.sub(r"\b(before\s+\w+)\b", "", t, flags=_re.I)
-            t = _re.sub(r"\b(\d{1,2}:\d{2}|\d{1,2}\s*(am|pm))\b", "", t, flags=_re.I)
-            t = _re.sub(r"\s+", " ", t).strip(" .,-")
-            return t or text.strip()
 
-        for frag in fragments:
-            default_title = _title_from_fragment(frag)
-            parsed = router.build_action(frag, tz=tz, user_id="demo", default_title=default_title)
-            if choose_id:
-                parsed["target"] = {"by": "id", "value": int(choose_id)}
-            try:
-                from flask import current_app
-                current_app.logger.info({
-                    "ws_ai": {
-                        "utterance": redact_pii(frag),
-                        "parsed": parsed,
-                    }
-                })
-            except Exception:
-                pass
-            ws.send(json.dumps({"phase": "parsed", "json": parsed}))
-            # Clarification: multiple matches by title
-            try:
-                tgt = (parsed.get("target") or {})
-                if tgt.get("by") == "title" and tgt.get("value"):
-                    from ..models import Task
-                    v = str(tgt.get("value")).lower()
-                    matches = Task.query.filter(Task.title.ilike(f"%{v}%")).all()
-                    if len(matches) > 1:
-                        ws.send(json.dumps({
-                            "phase": "need_clarification",
-                            "options": [{"id": t.id, "title": t.title} for t in matches],
-                        }))
-                        continue
-            except Exception:
-                pass
+def _serve(ws, client: _LockedClient):
+    # Thread-per-socket path (flask-sock); see asgi.py for the asyncio one
+    router = AIRouter()
+    # Previews parse on their own pool, so this loop keeps reading (and can cancel them)
+    previews = PreviewSession(current_app._get_current_object(), lambda msg: client.send(json.dumps(msg)))
+    try:
+        while True:
+            raw = ws.receive()
+            if raw is None:
+                break
             try:
-                task = router.apply_action(parsed)
-            except Exception as e:
-                ws.send(json.dumps({"phase": "error", "message": str(e)}))
-                continue
-            ws.send(json.dumps({"phase": "applied", "task_id": getattr(task, 'id', None)}))
-            from flask import current_app
-            with current_app.app_context():
-                from ..models import Task
-                from flask import render_template
-                t = Task.query.get(getattr(task, "id", None))
-                if t is not None:
-                    html = render_template("tasks/item_row.html", task=t)
-                    ws.send(json.dumps({"phase": "patch", "task_id": t.id, "html": html}))
+                for msg in handle_message(raw, request.remote_addr, router, previews):
+                    client.send(json.dumps(msg))
+            finally:
+                # Return the pooled connection between messages instead of
+                # pinning one for the life of the socket
+                db.session.remove()
+    finally:
+        previews.close()
+
+
+@sock.route("/ws/feed")
+def feed_ws(ws):
+    # Read-only: {"phase": "changes", "events": [...]} as tasks change,
+    # or {"phase": "resync"} when this client fell too far behind
+    hub = get_hub()
+    sub = hub.subscribe()
+    window = coalesce_window()
+    try:
+        while ws.connected:
+            msg = sub.next_message(timeout=1.0, linger=window)
+            if msg is not None:
+                ws.send(json.dumps(msg))
+    finally:
+        hub.unsubscribe(sub)
@@ -0,0 +1,169 @@
+"""Asyncio WebSocket front end for the AI console.
+
+``create_asgi_app(flask_app)`` returns an ASGI application serving
+``/ws/ai`` natively: an idle socket is one coroutine, and each message is
+parsed on a bounded thread pool (HF calls, DB writes and template
+rendering all block) while the event loop keeps reading. Messages may
+carry a ``request_id``; several can be in flight per socket and their
+phases interleave, each tagged with its id. ``/ws/feed`` (the task change
+feed) is served here too. Other HTTP routes are handed
+to the Flask app through asgiref's WsgiToAsgi when it is installed.
+
+    uvicorn --ws wsproto asgi:application
+"""
+import asyncio
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from ..db import db
+from ..services.feed import coalesce_window, get_hub
+from ..services.notify import register_ws_client, unregister_ws_client
+from .pipeline import handle_message
+from .preview import PreviewSession
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # optional: only needed to serve HTTP routes from this app
+    WsgiToAsgi = None
+
+
+WS_PATH = "/ws/ai"
+FEED_PATH = "/ws/feed"
+
+
+class _LoopClient:
+    """Thread-safe ``send()`` into a socket's outgoing queue (for notify.WebSocketSink)."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        self.loop = loop
+        self.queue = queue
+
+    def send(self, payload: str):
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, payload)
+
+
+def _run(flask_app, raw: str, remote_addr: Optional[str], client: _LoopClient, previews: PreviewSession):
+    # Worker thread: same pipeline as the flask-sock handler
+    with flask_app.app_context():
+        try:
+            for msg in handle_message(raw, remote_addr, previews=previews):
+                client.send(json.dumps(msg))
+        except Exception as e:
+            client.send(json.dumps({"phase": "error", "message": str(e)}))
+        finally:
+            db.session.remove()
+
+
+def _with_request_id(raw: str) -> str:
+    # Give id-less messages one so interleaved phases stay attributable
+    try:
+        data = json.loads(raw)
+    except Exception:
+        return raw
+    if isinstance(data, dict) and data.get("request_id") is None:
+        data["request_id"] = uuid.uuid4().hex[:12]
+        return json.dumps(data)
+    return raw
+
+
+def create_asgi_app(flask_app, workers: Optional[int] = None):
+    # Each parse holds a pooled DB connection; stay under the default pool (5 + 10 overflow)
+    workers = workers or int(os.getenv("AI_WS_WORKERS", "10"))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-ws")
+    http_app = WsgiToAsgi(flask_app) if WsgiToAsgi else None
+
+    async def ai_socket(scope, receive, send):
+        event = await receive()
+        if event["type"] != "websocket.connect":
+            return
+        await send({"type": "websocket.accept"})
+        loop = asyncio.get_running_loop()
+        outgoing: asyncio.Queue = asyncio.Queue()
+        client = _LoopClient(loop, outgoing)
+        previews = PreviewSession(flask_app, lambda msg: client.send(json.dumps(msg)))
+        remote_addr = (scope.get("client") or ("anon",))[0]
+
+        async def writer():
+            while True:
+                payload = await outgoing.get()
+                await send({"type": "websocket.send", "text": payload})
+
+        writer_task = asyncio.create_task(writer())
+        register_ws_client(client)
+        try:
+            while True:
+                event = await receive()
+                if event["type"] == "websocket.disconnect":
+                    break
+                if event["type"] != "websocket.receive":
+                    continue
+                raw = event.get("text")
+                if raw is None:
+                    raw = (event.get("bytes") or b"").decode("utf-8", "replace")
+                # not awaited: the next message is read while this one parses
+                loop.run_in_executor(pool, _run, flask_app, _with_request_id(raw), remote_addr, client, previews)
+        finally:
+            unregister_ws_client(client)
+            previews.close()
+            # Parses already running finish on the pool; their output is dropped
+            writer_task.cancel()
+
+    async def feed_socket(scope, receive, send):
+        event = await receive()
+        if event["type"] != "websocket.connect":
+            return
+        await send({"type": "websocket.accept"})
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        hub = get_hub()
+        sub = hub.subscribe(wake=lambda: loop.call_soon_threadsafe(ready.set))
+        window = coalesce_window()
+
+        async def pump():
+            while True:
+                await ready.wait()
+                await asyncio.sleep(window)
+                ready.clear()
+                msg = sub.next_message(timeout=0)
+                if msg is not None:
+                    await send({"type": "websocket.send", "text": json.dumps(msg)})
+
+        pump_task = asyncio.create_task(pump())
+        try:
+            while (await receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            hub.unsubscribe(sub)
+            pump_task.cancel()
+
+    async def lifespan(receive, send):
+        while True:
+            event = await receive()
+            if event["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif event["type"] == "lifespan.shutdown":
+                pool.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def app(scope, receive, send):
+        kind = scope["type"]
+        if kind == "lifespan":
+            await lifespan(receive, send)
+        elif kind == "websocket" and scope.get("path") == WS_PATH:
+            await ai_socket(scope, receive, send)
+        elif kind == "websocket" and scope.get("path") == FEED_PATH:
+            await feed_socket(scope, receive, send)
+        elif kind == "websocket":
+            await send({"type": "websocket.close", "code": 4404})
+        elif http_app is not None:
+            await http_app(scope, receive, send)
+        else:
+            await send({"type": "http.response.start", "status": 501,
+                        "headers": [(b"content-type", b"text/plain")]})
+            await send({"type": "http.response.body", "body": b"install asgiref to serve HTTP routes over ASGI"})
+
+    app.pool = pool
+    return app
@@ -0,0 +1,150 @@
+import json
+import re
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+from flask import current_app, render_template
+from .. import ratelimit as limits
+from ..db import db
+from ..models import Task
+from ..search import title_candidates
+from ..services.ai_router import AIRouter, fast_path_stats
+from ..services.rules import title_from_fragment
+from ..utils.logging import redact_pii
+
+if TYPE_CHECKING:
+    from .preview import PreviewSession
+
+
+# One console message -> the phases sent back to the client. Shared by the
+# flask-sock handler (ai_ws.py) and the asyncio/ASGI handler (asgi.py); both
+# run it inside an app context on a worker thread.
+
+MAX_FRAGMENTS = 10
+
+
+def split_fragments(utterance: str) -> List[str]:
+    # Comma, semicolon, or plus as loose list separators
+    fragments = [p.strip() for p in re.split(r"[,;]|\s\+\s", utterance) if p and p.strip()]
+    return (fragments or [utterance])[:MAX_FRAGMENTS]
+
+
+def handle_message(
+    raw: str,
+    remote_addr: Optional[str],
+    router: Optional[AIRouter] = None,
+    previews: Optional["PreviewSession"] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield response phases for one raw console message.
+
+    A ``request_id`` in the message is echoed on every phase, so clients
+    can keep several utterances in flight on one socket. ``{"type":
+    "preview"}`` messages are handed to ``previews`` and answered from there.
+    """
+    try:
+        data = json.loads(raw)
+    except Exception:
+        yield {"phase": "error", "message": "invalid_json"}
+        return
+    if not isinstance(data, dict):
+        yield {"phase": "error", "message": "invalid_json"}
+        return
+    rid = data.get("request_id")
+    if data.get("type") == "preview":
+        utterance = (data.get("utterance") or "").strip()
+        tz = (data.get("context") or {}).get("now_tz") or "Asia/Kuwait"
+        if previews is not None and utterance:
+            # A preview is the parse a matching submit will reuse, so it pays for it
+            ok, retry_after = limits.check(remote_addr, cost=len(split_fragments(utterance)))
+            if not ok:
+                msg = {"phase": "error", "message": "rate_limited", "retry_after": retry_after}
+                if rid is not None:
+                    msg["request_id"] = rid
+                yield msg
+                return
+            previews.start(utterance, tz, rid)
+        return
+    for msg in _phases(data, remote_addr, router or AIRouter(), previews):
+        if rid is not None:
+            msg["request_id"] = rid
+        yield msg
+
+
+def _phases(
+    data: Dict[str, Any],
+    remote_addr: Optional[str],
+    router: AIRouter,
+    previews: Optional["PreviewSession"] = None,
+) -> Iterator[Dict[str, Any]]:
+    choose_id = data.get("choose_id")
+    utterance = (data.get("utterance") or "").strip()
+    tz = (data.get("context") or {}).get("now_tz") or "Asia/Kuwait"
+    if not utterance:
+        yield {"phase": "error", "message": "empty_utterance"}
+        return
+    fragments = split_fragments(utterance)
+    # A finished preview of exactly this text stands in for the parse (and was paid for)
+    results = previews.take(utterance, tz) if previews is not None and not choose_id else None
+    if results is None:
+        # Same bucket as /api/ai/interpret; each fragment is its own parse
+        ok, retry_after = limits.check(remote_addr, cost=len(fragments))
+        if not ok:
+            yield {"phase": "error", "message": "rate_limited", "retry_after": retry_after}
+            return
+    yield {"phase": "thinking"}
+
+    if results is not None:
+        for _, _, timings in results:
+            fast_path_stats.record(timings, router.concurrent)
+    else:
+        titles = [title_from_fragment(frag) for frag in fragments]
+        results = (
+            (idx, parsed, router.last_timings)
+            for idx, parsed in router.build_actions(fragments, tz=tz, user_id="demo", default_titles=titles)
+        )
+    to_apply = []
+    # Parsed phases stream back in completion order, not fragment order
+    for idx, parsed, timings in results:
+        frag = fragments[idx]
+        if choose_id:
+            parsed["target"] = {"by": "id", "value": int(choose_id)}
+        try:
+            current_app.logger.info({
+                "ws_ai": {
+                    "utterance": redact_pii(frag),
+                    "parsed": parsed,
+                    "timings_ms": timings,
+                }
+            })
+        except Exception:
+            pass
+        yield {"phase": "parsed", "fragment": idx, "json": parsed}
+        # Clarification: multiple matches by title
+        try:
+            tgt = (parsed.get("target") or {})
+            if tgt.get("by") == "title" and tgt.get("value") and parsed.get("operation") != "create":
+                matches = [m for m in title_candidates(str(tgt.get("value")), k=5) if m.strong]
+                if len(matches) > 1:
+                    yield {
+                        "phase": "need_clarification",
+                        "fragment": idx,
+                        "options": [{"id": m.id, "title": m.title, "score": m.score} for m in matches],
+                    }
+                    continue
+        except Exception:
+            pass
+        to_apply.append((idx, parsed))
+
+    if not to_apply:
+        return
+    # Apply every fragment in one transaction, in the order the user typed them
+    to_apply.sort(key=lambda p: p[0])
+    try:
+        tasks = router.apply_actions([parsed for _, parsed in to_apply])
+    except Exception as e:
+        yield {"phase": "error", "message": str(e)}
+        return
+    for task in tasks:
+        yield {"phase": "applied", "task_id": getattr(task, "id", None)}
+        t = db.session.get(Task, getattr(task, "id", None))
+        if t is not None:
+            html = render_template("tasks/item_row.html", task=t)
+            yield {"phase": "patch", "task_id": t.id, "html": html}
@@ -0,0 +1,177 @@
+"""Speculative parses of what the user is still typing.
+
+The console sends ``{"type": "preview", "utterance": ...}`` as the input
+settles. Each socket keeps one preview: a newer one cancels the last (its
+remote stages that have not started never reach HF), and after a short
+debounce the text is parsed on a small pool without applying anything.
+The result goes back as ``{"phase": "preview"}``, and the parse warms the
+hf_client caches for each fragment. When the user submits the same text
+(and timezone) the pipeline takes the preview's result instead of parsing
+again, waiting for it if it is still running. A cancelled parse keeps its
+pool thread until its current stage returns, so each socket has at most
+``max_inflight`` parses running; previews past that are skipped.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..db import db
+from ..services.ai_router import AIRouter, CancelToken
+from ..services.rules import title_from_fragment
+from .pipeline import split_fragments
+
+Result = List[Tuple[int, Dict[str, Any], Dict[str, float]]]
+
+_pool_lock = threading.Lock()
+_pool: Optional[ThreadPoolExecutor] = None
+
+_stats_lock = threading.Lock()
+_stats = {"started": 0, "cancelled": 0, "completed": 0, "reused": 0, "skipped": 0}
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers = int(os.getenv("AI_PREVIEW_WORKERS", "4"))
+                _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-preview")
+    return _pool
+
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def preview_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+class _Preview:
+    def __init__(self, utterance: str, tz: str, request_id: Any):
+        self.key = (utterance, tz)
+        self.request_id = request_id
+        self.token = CancelToken()
+        self.go = threading.Event()  # skip the rest of the debounce
+        self.done = threading.Event()
+        self.result: Optional[Result] = None
+        self.finished_at = 0.0
+
+
+class PreviewSession:
+    """The latest preview of one console socket.
+
+    ``send`` runs on the preview pool, alongside the socket's own handler,
+    so it must be thread-safe.
+    """
+
+    def __init__(
+        self,
+        flask_app,
+        send: Callable[[Dict[str, Any]], None],
+        debounce: Optional[float] = None,
+        ttl: Optional[float] = None,
+        max_inflight: Optional[int] = None,
+    ):
+        self.app = flask_app
+        self.send = send
+        self.debounce = float(os.getenv("AI_PREVIEW_DEBOUNCE_MS", "250")) / 1000.0 if debounce is None else debounce
+        self.ttl = float(os.getenv("AI_PREVIEW_TTL", "30")) if ttl is None else ttl
+        self.max_inflight = (
+            int(os.getenv("AI_PREVIEW_MAX_INFLIGHT", "2")) if max_inflight is None else max_inflight
+        )
+        self._lock = threading.Lock()
+        self._current: Optional[_Preview] = None
+        self._running = 0
+
+    def start(self, utterance: str, tz: str, request_id: Any = None) -> bool:
+        """Preview ``utterance``; False if this socket already has ``max_inflight`` running."""
+        p = _Preview(utterance, tz, request_id)
+        with self._lock:
+            old, self._current = self._current, None
+            busy = self._running >= self.max_inflight
+            if not busy:
+                self._current = p
+                self._running += 1
+        if old is not None:
+            self._cancel(old)
+        if busy:
+            _count("skipped")
+            return False
+        _count("started")
+        _get_pool().submit(self._run, p)
+        return True
+
+    def take(self, utterance: str, tz: str, timeout: float = 30.0) -> Optional[Result]:
+        """The preview result for exactly this text, or None (a stale preview is cancelled)."""
+        with self._lock:
+            p, self._current = self._current, None
+        if p is None:
+            return None
+        if p.key != (utterance, tz):
+            self._cancel(p)
+            return None
+        p.go.set()
+        if not p.done.wait(timeout) or p.result is None:
+            return None
+        if time.monotonic() - p.finished_at > self.ttl:
+            return None
+        _count("reused")
+        return p.result
+
+    def close(self):
+        with self._lock:
+            p, self._current = self._current, None
+        if p is not None:
+            self._cancel(p)
+
+    def _cancel(self, p: _Preview):
+        if not p.done.is_set():
+            _count("cancelled")
+        p.token.cancel()
+        p.go.set()
+
+    def _run(self, p: _Preview):
+        try:
+            p.go.wait(self.debounce)
+            if p.token.cancelled:
+                return
+            utterance, tz = p.key
+            fragments = split_fragments(utterance)
+            titles = [title_from_fragment(frag) for frag in fragments]
+            # counted when a submit reuses it, not here: most previews are dropped
+            router = AIRouter(record_stats=False)
+            result: Result = []
+            with self.app.app_context():
+                try:
+                    for idx, parsed in router.build_actions(
+                        fragments, tz=tz, user_id="demo", default_titles=titles, cancel=p.token
+                    ):
+                        result.append((idx, parsed, router.last_timings))
+                finally:
+                    db.session.remove()
+            if p.token.cancelled or len(result) != len(fragments):
+                return
+            p.result = result
+            p.finished_at = time.monotonic()
+            _count("completed")
+            msg: Dict[str, Any] = {
+                "phase": "preview",
+                "utterance": utterance,
+                "fragments": [parsed for _, parsed, _ in sorted(result, key=lambda r: r[0])],
+            }
+            if p.request_id is not None:
+                msg["request_id"] = p.request_id
+            try:
+                self.send(msg)
+            except Exception:
+                pass
+        except Exception:
+            p.result = None
+        finally:
+            with self._lock:
+                self._running -= 1
+            p.done.set()
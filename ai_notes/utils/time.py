@@ -1,11 +1,169 @@
-from datetime import datetime
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Optional
 from dateutil import parser, tz
 
 
-def parse_natural_datetime(text: str, default_tz: str = "Asia/Kuwait"):
-    # Uses dateutil for simple expressions; callers must handle ambiguity
-    local = tz.gettz(default_tz)
-    dt = parser.parse(text, fuzzy=True, default=datetime.now(local))
+# Relative dates are resolved by a small rule engine against the caller's
+# local clock; only text it does not cover (month names, numeric dates,
+# anything without a day or time phrase) goes to dateutil's fuzzy parser.
+#
+#   today, tonight (20:00), tomorrow, day after tomorrow, next week
+#   <weekday> (today counts), this <weekday>, next <weekday> (today does not)
+#   before <weekday>  -> 23:59 on that day
+#   this morning / afternoon / evening  -> 09:00 / 15:00 / 19:00
+#   in N minutes|hours|days|weeks
+#   9:30, 21:15, 9am, 9:30 pm, noon
+#
+# A day without a time keeps the current local time of day, like dateutil's
+# default did; a time without a day is today.
+
+_WEEKDAYS = {
+    "monday": 0, "mon": 0, "tuesday": 1, "tues": 1, "tue": 1, "wednesday": 2, "wed": 2,
+    "thursday": 3, "thurs": 3, "thur": 3, "thu": 3, "friday": 4, "fri": 4,
+    "saturday": 5, "sat": 5, "sunday": 6, "sun": 6,
+}
+_WEEKDAY_RE = "|".join(sorted(_WEEKDAYS, key=len, reverse=True))
+_PARTS = {"morning": 9, "afternoon": 15, "evening": 19}
+
+_DAY = re.compile(
+    rf"""
+      (?P<before>before\s+(?P<bday>monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b)
+    | \b(?P<dat>day\s+after\s+tomorrow)\b
+    | \bthis\s+(?P<part>morning|afternoon|evening)\b
+    | \b(?:(?P<rel>next|this)\s+)?(?P<wday>{_WEEKDAY_RE})\b
+    | \b(?P<next_week>next\s+week)\b
+    | \b(?P<word>today|tonight|tomorrow|tmrw)\b
+    | \bin\s+(?P<n>\d+)\s*(?P<unit>minutes?|mins?|m|hours?|hrs?|h|days?|d|weeks?|w)\b
+    """,
+    re.I | re.X,
+)
+_TIME = re.compile(
+    r"\b(?P<h>\d{1,2}):(?P<m>\d{2})\s*(?P<ap>am|pm)?\b"
+    r"|\b(?P<h2>\d{1,2})\s*(?P<ap2>am|pm)\b"
+    r"|\b(?P<noon>noon)\b",
+    re.I,
+)
+# Absolute dates are dateutil's job
+_ABSOLUTE = re.compile(
+    r"\b(jan(uary)?|feb(ruary)?|mar(ch)?|apr(il)?|may|june?|july?|aug(ust)?|sept?(ember)?|oct(ober)?"
+    r"|nov(ember)?|dec(ember)?)\b|\d{4}-\d{1,2}-\d{1,2}|\b\d{1,2}/\d{1,2}\b|\b\d{1,2}(st|nd|rd|th)\b",
+    re.I,
+)
+
+
+@lru_cache(maxsize=64)
+def get_zone(name: Optional[str]):
+    """tzinfo for an IANA name, UTC when the name is unknown."""
+    return tz.gettz(name) or tz.UTC
+
+
+def uses_current_time(text: str) -> bool:
+    """Whether ``text`` names a day but no clock time, so its parse keeps the
+    current local HH:MM (and changes from one minute to the next)."""
+    if _TIME.search(text):
+        return False
+    days = list(_DAY.finditer(text))
+    if days:
+        return not any(
+            m.group("before") or m.group("part") or (m.group("word") or "").lower() == "tonight"
+            for m in days
+        )
+    return bool(_ABSOLUTE.search(text))
+
+
+def _weekday_on_or_after(day: date, weekday: int, strict: bool = False) -> date:
+    ahead = (weekday - day.weekday()) % 7
+    if strict and ahead == 0:
+        ahead = 7
+    return day + timedelta(days=ahead)
+
+
+def _clock(m: "re.Match") -> Optional[tuple]:
+    if m.group("noon"):
+        return 12, 0
+    if m.group("h2") is not None:
+        hour, minute, ap = int(m.group("h2")), 0, m.group("ap2")
+    else:
+        hour, minute, ap = int(m.group("h")), int(m.group("m")), m.group("ap")
+    if ap:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if ap.lower() == "pm" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return hour, minute
+
+
+def parse_relative(text: str, zone, now: datetime) -> Optional[datetime]:
+    """Resolve the relative day/time phrases in ``text``; None if there are none."""
+    if _ABSOLUTE.search(text):
+        return None
+    day_m = None
+    for m in _DAY.finditer(text):
+        if m.group("before"):
+            day_m = m
+            break
+        if day_m is None:
+            day_m = m
+    time_m = _TIME.search(text)
+    if day_m is None and time_m is None:
+        return None
+
+    local = now.astimezone(zone)
+    day = local.date()
+    hour, minute = local.hour, local.minute
+    if day_m is not None:
+        if day_m.group("before"):
+            day = _weekday_on_or_after(day, _WEEKDAYS[day_m.group("bday").lower()])
+            return datetime(day.year, day.month, day.day, 23, 59, tzinfo=zone)
+        if day_m.group("n"):
+            n, unit = int(day_m.group("n")), day_m.group("unit")[0].lower()
+            if unit in "mh":
+                delta = timedelta(minutes=n) if unit == "m" else timedelta(hours=n)
+                # exact instant; a clock time elsewhere in the text does not apply
+                return (now + delta).astimezone(zone).replace(second=0, microsecond=0)
+            day += timedelta(days=n) if unit == "d" else timedelta(weeks=n)
+        elif day_m.group("wday"):
+            strict = (day_m.group("rel") or "").lower() == "next"
+            day = _weekday_on_or_after(day, _WEEKDAYS[day_m.group("wday").lower()], strict)
+        elif day_m.group("part"):
+            hour, minute = _PARTS[day_m.group("part").lower()], 0
+        elif day_m.group("dat"):
+            day += timedelta(days=2)
+        elif day_m.group("next_week"):
+            day += timedelta(weeks=1)
+        else:
+            word = day_m.group("word").lower()
+            if word in ("tomorrow", "tmrw"):
+                day += timedelta(days=1)
+            elif word == "tonight":
+                hour, minute = 20, 0
+    if time_m is not None:
+        clock = _clock(time_m)
+        if clock is None:
+            return None
+        hour, minute = clock
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=zone)
+
+
+def parse_natural_datetime(text: str, default_tz: str = "Asia/Kuwait", now: Optional[datetime] = None):
+    # Relative phrases are resolved by the rules above; callers must handle ambiguity
+    local = get_zone(default_tz)
+    if now is None:
+        now = datetime.now(local)
+    elif now.tzinfo is None:
+        now = now.replace(tzinfo=tz.UTC)
+    dt = parse_relative(text, local, now)
+    if dt is not None:
+        return dt
+    default = now.astimezone(local).replace(second=0, microsecond=0)
+    time_m = _TIME.search(text)
+    if time_m and not time_m.group("m"):
+        # dateutil fills unstated fields from the default: "5pm" is 17:00, not 17:<now>
+        default = default.replace(minute=0)
+    dt = parser.parse(text, fuzzy=True, default=default)
     if not dt.tzinfo:
         dt = dt.replace(tzinfo=local)
     return dt
@@ -15,4 +173,3 @@ def to_utc_iso(dt: datetime) -> str:
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=tz.UTC)
     return dt.astimezone(tz.UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
-
@@ -1,10 +1,13 @@
 import os
 from dotenv import load_dotenv
-from flask import Flask, render_template, request
+from flask import Flask, render_template, request, url_for
 from ai_notes.db import init_db, db
 from ai_notes.scheduler import init_scheduler
+from ai_notes.services.feed import init_feed
+from ai_notes.services.hf_client import warmup as warmup_inference
 from ai_notes.routes import bp as routes_bp
 from ai_notes.api import bp as api_bp
+from ai_notes.queries import filtered_tasks, paginate, task_stats
 from ai_notes.sockets.ai_ws import sock, bp as ws_bp
 
 
@@ -21,9 +24,13 @@ def create_app():
     )
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-secret")
+    app.config["AUTO_MIGRATE"] = os.getenv("AUTO_MIGRATE", "1").lower() not in {"0", "false", "no", "off"}
 
     init_db(app)
     init_scheduler(app)
+    init_feed(app)
+    # Load the inference backend (AI_BACKEND) once per process, before the first request
+    warmup_inference()
 
     # Blueprints
     app.register_blueprint(routes_bp)
@@ -33,54 +40,41 @@ def create_app():
 
     @app.route("/")
     def index():
-        from ai_notes.models import Task
-        from sqlalchemy import asc
-
         status_f = request.args.get("status") or ""
         priority_f = request.args.get("priority") or ""
         q_text = request.args.get("q") or ""
+        tag_f = (request.args.get("tag") or "").strip()
         sort = request.args.get("sort") or "deadline"
+        cursor = request.args.get("cursor") or None
 
-        q = Task.query
-        if status_f in {"pending", "in_progress", "done"}:
-            q = q.filter(Task.status == status_f)
-        if priority_f in {"low", "medium", "high", "urgent"}:
-            q = q.filter(Task.priority == priority_f)
-        if q_text:
-            like = f"%{q_text}%"
-            q = q.filter((Task.title.ilike(like)) | (Task.description.ilike(like)))
-
-        if sort == "deadline":
-            q = q.order_by(Task.deadline_utc.asc().nullslast())
-        elif sort == "created_desc":
-            q = q.order_by(Task.created_at.desc())
-        elif sort == "title":
-            q = q.order_by(asc(Task.title))
-        elif sort == "priority":
-            order_map = {"low": 0, "medium": 1, "high": 2, "urgent": 3}
-            # emulate priority order client-side in template; fallback server order by title
-            q = q.order_by(asc(Task.title))
-        else:
-            q = q.order_by(Task.deadline_utc.asc().nullslast())
+        q, rank = filtered_tasks(status_f, priority_f, q_text, tag_f)
+        tasks, next_cursor = paginate(q, sort, rank=rank, cursor=cursor)
+        next_url = None
+        if next_cursor:
+            next_url = url_for(
+                "index", status=status_f or None, priority=priority_f or None,
+                q=q_text or None, tag=tag_f or None, sort=sort, cursor=next_cursor,
+            )
 
-        tasks = q.all()
+        # Infinite scroll: later pages only need the cards and the next sentinel
+        if cursor and request.headers.get("HX-Request"):
+            return render_template("tasks/page.html", tasks=tasks, next_url=next_url)
 
         # counts (unfiltered) for quick stats
-        total = Task.query.count()
-        pending_c = Task.query.filter(Task.status == "pending").count()
-        prog_c = Task.query.filter(Task.status == "in_progress").count()
-        done_c = Task.query.filter(Task.status == "done").count()
+        stats = task_stats()
 
         return render_template(
             "index.html",
             tasks=tasks,
-            total=total,
-            pending_c=pending_c,
-            prog_c=prog_c,
-            done_c=done_c,
+            next_url=next_url,
+            total=stats["total"],
+            pending_c=stats["pending"],
+            prog_c=stats["in_progress"],
+            done_c=stats["done"],
             status_f=status_f,
             priority_f=priority_f,
             q_text=q_text,
+            tag_f=tag_f,
             sort=sort,
         )
 
@@ -0,0 +1,9 @@
+"""ASGI entry point: ``uvicorn --ws wsproto asgi:application``.
+
+/ws/ai runs on the event loop (ai_notes/sockets/asgi.py); every other
+route is served by the Flask app via asgiref.
+"""
+from app import app
+from ai_notes.sockets.asgi import create_asgi_app
+
+application = create_asgi_app(app)
@@ -0,0 +1,68 @@
+"""Deadline parsing: fuzzy dateutil over the whole utterance vs the rule engine.
+
+    python bench/bench_dates.py --n 20000
+
+``legacy`` is parse_natural_datetime as it was (tz.gettz + dateutil fuzzy
+parse on every call); ``rules`` is the current one, which only falls back to
+dateutil for text without relative phrases. Each utterance is parsed in each
+of the timezones the Streamlit demo offers. Single thread.
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+from datetime import datetime
+from dateutil import parser, tz
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ai_notes.utils.time import parse_natural_datetime  # noqa: E402
+
+ZONES = ["Asia/Kuwait", "UTC", "Asia/Dubai", "Europe/London", "America/New_York"]
+CORPUS = [
+    "create 'Pay rent' tomorrow 9am high, alert 1h",
+    "add 'Write report' next friday 30m urgent",
+    "move 'standup' to 9:30",
+    "'Gym' today 6pm 45 min alerts 12h and 1h",
+    "create 'Dentist' before sunday",
+    "new task 'call mom' this evening low priority",
+    "update 'Book flights' deadline monday 17:00",
+    "add 'Read paper' tonight 1 hour normal",
+    "remind me about 'water plants' in 2 hours",
+    "Move the Rise email to Friday 9:30, set high, 20m, alert 1h",
+    "'Dinner' day after tomorrow 8 pm",
+    "'Quarterly review' March 20 5pm",
+]
+
+
+def legacy(text, default_tz):
+    local = tz.gettz(default_tz)
+    dt = parser.parse(text, fuzzy=True, default=datetime.now(local))
+    if not dt.tzinfo:
+        dt = dt.replace(tzinfo=local)
+    return dt
+
+
+def bench(name, fn, items):
+    started = time.perf_counter()
+    errors = 0
+    for text, zone in items:
+        try:
+            fn(text, zone)
+        except (ValueError, OverflowError):
+            errors += 1
+    wall = time.perf_counter() - started
+    print(f"{name:>7}: {len(items)} parses in {wall:.3f}s, {len(items) / wall:,.0f}/s, "
+          f"{wall / len(items) * 1e6:.1f} us each, {errors} unparsed")
+    return wall
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=20000)
+    args = ap.parse_args()
+    items = list(itertools.islice(itertools.cycle(itertools.product(CORPUS, ZONES)), args.n))
+    old = bench("legacy", legacy, items)
+    new = bench("rules", lambda t, z: parse_natural_datetime(t, default_tz=z), items)
+    print(f"speedup x{old / new:.2f}")
@@ -0,0 +1,91 @@
+"""Per-field task routes: ORM load/commit/reload vs one UPDATE ... RETURNING.
+
+    python bench/bench_routes.py --n 2000
+
+Runs on a throwaway SQLite file. ``legacy`` is the old handler body
+(get_or_404, set the attribute, commit, on_task_changed, render the row
+from the expired instance); ``lean`` is the current route. Both render
+tasks/item_row.html as an htmx request would. Reports statements per
+request and latency percentiles. Single thread.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'routes.db')}",
+    AI_BACKEND="local", SCHEDULER_MODE="local",
+)
+
+from flask import render_template  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from app import create_app  # noqa: E402
+from ai_notes.db import db  # noqa: E402
+from ai_notes.models import Task  # noqa: E402
+from ai_notes.scheduler import on_task_changed  # noqa: E402
+
+PRIORITIES = ["low", "medium", "high", "urgent"]
+
+
+def legacy(app, task_id, i):
+    t = Task.query.get_or_404(task_id)
+    t.priority = PRIORITIES[i % 4]
+    db.session.commit()
+    on_task_changed(t)
+    return render_template("tasks/item_row.html", task=t)
+
+
+def lean(app, task_id, i):
+    return app.view_functions["routes.set_priority"](task_id)
+
+
+def run(app, name, fn, ids, n):
+    statements = []
+
+    def count(*_):
+        statements.append(1)
+
+    times = []
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        for i in range(n):
+            task_id = ids[i % len(ids)]
+            with app.test_request_context(
+                f"/tasks/{task_id}/priority", method="POST",
+                data={"priority": PRIORITIES[i % 4]}, headers={"HX-Request": "true"},
+            ):
+                started = time.perf_counter()
+                fn(app, task_id, i)
+                db.session.remove()
+                times.append(time.perf_counter() - started)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+    times.sort()
+    pct = lambda p: times[min(len(times) - 1, int(p * len(times)))] * 1000  # noqa: E731
+    print(f"{name:>7}: {len(statements) / n:.1f} statements/request, "
+          f"p50 {pct(0.5):.2f} ms, p99 {pct(0.99):.2f} ms")
+    return pct(0.99)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=2000)
+    ap.add_argument("--tasks", type=int, default=200)
+    args = ap.parse_args()
+    app = create_app()
+    with app.app_context():
+        for i in range(args.tasks):
+            t = Task(title=f"bench {i}")
+            t.set_tags(["bench", f"t{i % 7}"])
+            t.set_notify_offsets([15, 60])
+            db.session.add(t)
+        db.session.commit()
+        ids = [i for (i,) in db.session.query(Task.id)]
+        db.session.remove()
+        old = run(app, "legacy", legacy, ids, args.n)
+        new = run(app, "lean", lean, ids, args.n)
+    print(f"p99 x{old / new:.2f}")
@@ -0,0 +1,127 @@
+"""Rule extraction throughput: per-rule regexes vs the single-pass scanner.
+
+    python bench/bench_rules.py                 # both, 20k utterances each
+    python bench/bench_rules.py --n 100000 --check
+
+``legacy`` is the extractor as it was before services/rules.py (one
+re.search/re.finditer/re.sub per rule, f-string patterns per priority);
+``scan`` is rules.scan_utterance with its result cache disabled, so every
+call does the full tokenize. Single thread, so the numbers are per core.
+``--check`` also compares every field of both over a generated corpus.
+"""
+import argparse
+import itertools
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ai_notes.services import rules  # noqa: E402
+
+CORPUS = [
+    "create 'Pay rent' tomorrow 9am high, alert 1h",
+    "add 'Write report' next friday 30m urgent, remind me 2 hours before",
+    "move 'standup' to 9:30 in progress",
+    "'Gym' today 6pm 45 min alerts 12h and 1h",
+    "create 'Dentist' before sunday maybe",
+    "finish 'slides' fri or sat, 15m prior",
+    "new task 'call mom' this evening low priority notify 10 minutes before",
+    "'Taxes' asap, idk when",
+    "update 'Book flights' to ongoing and set deadline monday 17:00",
+    "add 'Read paper' tonight 1 hour normal",
+    "remind me about 'water plants' every 2 hours",
+    "create 'Budget review' next week, 90 mins, medium, alarm 30m",
+]
+
+_PIECES = [
+    ["create 'x'", "add 'Plan trip'", "'Groceries'", "update 'Report' to"],
+    ["tomorrow", "today", "next monday", "before friday", "this afternoon", "fri or sat", ""],
+    ["9am", "10:30", "5 pm", "", "maybe"],
+    ["20m", "2 hours", "1h before", "45 minutes", "3 hrs", ""],
+    ["high", "urgent", "asap", "low", ""],
+    ["alert 1h", "reminders 12h, 30m", "notify 15 min", "in progress", ""],
+]
+
+
+def corpus(n):
+    base = CORPUS + [" ".join(p for p in combo if p) for combo in itertools.product(*_PIECES)]
+    return list(itertools.islice(itertools.cycle(base), n))
+
+
+# --- reference: the rules as they were -------------------------------------
+
+PRIORITY_MAP = rules.PRIORITY_MAP
+
+
+def legacy(u):
+    out = {}
+    m = re.search(r"\b(\d+)\s*(min|m|minutes|hour|h|hours)\b", u, re.I)
+    out["duration"] = (int(m.group(1)) * (60 if m.group(2).lower().startswith("h") else 1)) if m else None
+    out["priority"] = None
+    for k, v in PRIORITY_MAP.items():
+        if re.search(rf"\b{k}\b", u, re.I):
+            out["priority"] = v
+            break
+    out["status"] = "in_progress" if re.search(r"\b(in\s*progress|ongoing)\b", u, re.I) else None
+    mins = []
+    kw = re.search(r"\b(alerts?|notif(y|ies|ication|ications)|remind(ers?)?|alarms?)\b", u, re.I)
+    if kw:
+        for m in re.finditer(r"(\d+)\s*(h|hour|hours|m|min|minute)s?", u[kw.start():], re.I):
+            mins.append(int(m.group(1)) * (60 if m.group(2).lower().startswith("h") else 1))
+    for m in re.finditer(r"(\d+)\s*(h|hour|hours|m|min|minute)s?\s*(before|prior)\b", u, re.I):
+        mins.append(int(m.group(1)) * (60 if m.group(2).lower().startswith("h") else 1))
+    out["alerts"] = tuple(sorted(set(mins)))
+    out["ambiguous_day"] = bool(re.search(
+        r"\bmaybe\b|\b(mon|tue|wed|thu|fri|sat|sun)\b\s*or\s*\b(mon|tue|wed|thu|fri|sat|sun)\b", u, re.I))
+    rem = re.sub(r"\b(alerts?|notify|remind|alarm)s?\b[\s\S]*$", "", u, flags=re.I)
+    rem = re.sub(r"\b(\d+)\s*(h|hour|hours|m|min|minute)s?(\s*(before|prior))?\b", "", rem, flags=re.I)
+    rem = re.sub(r"\b(tomorrow|today|tonight|this\s+afternoon|this\s+evening|next\s+\w+|monday|tuesday|wednesday"
+                 r"|thursday|friday|saturday|sunday|\d{1,2}:\d{2}|\d{1,2}\s*(am|pm))\b", "", rem, flags=re.I)
+    out["description"] = re.sub(r"\s+", " ", rem).strip(" .,-") or None
+    t = u.strip()
+    t = re.sub(r"\b(idk\s+when|maybe|asap)\b", "", t, flags=re.I)
+    t = re.sub(r"\b(before\s+\w+)\b", "", t, flags=re.I)
+    t = re.sub(r"\b(\d{1,2}:\d{2}|\d{1,2}\s*(am|pm))\b", "", t, flags=re.I)
+    out["title"] = re.sub(r"\s+", " ", t).strip(" .,-") or u.strip()
+    return out
+
+
+def scan(u):
+    return rules.scan_utterance.__wrapped__(u)._asdict()
+
+
+def check(items):
+    bad = 0
+    for u in dict.fromkeys(items):
+        a, b = legacy(u), scan(u)
+        if a != b:
+            bad += 1
+            print(f"MISMATCH {u!r}\n  legacy {a}\n  scan   {b}")
+    print(f"parity: {len(dict.fromkeys(items)) - bad} identical, {bad} different")
+    return bad
+
+
+def bench(name, fn, items):
+    fn(items[0])
+    started = time.perf_counter()
+    for u in items:
+        fn(u)
+    wall = time.perf_counter() - started
+    print(f"{name:>7}: {len(items)} utterances in {wall:.3f}s, {len(items) / wall:,.0f}/s, "
+          f"{wall / len(items) * 1e6:.1f} us each")
+    return wall
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=20000)
+    ap.add_argument("--check", action="store_true")
+    args = ap.parse_args()
+    items = corpus(args.n)
+    if args.check and check(items):
+        sys.exit(1)
+    old = bench("legacy", legacy, items)
+    new = bench("scan", scan, items)
+    print(f"speedup x{old / new:.2f}")
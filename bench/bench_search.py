@@ -0,0 +1,87 @@
+"""Compare the old LIKE filter with the FTS5 search index.
+
+    python bench/bench_search.py 10000 100000 1000000
+
+Each size seeds a fresh SQLite file under a temp dir (triggers keep the
+index in sync while seeding) and times the index-page search query.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+WORDS = (
+    "report email slides budget review taxes gym call plan trip launch draft invoice "
+    "client meeting design sprint hiring onboarding roadmap dentist groceries renew "
+    "insurance quarterly weekly research giveaway grade students project car reg"
+).split()
+
+
+def _seed(conn, n):
+    rnd = random.Random(42)
+    rows, tags = [], []
+    for i in range(1, n + 1):
+        title = " ".join(rnd.sample(WORDS, 3)) + f" {i}"
+        desc = " ".join(rnd.choices(WORDS, k=12))
+        rows.append((i, title, desc, "pending", "medium"))
+        tags += [(i, t) for t in rnd.sample(WORDS, 2)]
+        if len(rows) == 10000:
+            _flush(conn, rows, tags)
+            rows, tags = [], []
+    if rows:
+        _flush(conn, rows, tags)
+
+
+def _flush(conn, rows, tags):
+    conn.exec_driver_sql(
+        "INSERT INTO task (id, title, description, status, priority) VALUES (?, ?, ?, ?, ?)", rows
+    )
+    conn.exec_driver_sql("INSERT INTO task_tag (task_id, tag) VALUES (?, ?)", tags)
+
+
+def _time(fn, repeat=5):
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000.0
+
+
+def run(n):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from app import create_app
+    from ai_notes.db import db
+    from ai_notes.models import Task
+    from ai_notes.search import apply_search
+
+    app = create_app()
+    with app.app_context():
+        with db.engine.begin() as conn:
+            _seed(conn, n)
+        # broad (matches ~40% of rows), two-word prefix, and a selective lookup
+        for query in ("budget", "quarterly rev", "dentist insurance", str(n // 2)):
+            like = f"%{query}%"
+
+            def old():
+                return Task.query.filter(
+                    Task.title.ilike(like) | Task.description.ilike(like)
+                ).order_by(Task.deadline_utc.asc().nullslast()).limit(50).all()
+
+            def fts():
+                q, rank = apply_search(Task.query, query)
+                return q.order_by(rank.asc()).limit(50).all()
+
+            print(f"{n:>8} rows  {query!r:22} LIKE {_time(old):9.2f} ms   FTS5/bm25 {_time(fts):9.2f} ms")
+        db.session.remove()
+        db.engine.dispose()
+
+
+if __name__ == "__main__":
+    for size in [int(a) for a in sys.argv[1:]] or [10000, 100000]:
+        run(size)
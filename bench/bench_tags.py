@@ -0,0 +1,87 @@
+"""Tag filtering and offset loading: legacy CSV columns vs task_tag/task_notification.
+
+    python bench/bench_tags.py 100000 500000
+
+Both layouts live side by side in one temp SQLite file so the numbers
+compare storage only, not ORM overhead.
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+TAGS = [f"tag{i}" for i in range(200)]
+
+
+def _seed(conn, n):
+    rnd = random.Random(7)
+    conn.executescript(
+        """
+        CREATE TABLE task_csv (id INTEGER PRIMARY KEY, title TEXT, tags TEXT, notify_offsets_minutes TEXT);
+        CREATE TABLE task (id INTEGER PRIMARY KEY, title TEXT);
+        CREATE TABLE task_tag (task_id INTEGER, tag TEXT, PRIMARY KEY (task_id, tag));
+        CREATE INDEX ix_task_tag_tag_task ON task_tag (tag, task_id);
+        CREATE TABLE task_notification (task_id INTEGER, offset_minutes INTEGER, PRIMARY KEY (task_id, offset_minutes));
+        """
+    )
+    csv, plain, tags, notifs = [], [], [], []
+    for i in range(1, n + 1):
+        t = rnd.sample(TAGS, 3)
+        offs = sorted(rnd.sample([0, 15, 60, 120, 720, 1440], 2))
+        csv.append((i, f"task {i}", ",".join(t), ",".join(map(str, offs))))
+        plain.append((i, f"task {i}"))
+        tags += [(i, x) for x in t]
+        notifs += [(i, o) for o in offs]
+    conn.executemany("INSERT INTO task_csv VALUES (?, ?, ?, ?)", csv)
+    conn.executemany("INSERT INTO task VALUES (?, ?)", plain)
+    conn.executemany("INSERT INTO task_tag VALUES (?, ?)", tags)
+    conn.executemany("INSERT INTO task_notification VALUES (?, ?)", notifs)
+    conn.commit()
+
+
+def _time(fn, repeat=5):
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000.0
+
+
+def run(n):
+    conn = sqlite3.connect(os.path.join(tempfile.mkdtemp(), "tags.db"))
+    _seed(conn, n)
+
+    def csv_filter():
+        # the CSV layout can only scan and re-split every row
+        rows = conn.execute("SELECT id, tags FROM task_csv WHERE tags LIKE '%tag42%'").fetchall()
+        return [r[0] for r in rows if "tag42" in [t.strip() for t in r[1].split(",")]]
+
+    def child_filter():
+        return conn.execute(
+            "SELECT t.id FROM task t WHERE t.id IN (SELECT task_id FROM task_tag WHERE tag = 'tag42')"
+        ).fetchall()
+
+    ids = list(range(1, n + 1, max(1, n // 30)))[:30]
+    marks = ",".join("?" * len(ids))
+
+    def csv_page():
+        rows = conn.execute(f"SELECT id, tags, notify_offsets_minutes FROM task_csv WHERE id IN ({marks})", ids).fetchall()
+        return [([t.strip() for t in a.split(",")], [int(x) for x in b.split(",")]) for _, a, b in rows]
+
+    def child_page():
+        tags = conn.execute(f"SELECT task_id, tag FROM task_tag WHERE task_id IN ({marks})", ids).fetchall()
+        offs = conn.execute(f"SELECT task_id, offset_minutes FROM task_notification WHERE task_id IN ({marks})", ids).fetchall()
+        return tags, offs
+
+    print(f"{n:>8} rows  tag filter   CSV {_time(csv_filter):8.2f} ms   task_tag {_time(child_filter):8.2f} ms")
+    print(f"{n:>8} rows  30-row page  CSV {_time(csv_page):8.3f} ms   child    {_time(child_page):8.3f} ms")
+    conn.close()
+
+
+if __name__ == "__main__":
+    for size in [int(a) for a in sys.argv[1:]] or [100000]:
+        run(size)
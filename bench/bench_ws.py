@@ -0,0 +1,170 @@
+"""WebSocket capacity: flask-sock (thread per socket) vs the ASGI handler.
+
+    python bench/bench_ws.py sync --idle 300 --active 100
+    python bench/bench_ws.py asgi --idle 300 --active 100
+
+Starts the server in a subprocess on a throwaway SQLite file with
+AI_BACKEND=local (no network), then
+  1. opens ``--idle`` console sockets and samples the server's thread
+     count and RSS from /proc, and
+  2. sends one utterance on each of ``--active`` sockets at once and
+     times the round trip to the final "patch" phase.
+``sync`` runs app.run(threaded=True); ``asgi`` runs uvicorn --ws wsproto.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from wsproto import ConnectionType, WSConnection
+from wsproto.events import AcceptConnection, CloseConnection, Request, TextMessage
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+        self.ws = WSConnection(ConnectionType.CLIENT)
+        self._buf = ""
+        self._inbox = []
+
+    @classmethod
+    async def connect(cls, port, path="/ws/ai"):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        c = cls(reader, writer)
+        writer.write(c.ws.send(Request(host=f"127.0.0.1:{port}", target=path)))
+        await writer.drain()
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                raise ConnectionError("closed during handshake")
+            c.ws.receive_data(data)
+            for ev in c.ws.events():
+                if isinstance(ev, AcceptConnection):
+                    return c
+                c._collect(ev)
+
+    def _collect(self, ev):
+        if isinstance(ev, TextMessage):
+            self._buf += ev.data
+            if ev.message_finished:
+                self._inbox.append(json.loads(self._buf))
+                self._buf = ""
+        elif isinstance(ev, CloseConnection):
+            raise ConnectionError("closed")
+
+    async def send(self, obj):
+        self.writer.write(self.ws.send(TextMessage(data=json.dumps(obj))))
+        await self.writer.drain()
+
+    async def recv(self):
+        while not self._inbox:
+            data = await self.reader.read(65536)
+            if not data:
+                raise ConnectionError("closed")
+            self.ws.receive_data(data)
+            for ev in self.ws.events():
+                self._collect(ev)
+        return self._inbox.pop(0)
+
+    def close(self):
+        self.writer.close()
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _proc_stats(pid):
+    out = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(("Threads:", "VmRSS:")):
+                k, v = line.split(":", 1)
+                out[k] = v.strip()
+    return out
+
+
+def _start(mode, port, db_path):
+    env = dict(
+        os.environ, AI_BACKEND="local", DATABASE_URL=f"sqlite:///{db_path}",
+        RATE_LIMIT_PER_MINUTE="1000000", PYTHONPATH=ROOT,
+    )
+    if mode == "sync":
+        cmd = [sys.executable, "-c", f"from app import app; app.run(port={port}, threaded=True)"]
+    else:
+        cmd = [sys.executable, "-m", "uvicorn", "--ws", "wsproto", "--port", str(port),
+               "--log-level", "warning", "asgi:application"]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+async def _utterance(client, i):
+    started = time.perf_counter()
+    await client.send({"utterance": f"create 'bench task {i}' tomorrow 9am high", "request_id": str(i),
+                       "context": {"now_tz": "UTC"}})
+    while True:
+        msg = await client.recv()
+        if msg.get("phase") in {"patch", "error"}:
+            return (time.perf_counter() - started) * 1000.0, msg["phase"]
+
+
+async def run(mode, idle, active):
+    port = _free_port()
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_ws.db")
+    proc = _start(mode, port, db_path)
+    try:
+        base = _proc_stats(proc.pid)
+        clients, failed = [], 0
+        results = await asyncio.gather(*(Client.connect(port) for _ in range(idle)), return_exceptions=True)
+        for r in results:
+            if isinstance(r, Exception):
+                failed += 1
+            else:
+                clients.append(r)
+        await asyncio.sleep(1.0)
+        held = _proc_stats(proc.pid)
+        print(f"[{mode}] idle sockets: {len(clients)} open, {failed} failed; "
+              f"threads {base.get('Threads')} -> {held.get('Threads')}, RSS {base.get('VmRSS')} -> {held.get('VmRSS')}")
+
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *(_utterance(c, i) for i, c in enumerate(clients[:active])), return_exceptions=True
+        )
+        wall = time.perf_counter() - started
+        lat = sorted(o[0] for o in outcomes if not isinstance(o, Exception) and o[1] == "patch")
+        errs = len(outcomes) - len(lat)
+        if lat:
+            print(f"[{mode}] {len(lat)} utterances in {wall:.2f}s ({len(lat) / wall:.1f}/s), "
+                  f"p50 {lat[len(lat) // 2]:.0f} ms, p95 {lat[int(len(lat) * 0.95) - 1]:.0f} ms, errors {errs}")
+        else:
+            print(f"[{mode}] no utterance completed; errors {errs}")
+        for c in clients:
+            c.close()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("mode", choices=["sync", "asgi"])
+    ap.add_argument("--idle", type=int, default=300)
+    ap.add_argument("--active", type=int, default=100)
+    args = ap.parse_args()
+    asyncio.run(run(args.mode, args.idle, args.active))
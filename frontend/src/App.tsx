@@ -1,4 +1,4 @@
-import React, { useEffect, useMemo, useState } from 'react'
+import React, { useEffect, useState } from 'react'
 import { Toolbar } from './components/Toolbar'
 import { StatsBar } from './components/StatsBar'
 import { TaskCard } from './components/TaskCard'
@@ -13,34 +13,37 @@ const DEMO: Task[] = [
 export default function App(){
   const [tasks, setTasks] = useState<Task[]>(DEMO)
   const [filters, setFilters] = useState<{status?:string; priority?:string; sort?:string; q?:string}>({ sort: 'deadline' })
+  const [stats, setStats] = useState({ total: DEMO.length, pending: 2, inProgress: 0, done: 1 })
+  const [nextCursor, setNextCursor] = useState<string|null>(null)
 
-  const filtered = useMemo(()=>{
-    let arr = [...tasks]
-    if (filters.status) arr = arr.filter(t=>t.status===filters.status)
-    if (filters.priority) arr = arr.filter(t=>t.priority===filters.priority)
-    if (filters.q) arr = arr.filter(t=> (t.title + ' ' + (t.description||'')).toLowerCase().includes(filters.q!.toLowerCase()))
-    if (filters.sort==='title') arr.sort((a,b)=> a.title.localeCompare(b.title))
-    if (filters.sort==='created_desc') arr = arr.reverse()
-    // deadline sort basic
-    if (filters.sort==='deadline') arr.sort((a,b)=> (a.deadline_utc?Date.parse(a.deadline_utc):Infinity) - (b.deadline_utc?Date.parse(b.deadline_utc):Infinity))
-    return arr
-  }, [tasks, filters])
-
-  const stats = useMemo(()=>({
-    total: tasks.length,
-    pending: tasks.filter(t=>t.status==='pending').length,
-    inProgress: tasks.filter(t=>t.status==='in_progress').length,
-    done: tasks.filter(t=>t.status==='done').length,
-  }), [tasks])
+  // Filtering, sorting, paging and counts happen server-side (same as the index view)
+  function query(cursor?: string){
+    const params = new URLSearchParams()
+    Object.entries(filters).forEach(([k, v])=> { if (v) params.set(k, v) })
+    if (cursor) params.set('cursor', cursor)
+    return fetch('/api/tasks?' + params.toString()).then(r=> r.json())
+  }
+  useEffect(()=>{
+    query().then(body=>{
+      setTasks(body.tasks)
+      setNextCursor(body.next_cursor)
+      const s = body.stats
+      setStats({ total: s.total, pending: s.pending, inProgress: s.in_progress, done: s.done })
+    }).catch(()=>{ /* keep the demo data when the API is not running */ })
+  }, [filters])
+  function loadMore(){
+    if (!nextCursor) return
+    query(nextCursor).then(body=>{
+      setTasks(prev=> [...prev, ...body.tasks])
+      setNextCursor(body.next_cursor)
+    })
+  }
 
   function updateTask(id:number, patch: Partial<Task>){
     setTasks(prev => prev.map(t => t.id===id ? {...t, ...patch}: t))
   }
   function deleteTask(id:number){ setTasks(prev => prev.filter(t=>t.id!==id)) }
 
-  // TODO: wire to Flask API; proxy in vite.config.ts already set
-  // useEffect(()=>{ fetch('/api/tasks').then(r=>r.json()).then(setTasks) },[])
-
   return (
     <div className="max-w-7xl mx-auto p-4 space-y-4">
       <header className="flex items-start justify-between">
@@ -66,13 +69,16 @@ export default function App(){
       <StatsBar total={stats.total} pending={stats.pending} inProgress={stats.inProgress} done={stats.done} />
 
       <div className="grid grid-cols-1 sm:grid-cols-2 xl:grid-cols-3 gap-6">
-        {filtered.length===0 && (
+        {tasks.length===0 && (
           <div className="col-span-full rounded-card border bg-white p-8 text-center text-slate-500 shadow-card">No tasks match your filters.</div>
         )}
-        {filtered.map(t => (
+        {tasks.map(t => (
           <TaskCard key={t.id} task={t} onChange={(p)=> updateTask(t.id, p)} onDelete={()=> deleteTask(t.id)} />
         ))}
       </div>
+      {nextCursor && (
+        <div className="text-center"><button className="btn btn-secondary" onClick={loadMore}>Load more</button></div>
+      )}
     </div>
   )
 }
@@ -60,11 +60,33 @@ def _render_task_card(task):
     )
 
 
+def _task_snapshot():
+    """Tasks to show, kept in session state and refreshed from the change
+    journal, so a rerun only loads what changed since the last one."""
+    from ai_notes.models import Task
+    from ai_notes.queries import changes_since, has_change_journal, load_task_rows
+
+    if not has_change_journal():
+        return Task.query.order_by(Task.deadline_utc.asc().nullslast()).all()
+    rows = st.session_state.setdefault("task_rows", {})
+    since = st.session_state.get("task_version", 0)
+    more = True
+    while more:
+        entries, since, more = changes_since(since)
+        fresh = load_task_rows([task_id for _, task_id, op in entries if op == "upsert"])
+        for _, task_id, op in entries:
+            if task_id in fresh:
+                rows[task_id] = fresh[task_id]
+            else:
+                rows.pop(task_id, None)
+    st.session_state["task_version"] = since
+    return sorted(rows.values(), key=lambda t: (t.deadline_utc is None, t.deadline_utc or 0, t.id))
+
+
 def main():
     st.set_page_config(page_title="AI Notes (Streamlit)", page_icon="📝", layout="centered")
     app = _init_flask_app()
     from ai_notes.services.ai_router import AIRouter
-    from ai_notes.models import Task
 
     st.title("AI Notes – Streamlit Console")
     st.caption("Create/update tasks with natural language. Times are saved in UTC.")
@@ -87,8 +109,7 @@ def main():
                 st.error(f"Apply failed: {e}")
 
         st.subheader("Tasks")
-        tasks = Task.query.order_by(Task.deadline_utc.asc().nullslast()).all()
-        for t in tasks:
+        for t in _task_snapshot():
             _render_task_card(t)
 
 
@@ -27,3 +27,27 @@ def test_create_update_complete_flow():
         t = r.apply_action(action)
         assert t.status == "done"
 
+
+
+def test_apply_actions_single_transaction():
+    app = create_app()
+    with app.app_context():
+        from ai_notes.models import Task
+
+        r = AIRouter()
+        before = Task.query.count()
+        actions = [
+            {"operation": "create", "target": {"by": "title", "value": "Batch one"}, "fields": {}},
+            {"operation": "create", "target": {"by": "title", "value": "Batch two"}, "fields": {"priority": "low"}},
+        ]
+        tasks = r.apply_actions(actions)
+        assert [t.title for t in tasks] == ["Batch one", "Batch two"]
+        assert Task.query.count() == before + 2
+
+        # a failing action rolls the whole batch back
+        bad = actions + [{"operation": "update", "target": {"by": "id", "value": tasks[0].id}, "fields": {"estimated_duration_minutes": "soon"}}]
+        try:
+            r.apply_actions(bad)
+        except ValueError:
+            pass
+        assert Task.query.count() == before + 2
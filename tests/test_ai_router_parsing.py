@@ -19,3 +19,156 @@ def test_rule_parsing_duration_priority_notifications(monkeypatch):
     assert f["notify_offsets_minutes"] == [60]
 
 
+
+
+def test_concurrent_build_action_overlaps_remote_calls(monkeypatch):
+    import time
+
+    def slow(result):
+        def _fn(*args, **kwargs):
+            time.sleep(0.2)
+            return result
+        return _fn
+
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_zero_shot", slow(("create", {})))
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_ner", slow([]))
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_text2json", slow({"fields": {"title": "Report", "priority": "low"}}))
+
+    u = "Write report, 30m, high"
+    seq = AIRouter(concurrent=False)
+    par = AIRouter(concurrent=True)
+    expected = seq.build_action(u, tz="Asia/Kuwait", user_id="demo")
+    started = time.perf_counter()
+    parsed = par.build_action(u, tz="Asia/Kuwait", user_id="demo")
+    elapsed = time.perf_counter() - started
+
+    # deadline defaults to "now", which can tick between the two calls
+    parsed["fields"].pop("deadline_utc", None)
+    expected["fields"].pop("deadline_utc", None)
+    assert parsed == expected
+    # rules win over t2t, t2t fills gaps
+    assert parsed["fields"]["priority"] == "high"
+    assert parsed["fields"]["title"] == "Report"
+    assert elapsed < 0.45
+    assert {"intent", "ner", "t2t", "total"} <= set(par.last_timings)
+
+
+def test_concurrent_parse_skips_t2t_for_rule_deletes(monkeypatch):
+    from app import create_app
+
+    calls = []
+
+    def remote(name, result):
+        def _fn(*args):
+            calls.append(name)
+            return result
+        return _fn
+
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_ner", remote("ner", []))
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_text2json", remote("t2t", {}))
+    par = AIRouter(concurrent=True)
+
+    with create_app().app_context():
+        monkeypatch.setattr("ai_notes.services.ai_router.hf_zero_shot", remote("intent", ("delete", {})))
+        assert par.build_action("delete 'old draft zq'", tz="UTC", user_id="demo")["operation"] == "delete"
+        assert sorted(calls) == ["intent", "ner"]
+
+        # HF reads it as an edit after all: text2json still runs, just late
+        calls.clear()
+        monkeypatch.setattr("ai_notes.services.ai_router.hf_zero_shot", remote("intent", ("update", {})))
+        par.build_action("remove the alert from 'old draft zq'", tz="UTC", user_id="demo")
+        assert sorted(calls) == ["intent", "ner", "t2t"]
+
+
+def test_build_actions_streams_every_fragment(monkeypatch):
+    import time
+
+    def zero_shot(t, labels):
+        # first fragment is slowest, so it should come back last
+        time.sleep(0.2 if t.startswith("Research") else 0.01)
+        return ("create", {})
+
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_zero_shot", zero_shot)
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_ner", lambda t: [])
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_text2json", lambda p: {})
+
+    frags = ["Research project asap", "giveaway gifts", "grade students projects 30m"]
+    r = AIRouter(concurrent=True)
+    out = list(r.build_actions(frags, tz="Asia/Kuwait", default_titles=frags))
+    assert sorted(i for i, _ in out) == [0, 1, 2]
+    assert out[-1][0] == 0
+    by_idx = dict(out)
+    assert by_idx[0]["fields"]["priority"] == "urgent"
+    assert by_idx[2]["fields"]["estimated_duration_minutes"] == 30
+    assert by_idx[1]["target"] == {"by": "title", "value": "giveaway gifts"}
+
+
+def test_confident_rules_skip_hf(monkeypatch):
+    from ai_notes.services import ai_router
+    from ai_notes.services.ai_router import FastPathStats
+    from app import create_app
+
+    calls = []
+
+    def remote(result):
+        def _fn(*args):
+            calls.append(args[0])
+            return result
+        return _fn
+
+    monkeypatch.setattr(ai_router, "fast_path_stats", FastPathStats())
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_zero_shot", remote(("create", {})))
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_ner", remote([]))
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_text2json", remote({}))
+
+    r = AIRouter(concurrent=True)
+    with create_app().app_context():
+        parsed = r.build_action("Create 'Fast path' tomorrow 10am, 30m, high, alerts 1h", tz="UTC", user_id="demo")
+        assert calls == []
+        assert parsed["operation"] == "create"
+        assert parsed["target"] == {"by": "title", "value": "Fast path"}
+        assert parsed["fields"]["priority"] == "high"
+        assert parsed["fields"]["notify_offsets_minutes"] == [60]
+        assert parsed["notes"].startswith("Rule-only parse")
+        assert "fast_path" in r.last_timings and "intent" not in r.last_timings
+
+        # no leading verb, or an update without a target: ask HF
+        r.build_action("Write report, 30m, high", tz="UTC", user_id="demo")
+        r.build_action("move it to friday", tz="UTC", user_id="demo")
+        assert len(calls) == 6
+
+        # fragments mix both paths; the rule-only one comes back first
+        out = list(r.build_actions(["add 'fast path one' today", "grade projects 30m"], tz="UTC",
+                                   default_titles=["fast path one", "grade"]))
+        assert [i for i, _ in out] == [0, 1]
+
+        strict = AIRouter(concurrent=True, fast_threshold=1.01)
+        strict.build_action("Create 'Fast path' tomorrow", tz="UTC", user_id="demo")
+
+        # verbs that also start edits never skip HF: deletes, "make", creates aimed at a task
+        from ai_notes.db import db
+        from ai_notes.models import Task
+
+        existing = Task(title="Fast path budget review")
+        db.session.add(existing)
+        db.session.commit()
+        try:
+            for text in (
+                "remove the alert from 'Fast path budget review'",
+                "drop 'Fast path budget review' to low priority",
+                "delete 'Fast path budget review'",
+                "make 'Fast path budget review' urgent",
+                "add 'Fast path budget review' tomorrow",
+                "add an alert 1h to 'Fast path budget review'",
+            ):
+                parsed = r.build_action(text, tz="UTC", user_id="demo")
+                assert "fast_path" not in r.last_timings and "intent" in r.last_timings, text
+                assert not parsed["notes"].startswith("Rule-only"), text
+        finally:
+            db.session.delete(existing)
+            db.session.commit()
+
+    stats = ai_router.fast_path_stats.snapshot()
+    assert stats["parsed"] == 12 and stats["fast_path"] == 2
+    assert stats["fast_fraction"] == round(2 / 12, 4)
+    assert stats["remote_ms_avg"] is not None
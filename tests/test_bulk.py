@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from ai_notes.db import db
+from app import create_app
+
+
+def test_bulk_changes_one_transaction():
+    app = create_app()
+    with app.app_context():
+        from ai_notes.models import Task, TaskNotification
+
+        base = datetime(2032, 3, 1, 12, 0)
+        made = [Task(title=f"Bulk {i}", status="pending", priority="low", deadline_utc=base) for i in range(4)]
+        for t in made:
+            t.set_notify_offsets([30])
+        db.session.add_all(made)
+        db.session.commit()
+        # already delivered; moving the deadline must re-arm it
+        made[2].notification_rows[0].sent_at = datetime(2032, 3, 1, 11, 30)
+        db.session.commit()
+        ids = [t.id for t in made]
+        client = app.test_client()
+        try:
+            before = db.session.get(Task, ids[0]).status
+            r = client.post("/api/tasks/bulk", json={"changes": [
+                {"id": ids[0], "op": "status", "fields": {"status": "done"}},
+                {"id": ids[1], "op": "nope"},
+            ]})
+            assert r.status_code == 400 and r.get_json()["index"] == 1
+            db.session.expire_all()
+            assert db.session.get(Task, ids[0]).status == before  # nothing applied
+
+            updates = []
+
+            def count(conn, cursor, statement, params, context, executemany):
+                if statement.lstrip().upper().startswith("UPDATE TASK "):
+                    updates.append(statement)
+
+            event.listen(db.engine, "before_cursor_execute", count)
+            try:
+                r = client.post("/api/tasks/bulk", json={"html": True, "changes": [
+                    {"id": ids[0], "op": "status", "fields": {"status": "done"}},
+                    {"id": ids[1], "op": "status", "fields": {"status": "done"}},
+                    {"id": ids[2], "op": "deadline", "fields": {"deadline_utc": "2032-03-02T08:00:00Z"}},
+                    {"id": ids[2], "op": "priority", "fields": {"priority": "urgent"}},
+                    {"id": ids[1], "op": "tags", "fields": {"tags": ["bulk", "x"]}},
+                    {"id": ids[3], "op": "delete"},
+                    {"id": 987654321, "op": "delete"},
+                ]})
+            finally:
+                event.remove(db.engine, "before_cursor_execute", count)
+            body = r.get_json()
+            assert r.status_code == 200
+            # both "done" tasks share one statement; the tags edit flushes its own
+            status_updates = [s for s in updates if "status" in s]
+            assert status_updates == ["UPDATE task SET status=?, updated_at=? WHERE task.id IN (?, ?)"]
+            assert len(updates) == 3
+            assert [t["id"] for t in body["tasks"]] == ids[:3]
+            assert body["deleted"] == [ids[3]] and body["missing"] == [987654321]
+            assert f'task-card-{ids[2]}' in body["rows"][str(ids[2])]
+
+            db.session.expire_all()
+            assert [db.session.get(Task, i).status for i in ids[:2]] == ["done", "done"]
+            assert db.session.get(Task, ids[1]).tag_list() == ["bulk", "x"]
+            moved = db.session.get(Task, ids[2])
+            assert moved.priority == "urgent" and moved.deadline_utc == datetime(2032, 3, 2, 8, 0)
+            n = moved.notification_rows[0]
+            assert n.next_fire_at == datetime(2032, 3, 2, 8, 0) - timedelta(minutes=30) and n.sent_at is None
+            assert db.session.get(Task, ids[3]) is None
+            assert TaskNotification.query.filter_by(task_id=ids[3]).count() == 0
+        finally:
+            db.session.rollback()
+            Task.query.filter(Task.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
@@ -0,0 +1,59 @@
+from datetime import datetime
+from ai_notes.db import db
+from ai_notes.queries import changes_since, load_task_rows
+from app import create_app
+
+
+def test_change_journal_feeds_delta_sync():
+    app = create_app()
+    with app.app_context():
+        from ai_notes.models import Task, TaskChange
+
+        client = app.test_client()
+        base = client.get("/api/tasks/changes?since=0&limit=1").get_json()
+        assert base["more"] is (TaskChange.query.count() > 1)
+        head = db.session.query(db.func.max(TaskChange.version)).scalar() or 0
+
+        a, b, c = (Task(title=f"Delta {i}", deadline_utc=datetime(2035, 1, 1 + i)) for i in range(3))
+        db.session.add_all([a, b, c])
+        db.session.commit()
+        ids = [a.id, b.id, c.id]
+        try:
+            # one ORM edit, one tag edit, one single-statement route, one bulk update, one delete
+            a.title = "Delta 0 renamed"
+            db.session.commit()
+            b.set_tags(["delta"])
+            db.session.commit()
+            client.post(f"/tasks/{c.id}/priority", data={"priority": "urgent"})
+            change = {"id": a.id, "op": "status", "fields": {"status": "done"}}
+            client.post("/api/tasks/bulk", json={"changes": [change]})
+            client.post(f"/tasks/{c.id}/delete")
+
+            body = client.get(f"/api/tasks/changes?since={head}&fields=title,status,tags").get_json()
+            assert body["more"] is False and body["version"] > head
+            # one entry per task, latest state, in version order
+            ops = [(ch["id"], ch["op"]) for ch in body["changes"]]
+            assert ops == [(b.id, "upsert"), (a.id, "upsert"), (c.id, "delete")]
+            versions = [ch["version"] for ch in body["changes"]]
+            assert versions == sorted(versions)
+            assert body["changes"][0]["task"] == {
+                "id": b.id, "title": "Delta 1", "status": "pending", "tags": ["delta"],
+            }
+            assert body["changes"][1]["task"]["status"] == "done"
+
+            # nothing new -> empty page, same cursor
+            again = client.get(f"/api/tasks/changes?since={body['version']}").get_json()
+            assert again == {"changes": [], "version": body["version"], "more": False}
+            assert client.get("/api/tasks/changes?since=x").status_code == 400
+
+            # paging through the journal
+            entries, cursor, more = changes_since(head, limit=2)
+            assert [e[1] for e in entries] == [b.id, a.id] and more
+            entries, _, more = changes_since(cursor, limit=2)
+            assert entries[0][1:] == (c.id, "delete") and not more
+
+            rows = load_task_rows([a.id, b.id])
+            assert rows[b.id].tag_list() == ["delta"] and rows[a.id].status == "done"
+        finally:
+            Task.query.filter(Task.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
@@ -0,0 +1,149 @@
+import asyncio
+import json
+from datetime import datetime
+from sqlalchemy import create_engine, text
+from ai_notes.db import db
+from ai_notes.services import feed
+from ai_notes.services.feed import ChangeHub, JournalPoller, get_hub
+from ai_notes.sockets.asgi import create_asgi_app
+from app import create_app
+
+
+def test_hub_coalesces_per_task_and_resyncs_slow_clients():
+    hub = ChangeHub(max_pending=3)
+    sub = hub.subscribe()
+    hub.publish([{"op": "upsert", "id": 1, "fields": {"title": "a"}}])
+    hub.publish([{"op": "upsert", "id": 1, "fields": {"priority": "high"}}])
+    hub.publish([{"op": "upsert", "id": 2, "fields": {"title": "b"}}, {"op": "delete", "id": 2, "fields": {}}])
+    msg = sub.next_message(timeout=0)
+    assert msg["phase"] == "changes"
+    assert msg["events"] == [
+        {"op": "upsert", "id": 1, "fields": {"title": "a", "priority": "high"}, "version": 2},
+        {"op": "delete", "id": 2, "fields": {}, "version": 4},
+    ]
+    assert sub.next_message(timeout=0) is None
+
+    hub.publish([{"op": "delete", "id": i, "fields": {}} for i in range(10, 15)])
+    assert sub.next_message(timeout=0) == {"phase": "resync"}
+    stats = hub.stats()
+    assert (stats["merged"], stats["resync"], stats["dropped"]) == (2, 1, 1)
+    hub.unsubscribe(sub)
+    assert hub.stats()["subscribers"] == 0
+
+
+def test_commits_publish_and_rollbacks_do_not():
+    app = create_app()
+    hub = get_hub()
+    sub = hub.subscribe()
+    try:
+        with app.app_context():
+            from ai_notes.models import Task
+
+            t = Task(title="Feed one", deadline_utc=datetime(2034, 1, 1, 9, 0))
+            db.session.add(t)
+            db.session.flush()
+            db.session.rollback()
+            assert sub.next_message(timeout=0) is None
+
+            t = Task(title="Feed one")
+            db.session.add(t)
+            db.session.commit()
+            task_id = t.id
+            ev = sub.next_message(timeout=0)["events"][0]
+            assert ev["op"] == "upsert" and ev["id"] == task_id and ev["fields"]["title"] == "Feed one"
+
+            # ORM edit, one-statement route edit and bulk edit all publish
+            t.set_tags(["feed"])
+            db.session.commit()
+            client = app.test_client()
+            client.post(f"/tasks/{task_id}/priority", data={"priority": "urgent"})
+            change = {"id": task_id, "op": "status", "fields": {"status": "done"}}
+            client.post("/api/tasks/bulk", json={"changes": [change]})
+            events = sub.next_message(timeout=0)["events"]
+            assert len(events) == 1
+            assert {k: events[0]["fields"][k] for k in ("tags", "priority", "status")} == {
+                "tags": ["feed"], "priority": "urgent", "status": "done",
+            }
+
+            client.post(f"/tasks/{task_id}/delete")
+            assert sub.next_message(timeout=0)["events"] == [
+                {"op": "delete", "id": task_id, "fields": {}, "version": hub.stats()["version"]}
+            ]
+    finally:
+        hub.unsubscribe(sub)
+
+
+def test_asgi_feed_socket_pushes_changes(monkeypatch):
+    monkeypatch.setenv("FEED_COALESCE_MS", "20")
+    app = create_app()
+    asgi = create_asgi_app(app, workers=1)
+
+    async def scenario():
+        inbox: asyncio.Queue = asyncio.Queue()
+        sent = []
+        got = asyncio.Event()
+
+        async def receive():
+            return await inbox.get()
+
+        async def send(event):
+            sent.append(event)
+            if event["type"] == "websocket.send":
+                got.set()
+
+        await inbox.put({"type": "websocket.connect"})
+        runner = asyncio.create_task(asgi({"type": "websocket", "path": "/ws/feed"}, receive, send))
+        while get_hub().stats()["subscribers"] == 0:
+            await asyncio.sleep(0.01)
+        get_hub().publish([{"op": "delete", "id": 424242, "fields": {}}])
+        await asyncio.wait_for(got.wait(), timeout=5)
+        await inbox.put({"type": "websocket.disconnect"})
+        await runner
+        return sent
+
+    sent = asyncio.run(scenario())
+    assert sent[0] == {"type": "websocket.accept"}
+    msg = json.loads(sent[1]["text"])
+    assert msg["phase"] == "changes" and msg["events"][0]["id"] == 424242
+    assert get_hub().stats()["subscribers"] == 0
+    asgi.pool.shutdown(wait=True)
+
+
+def test_journal_source_sees_every_workers_writes(monkeypatch):
+    app = create_app()
+    monkeypatch.setattr(feed, "_source", "journal")
+    hub = ChangeHub()
+    sub = hub.subscribe()
+    local = get_hub().subscribe()
+    poller = JournalPoller(app, hub, interval=0)
+    try:
+        with app.app_context():
+            from ai_notes.models import Task, TaskChange
+
+            poller.cursor = db.session.query(db.func.max(TaskChange.version)).scalar() or 0
+            mine = Task(title="Journal mine")
+            db.session.add(mine)
+            db.session.commit()
+            mine_id = mine.id
+            # another worker process writing through its own connection
+            other = create_engine(db.engine.url)
+            with other.begin() as conn:
+                other_id = conn.execute(
+                    text("INSERT INTO task (title, status, priority) VALUES ('Journal other', 'pending', 'low')"
+                         " RETURNING id")
+                ).scalar()
+            other.dispose()
+            assert local.next_message(timeout=0) is None  # not published directly
+
+            assert poller.poll() == 2
+            events = sub.next_message(timeout=0)["events"]
+            assert [(e["op"], e["id"]) for e in events] == [("upsert", mine_id), ("upsert", other_id)]
+            assert events[1]["fields"]["title"] == "Journal other" and events[1]["fields"]["priority"] == "low"
+
+            Task.query.filter(Task.id.in_([mine_id, other_id])).delete(synchronize_session=False)
+            db.session.commit()
+            assert poller.poll() == 2
+            assert {e["op"] for e in sub.next_message(timeout=0)["events"]} == {"delete"}
+            assert poller.poll() == 0
+    finally:
+        get_hub().unsubscribe(local)
@@ -0,0 +1,43 @@
+import time
+from ai_notes.services.hf_cache import LRUCache, make_key
+
+
+def test_keys_are_stable_and_normalized():
+    a = make_key("zs", "m", "Create  report\n tomorrow", ["create", "update"])
+    b = make_key("zs", "m", " Create report tomorrow ", ["create", "update"])
+    assert a == b
+    assert a != make_key("zs", "m", "Create report tomorrow", ["create"])
+    assert a != make_key("zs", "other", "Create report tomorrow", ["create", "update"])
+
+
+def test_lru_evicts_least_recently_used():
+    c = LRUCache(maxsize=2, ttl=60)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1  # a is now most recent
+    c.set("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1 and c.get("c") == 3
+    st = c.stats()
+    assert st["evictions"] == 1 and st["size"] == 2
+    assert st["hits"] == 3 and st["misses"] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    c = LRUCache(maxsize=10, ttl=5)
+    now = time.time()
+    monkeypatch.setattr("ai_notes.services.hf_cache.time.time", lambda: now)
+    c.set("a", 1)
+    monkeypatch.setattr("ai_notes.services.hf_cache.time.time", lambda: now + 6)
+    assert c.get("a") is None
+    assert c.stats()["expirations"] == 1
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "hf_cache.sqlite")
+    w1 = LRUCache(maxsize=10, ttl=60, path=path)
+    w2 = LRUCache(maxsize=10, ttl=60, path=path)
+    w1.set("zs:abc", ["create", {"create": 0.9}])
+    label, scores = w2.get("zs:abc")
+    assert label == "create" and scores["create"] == 0.9
+    assert w2.stats()["disk_hits"] == 1
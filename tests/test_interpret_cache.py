@@ -0,0 +1,114 @@
+import threading
+import time
+from datetime import datetime
+from dateutil import tz as dtz
+from ai_notes import ratelimit
+from ai_notes.ratelimit import MemoryLimiter
+from ai_notes.services.hf_cache import SingleFlight
+from ai_notes.services.interpret_cache import bucket
+from app import create_app
+
+
+def _client(monkeypatch, calls, delay=0.0):
+    def zs(text, labels):
+        calls.append(text)
+        time.sleep(delay)
+        return ("create", {})
+
+    monkeypatch.setattr(ratelimit, "_limiter", MemoryLimiter(rate=100, burst=100))
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_zero_shot", zs)
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_ner", lambda t: [])
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_text2json", lambda p: {})
+    return create_app().test_client()
+
+
+def test_repeat_is_served_from_cache_with_etag(monkeypatch):
+    calls = []
+    client = _client(monkeypatch, calls)
+    body = {"utterance": "create 'cache me'  friday 9am", "context": {"now_tz": "Europe/London"}}
+    first = client.post("/api/ai/interpret", json=body)
+    assert first.status_code == 200 and first.headers["X-Cache"] == "MISS"
+    n = len(calls)
+    # whitespace-only differences normalize to the same key
+    second = client.post("/api/ai/interpret", json={**body, "utterance": "create 'cache me' friday 9am"})
+    assert second.headers["X-Cache"] == "HIT" and len(calls) == n
+    assert second.get_json() == first.get_json()
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert "private, max-age=" in second.headers["Cache-Control"]
+
+    etag = first.headers["ETag"]
+    again = client.post("/api/ai/interpret", json=body, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.data == b""
+
+    # another timezone is another key
+    other = client.post("/api/ai/interpret", json={**body, "context": {"now_tz": "Asia/Dubai"}})
+    assert other.headers["X-Cache"] == "MISS"
+
+
+def test_concurrent_identical_requests_share_one_parse(monkeypatch):
+    calls = []
+    client = _client(monkeypatch, calls, delay=0.3)
+    monkeypatch.setenv("AI_FAST_PATH_THRESHOLD", "2")  # always go to the (stubbed) remote stages
+    body = {"utterance": "create 'single flight' tomorrow", "context": {"now_tz": "UTC"}}
+    results = []
+
+    def go():
+        results.append(client.post("/api/ai/interpret", json=body).headers["X-Cache"])
+
+    threads = [threading.Thread(target=go) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(results).count("MISS") == 1
+    assert set(results) <= {"MISS", "SHARED", "HIT"}
+    assert calls.count(calls[0]) == 1
+
+
+def test_buckets_follow_local_day_and_clock_phrases():
+    now = datetime(2026, 3, 1, 22, 30, tzinfo=dtz.UTC)
+    assert bucket("friday 9am", "Asia/Dubai", now)[0] == "2026-03-02"
+    assert bucket("friday 9am", "America/New_York", now)[0] == "2026-03-01"
+    label, ends = bucket("remind me in 20m", "UTC", now)
+    assert label == "2026-03-01T22:30" and ends == datetime(2026, 3, 1, 22, 31, tzinfo=dtz.UTC)
+    # a day without a clock time keeps the current HH:MM, so it cannot share a day bucket
+    assert bucket("'report' friday", "UTC", now)[0] == "2026-03-01T22:30"
+    assert bucket("'report' before friday", "UTC", now)[0] == "2026-03-01"
+    assert bucket("'report' no date", "UTC", now)[0] == "2026-03-01"
+
+
+def test_cached_parse_resolves_target_per_request(monkeypatch):
+    calls = []
+    client = _client(monkeypatch, calls)
+    from ai_notes.db import db
+    from ai_notes.models import Task
+
+    with client.application.app_context():
+        t = Task(title="Stale cache target zq")
+        db.session.add(t)
+        db.session.commit()
+        task_id = t.id
+    body = {"utterance": "delete 'Stale cache target zq'", "context": {"now_tz": "UTC"}}
+    first = client.post("/api/ai/interpret", json=body)
+    assert first.get_json()["target"] == {"by": "id", "value": task_id}
+
+    with client.application.app_context():
+        db.session.delete(db.session.get(Task, task_id))
+        db.session.commit()
+    second = client.post("/api/ai/interpret", json=body)
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.get_json()["target"] == {"by": "title", "value": "Stale cache target zq"}
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+
+def test_single_flight_propagates_errors():
+    sf = SingleFlight()
+
+    def boom():
+        raise ValueError("x")
+
+    try:
+        sf.do("k", boom)
+    except ValueError:
+        pass
+    assert sf.do("k", lambda: 1) == (1, False)
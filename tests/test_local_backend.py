@@ -0,0 +1,51 @@
+import pytest
+from ai_notes.services import hf_client
+from ai_notes.services.ai_router import INTENT_LABELS
+from ai_notes.services.local_backend import LocalBackend, heuristic_ner
+
+
+def test_local_intent_classifier():
+    b = LocalBackend()
+    b.warmup()
+    cases = {
+        "Create 'Write polite rejection email' tomorrow 10am, 30m, high": "create",
+        "Move 'Rise Advisory email' to Fri 9:30, set in progress": "update",
+        "Mark 'prepare slides' done": "complete",
+        "remove 'gym'": "delete",
+        "reopen 'taxes'": "reopen",
+        "what is due friday": "query",
+    }
+    for utterance, expected in cases.items():
+        label, scores = b.zero_shot(utterance, INTENT_LABELS)
+        assert label == expected, utterance
+        assert abs(sum(scores.values()) - 1.0) < 1e-6
+
+
+def test_heuristic_ner_shape():
+    ents = heuristic_ner("Call Bob at IBM on Friday")
+    groups = {e["word"]: e["entity_group"] for e in ents}
+    assert groups == {"Bob": "MISC", "IBM": "ORG"}
+
+
+def test_backend_selected_by_env(monkeypatch):
+    monkeypatch.setenv("AI_BACKEND", "local")
+    monkeypatch.setattr(hf_client, "_backend", None)
+    label, _ = hf_client.hf_zero_shot("delete 'old report'", INTENT_LABELS)
+    assert label == "delete"
+    assert hf_client.hf_text2json("anything") == {}
+    monkeypatch.setattr(hf_client, "_backend", None)
+
+
+def test_backend_must_implement_every_stage():
+    class NoNer(hf_client.InferenceBackend):
+        def model_id(self, kind):
+            return "x"
+
+        def zero_shot(self, text, labels):
+            return labels[0], {}
+
+        def text2json(self, prompt):
+            return {}
+
+    with pytest.raises(TypeError):
+        NoNer()
@@ -0,0 +1,60 @@
+import threading
+from sqlalchemy import create_engine, inspect, text
+from ai_notes.db import db
+from ai_notes.migrations import HEAD, MIGRATIONS, current_version, pending, upgrade
+from app import create_app
+
+
+def test_fresh_database_matches_models(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    assert current_version(engine) == 0
+    assert upgrade(engine) == HEAD
+    assert pending(engine) == []
+    # second run is a no-op
+    assert upgrade(engine) == HEAD
+
+    insp = inspect(engine)
+    for table in db.metadata.sorted_tables:
+        assert insp.has_table(table.name), table.name
+        cols = {c["name"] for c in insp.get_columns(table.name)}
+        assert {c.name for c in table.columns} <= cols, table.name
+        idx = {i["name"] for i in insp.get_indexes(table.name)}
+        assert {i.name for i in table.indexes} <= idx, table.name
+
+    rank = next(c for c in insp.get_columns("task") if c["name"] == "priority_rank")
+    assert rank["computed"]["persisted"] is db.metadata.tables["task"].c.priority_rank.computed.persisted
+
+
+def test_versions_are_ordered_and_cli_reports_head():
+    versions = [m.VERSION for m in MIGRATIONS]
+    assert versions == sorted(versions) == list(range(1, HEAD + 1))
+
+    app = create_app()
+    out = app.test_cli_runner().invoke(args=["db", "upgrade"])
+    assert out.exit_code == 0 and f"version {HEAD}" in out.output
+    out = app.test_cli_runner().invoke(args=["db", "current"])
+    assert out.output.startswith(f"{HEAD} ")
+
+
+def test_concurrent_upgrades_apply_each_migration_once(tmp_path):
+    url = f"sqlite:///{tmp_path / 'race.db'}"
+    engines = [create_engine(url, connect_args={"timeout": 30}) for _ in range(4)]
+    results, errors = [], []
+    start = threading.Barrier(len(engines))
+
+    def boot(engine):
+        start.wait()
+        try:
+            results.append(upgrade(engine))
+        except Exception as e:  # pragma: no cover - the failure being tested
+            errors.append(e)
+
+    threads = [threading.Thread(target=boot, args=(e,)) for e in engines]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == [] and results == [HEAD] * len(engines)
+    with engines[0].connect() as conn:
+        rows = conn.execute(text("SELECT version FROM schema_version ORDER BY version")).scalars().all()
+    assert rows == list(range(1, HEAD + 1))
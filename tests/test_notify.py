@@ -0,0 +1,160 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from ai_notes.services import notify
+
+
+def _items(n, fire_at=None):
+    fire_at = fire_at or datetime.utcnow()
+    deadline = fire_at + timedelta(hours=1)
+    return [notify.Notification(i, 60, f"Task {i}", deadline, fire_at) for i in range(1, n + 1)]
+
+
+class RecordingSink(notify.Sink):
+    name = "rec"
+
+    def __init__(self, fail_times=0):
+        self.batches = []
+        self.fail_times = fail_times
+
+    def send_batch(self, items):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise IOError("down")
+        self.batches.append([n.task_id for n in items])
+
+
+def test_same_slice_is_one_batch_and_duplicates_drop():
+    sink = RecordingSink()
+    p = notify.DeliveryPipeline([sink], batch_window=5, max_batch=10)
+    items = _items(12)
+    for n in items:
+        p.submit([n])
+    assert p.submit(items[:3]) == 0  # already queued
+    p.flush(timeout=5)
+    assert sink.batches == [list(range(1, 11)), [11, 12]]
+    s = p.stats()
+    assert s["delivered"] == 12 and s["deduped"] == 3 and s["batches"] == 2
+    assert s["latency_ms"]["p50"] is not None
+
+    # re-armed reminder (new fire time) is not a duplicate
+    assert p.submit(_items(1, fire_at=datetime.utcnow() + timedelta(days=1))) == 1
+
+
+def test_failed_batch_retries_then_gives_up():
+    flaky = RecordingSink(fail_times=2)
+    p = notify.DeliveryPipeline([flaky], batch_window=5, retries=3, backoff=0.001)
+    p.submit(_items(2))
+    p.flush(timeout=5)
+    assert flaky.batches == [[1, 2]]
+    assert p.stats()["retries"] == 2
+
+    dead = RecordingSink(fail_times=100)
+    p = notify.DeliveryPipeline([dead], batch_window=5, retries=1, backoff=0.001)
+    p.submit(_items(2))
+    p.flush(timeout=5)
+    assert p.stats()["failed"] == 2 and p.stats()["delivered"] == 0
+
+
+def test_webhook_smtp_and_ws_sinks(monkeypatch):
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    mails = []
+
+    class FakeSMTP:
+        def __init__(self, host, port, timeout=None):
+            self.addr = (host, port)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def send_message(self, msg):
+            mails.append(msg)
+
+    monkeypatch.setattr(notify.smtplib, "SMTP", FakeSMTP)
+
+    class FakeWS:
+        def __init__(self):
+            self.sent = []
+
+        def send(self, payload):
+            self.sent.append(json.loads(payload))
+
+    ws = FakeWS()
+    notify.register_ws_client(ws)
+    try:
+        monkeypatch.setenv("NOTIFY_SINKS", "webhook,smtp,ws,bogus")
+        monkeypatch.setenv("NOTIFY_WEBHOOK_URL", f"http://127.0.0.1:{server.server_port}/hook")
+        sinks = notify.sinks_from_env()
+        assert [s.name for s in sinks] == ["webhook", "smtp", "ws"]
+        p = notify.DeliveryPipeline(sinks, batch_window=5)
+        p.submit(_items(3))
+        p.flush(timeout=5)
+    finally:
+        notify.unregister_ws_client(ws)
+        server.shutdown()
+
+    assert [n["task_id"] for n in received[0]["notifications"]] == [1, 2, 3]
+    assert len(mails) == 1 and mails[0]["Subject"] == "3 task reminders"
+    assert ws.sent[0]["phase"] == "notify" and len(ws.sent[0]["notifications"]) == 3
+
+
+def test_notify_pushes_and_handler_replies_do_not_interleave():
+    from ai_notes.sockets.ai_ws import _LockedClient
+
+    class RacyWS:
+        # fails if two threads are inside send() at once
+        def __init__(self):
+            self.busy = False
+            self.overlaps = 0
+            self.sent = 0
+
+        def send(self, payload):
+            if self.busy:
+                self.overlaps += 1
+            self.busy = True
+            time.sleep(0.001)
+            self.busy = False
+            self.sent += 1
+
+    ws = RacyWS()
+    client = _LockedClient(ws)
+    notify.register_ws_client(client)
+    try:
+        sink = notify.WebSocketSink()
+        pushes = [threading.Thread(target=sink.send_batch, args=(_items(1),)) for _ in range(10)]
+        for t in pushes:
+            t.start()
+        for _ in range(10):
+            client.send("{}")
+        for t in pushes:
+            t.join()
+    finally:
+        notify.unregister_ws_client(client)
+    assert ws.sent == 20 and ws.overlaps == 0
+
+
+def test_sink_without_send_batch_is_rejected():
+    class Silent(notify.Sink):
+        name = "silent"
+
+    with pytest.raises(TypeError):
+        Silent()
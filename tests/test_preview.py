@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+from ai_notes import ratelimit
+from ai_notes.ratelimit import MemoryLimiter
+from ai_notes.services.ai_router import fast_path_stats
+from ai_notes.sockets.pipeline import handle_message
+from ai_notes.sockets.preview import PreviewSession
+from app import create_app
+
+
+def _stub_hf(monkeypatch, calls, delay=0.0):
+    def zs(text, labels):
+        calls.append(text)
+        time.sleep(delay)
+        return ("create", {})
+
+    monkeypatch.setenv("AI_FAST_PATH_THRESHOLD", "2")  # make every parse reach the stubs
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_zero_shot", zs)
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_ner", lambda t: [])
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_text2json", lambda p: {})
+
+
+def test_submit_reuses_finished_preview(monkeypatch):
+    calls = []
+    _stub_hf(monkeypatch, calls)
+    app = create_app()
+    sent = []
+    got = threading.Event()
+    previews = PreviewSession(app, lambda m: (sent.append(m), got.set()), debounce=0.0)
+    text = "'preview reuse' tomorrow 9am, 'second one' friday"
+
+    before = fast_path_stats.snapshot()["parsed"]
+    previews.start(text, "UTC", "p1")
+    assert got.wait(5)
+    assert fast_path_stats.snapshot()["parsed"] == before  # a preview is not an utterance yet
+    assert sent[0]["phase"] == "preview" and sent[0]["request_id"] == "p1"
+    assert [f["operation"] for f in sent[0]["fragments"]] == ["create", "create"]
+    assert len(calls) == 2
+
+    with app.app_context():
+        msgs = list(handle_message(json.dumps({"utterance": text, "context": {"now_tz": "UTC"}}),
+                                   "10.0.0.9", previews=previews))
+    assert len(calls) == 2  # nothing parsed twice
+    assert fast_path_stats.snapshot()["parsed"] == before + 2  # counted once, on submit
+    assert [m["phase"] for m in msgs].count("patch") == 2
+
+
+def test_newer_text_cancels_stale_preview(monkeypatch):
+    calls = []
+    _stub_hf(monkeypatch, calls, delay=0.2)
+    app = create_app()
+    sent = []
+    previews = PreviewSession(app, sent.append, debounce=0.1)
+
+    previews.start("'stale' tomo", "UTC")
+    previews.start("'stale' tomorrow", "UTC")  # supersedes the first during its debounce
+    time.sleep(0.15)
+    # submitting other text cancels the running preview and parses afresh
+    assert previews.take("'something else'", "UTC") is None
+    time.sleep(0.4)
+    assert calls == ["'stale' tomorrow"]
+    assert sent == []
+
+
+def test_previews_are_rate_limited_and_capped(monkeypatch):
+    calls = []
+    _stub_hf(monkeypatch, calls, delay=0.3)
+    monkeypatch.setattr(ratelimit, "_limiter", MemoryLimiter(rate=1 / 60, burst=2))
+    app = create_app()
+    previews = PreviewSession(app, lambda m: None, debounce=0.0, max_inflight=1)
+
+    def preview(text, rid):
+        return list(handle_message(json.dumps({"type": "preview", "utterance": text, "request_id": rid}),
+                                   "10.0.0.7", previews=previews))
+
+    assert preview("'capped' tomorrow", "a") == []
+    time.sleep(0.1)
+    assert preview("'capped' friday", "b") == []  # first still running: skipped
+    time.sleep(0.5)
+    assert calls == ["'capped' tomorrow"]
+    msgs = preview("'capped' monday", "c")
+    assert msgs[0]["message"] == "rate_limited" and msgs[0]["request_id"] == "c"
+
+
+def test_preview_and_matching_submit_cost_one_parse(monkeypatch):
+    calls = []
+    _stub_hf(monkeypatch, calls)
+    monkeypatch.setattr(ratelimit, "_limiter", MemoryLimiter(rate=1 / 60, burst=2))
+    app = create_app()
+    got = threading.Event()
+    previews = PreviewSession(app, lambda m: got.set(), debounce=0.0)
+    text = "'one charge' tomorrow 9am, 'one charge too' friday"
+
+    def send(msg):
+        with app.app_context():
+            return list(handle_message(json.dumps({**msg, "context": {"now_tz": "UTC"}}),
+                                       "10.0.0.8", previews=previews))
+
+    assert send({"type": "preview", "utterance": text}) == []  # two fragments, two tokens
+    assert got.wait(5)
+    phases = [m["phase"] for m in send({"utterance": text})]
+    assert "error" not in phases and phases.count("patch") == 2
+    # the bucket is now empty: a parse that has no preview is refused
+    assert send({"utterance": "'one charge three' monday"})[0]["message"] == "rate_limited"
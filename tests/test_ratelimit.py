@@ -0,0 +1,56 @@
+from ai_notes import ratelimit
+from ai_notes.ratelimit import MemoryLimiter, SQLiteLimiter
+from app import create_app
+
+
+def test_bucket_bursts_then_refills():
+    lim = MemoryLimiter(rate=1.0, burst=3)
+    assert [lim.allow("ip", now=100.0)[0] for _ in range(4)] == [True, True, True, False]
+    ok, wait = lim.allow("ip", now=100.0)
+    assert not ok and wait == 1.0
+    assert lim.allow("ip", now=101.0)[0]
+    assert not lim.allow("ip", now=101.0)[0]
+    # other keys have their own bucket; cost takes several tokens at once
+    assert lim.allow("other", cost=3, now=101.0)[0]
+    assert not lim.allow("other", now=101.0)[0]
+
+
+def test_idle_keys_are_evicted():
+    lim = MemoryLimiter(rate=1.0, burst=2, idle_ttl=60, max_keys=100)
+    for i in range(50):
+        lim.allow(f"k{i}", now=0.0)
+    lim.allow("fresh", now=30.0)
+    assert len(lim) == 51
+    lim.allow("fresh", now=70.0)
+    assert len(lim) == 1
+
+    capped = MemoryLimiter(rate=1.0, burst=2, max_keys=10)
+    for i in range(25):
+        capped.allow(f"k{i}", now=float(i))
+    assert len(capped) == 10
+
+
+def test_sqlite_buckets_are_shared_between_workers(tmp_path):
+    path = str(tmp_path / "rl.db")
+    a = SQLiteLimiter(path, rate=0.5, burst=2)
+    b = SQLiteLimiter(path, rate=0.5, burst=2)
+    assert a.allow("ip", now=10.0)[0]
+    assert b.allow("ip", now=10.0)[0]
+    ok, wait = a.allow("ip", now=10.0)
+    assert not ok and wait == 2.0
+    assert b.allow("ip", now=12.0)[0]
+    assert not a.allow("ip", now=12.0)[0]
+
+
+def test_interpret_returns_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(ratelimit, "_limiter", MemoryLimiter(rate=1 / 60, burst=1))
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_zero_shot", lambda t, labels: ("create", {}))
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_ner", lambda t: [])
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_text2json", lambda p: {})
+    client = create_app().test_client()
+    body = {"utterance": "create 'limit me' tomorrow", "context": {"now_tz": "UTC"}}
+    assert client.post("/api/ai/interpret", json=body).status_code == 200
+    resp = client.post("/api/ai/interpret", json=body)
+    assert resp.status_code == 429
+    assert resp.get_json()["error"] == "rate_limited"
+    assert 0 < int(resp.headers["Retry-After"]) <= 60
@@ -0,0 +1,50 @@
+from datetime import datetime
+from sqlalchemy import event
+from ai_notes.db import db
+from app import create_app
+
+
+def test_field_routes_are_one_statement(monkeypatch):
+    app = create_app()
+    with app.app_context():
+        from ai_notes.models import Task
+
+        t = Task(title="Lean row", priority="low", deadline_utc=datetime(2033, 1, 1, 9, 0))
+        t.set_tags(["lean", "card"])
+        t.set_notify_offsets([15])
+        db.session.add(t)
+        db.session.commit()
+        task_id = t.id
+        db.session.remove()
+
+        rescheduled = []
+        monkeypatch.setattr("ai_notes.scheduler._schedule_task_notifications", rescheduled.append)
+        statements = []
+
+        def count(conn, cursor, statement, params, context, executemany):
+            statements.append(statement)
+
+        client = app.test_client()
+        hx = {"HX-Request": "true"}
+        event.listen(db.engine, "before_cursor_execute", count)
+        try:
+            r = client.post(f"/tasks/{task_id}/priority", data={"priority": "urgent"}, headers=hx)
+            html = r.get_data(as_text=True)
+            assert len(statements) == 1 and statements[0].startswith("UPDATE task SET priority")
+            assert "Priority: urgent" in html and "lean" in html and f"task-card-{task_id}" in html
+
+            client.post(f"/tasks/{task_id}/toggle", headers=hx)
+            r = client.post(f"/tasks/{task_id}/edit", data={"description": "lean desc"}, headers=hx)
+            html = r.get_data(as_text=True)
+            assert len(statements) == 3
+            assert "done" in html and "Lean row" in html and "lean desc" in html
+            assert client.post("/tasks/987654321/status", data={"status": "done"}).status_code == 404
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count)
+        assert rescheduled == []
+
+        t = db.session.get(Task, task_id)
+        assert (t.status, t.priority, t.description) == ("done", "urgent", "lean desc")
+        assert t.notification_rows[0].next_fire_at == datetime(2033, 1, 1, 8, 45)
+        db.session.delete(t)
+        db.session.commit()
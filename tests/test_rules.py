@@ -0,0 +1,32 @@
+from ai_notes.services.rules import scan_utterance, title_from_fragment
+
+
+def test_scan_yields_every_rule_field():
+    r = scan_utterance("'Gym' today 6pm 45 min alerts 12h and 1h")
+    assert r.duration == 45
+    assert r.priority == "high"  # "today" maps to high
+    assert r.alerts == (60, 720)
+    assert not r.ambiguous_day
+    assert r.description == "'Gym'"
+
+    r = scan_utterance("update 'Book flights' to ongoing, remind 2 hours before")
+    assert r.status == "in_progress"
+    assert r.duration == 120 and r.alerts == (120,)
+    assert r.description == "update 'Book flights' to ongoing"
+
+
+def test_scan_alerts_and_ambiguous_days():
+    # after the alert keyword any hour/minute unit counts
+    r = scan_utterance("write report, alert 3 hrs")
+    assert r.alerts == (180,)
+    # abbreviated alternatives are ambiguous; "1h before" is an alert and leaves the description
+    r = scan_utterance("Call bob fri or sat, 1h before")
+    assert r.ambiguous_day and r.alerts == (60,)
+    assert r.description == "Call bob fri or sat"
+
+
+def test_title_from_fragment():
+    assert title_from_fragment("create 'Dentist' before sunday maybe") == "create 'Dentist'"
+    assert title_from_fragment("do taxes before maybe friday") == "do taxes"
+    assert title_from_fragment("  standup 9:30 idk when ") == "standup"
+    assert title_from_fragment("asap") == "asap"
@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta
+from apscheduler.schedulers.background import BackgroundScheduler
+from ai_notes import scheduler
+from ai_notes.db import db
+from app import create_app
+
+
+def _paused_scheduler(monkeypatch, app):
+    sched = BackgroundScheduler(timezone="UTC")
+    sched.start(paused=True)
+    monkeypatch.setattr(scheduler, "_scheduler", sched)
+    monkeypatch.setattr(scheduler, "_app", app)
+    monkeypatch.setattr(scheduler, "_jobs_by_task", {})
+    return sched
+
+
+def test_fire_times_follow_deadline_and_offsets():
+    app = create_app()
+    with app.app_context():
+        from ai_notes.models import Task
+
+        deadline = datetime.utcnow() + timedelta(days=2)
+        t = Task(title="Fire times", deadline_utc=deadline)
+        t.set_notify_offsets([60, 15])
+        db.session.add(t)
+        db.session.commit()
+        assert [n.next_fire_at for n in t.notification_rows] == [
+            deadline - timedelta(minutes=15), deadline - timedelta(minutes=60),
+        ]
+
+        t.notification_rows[0].sent_at = datetime.utcnow()
+        db.session.commit()
+        # moving the deadline re-arms reminders that already went out
+        t.deadline_utc = deadline + timedelta(hours=1)
+        db.session.commit()
+        assert all(n.sent_at is None for n in t.notification_rows)
+        assert t.notification_rows[1].next_fire_at == deadline
+
+        t.deadline_utc = None
+        db.session.commit()
+        assert [n.next_fire_at for n in t.notification_rows] == [None, None]
+        db.session.delete(t)
+        db.session.commit()
+
+
+def test_only_reminders_inside_the_window_are_scheduled(monkeypatch):
+    app = create_app()
+    sched = _paused_scheduler(monkeypatch, app)
+    try:
+        with app.app_context():
+            from ai_notes.models import Task
+
+            soon = Task(title="Soon", deadline_utc=datetime.utcnow() + timedelta(minutes=50))
+            soon.set_notify_offsets([10, 30, 120])  # 120m is already in the past
+            later = Task(title="Later", deadline_utc=datetime.utcnow() + timedelta(days=3))
+            later.set_notify_offsets([60])
+            db.session.add_all([soon, later])
+            db.session.commit()
+
+            scheduler.on_task_changed(soon)
+            scheduler.on_task_changed(later)
+            ids = {j.id for j in sched.get_jobs()}
+            assert ids >= {f"task-{soon.id}-notify-10", f"task-{soon.id}-notify-30"}
+            assert not any(i.startswith(f"task-{later.id}-") for i in ids)
+            assert f"task-{soon.id}-notify-120" not in ids
+
+            # edits replace the task's own jobs by id
+            soon.set_notify_offsets([10])
+            db.session.commit()
+            scheduler.on_task_changed(soon)
+            ids = {j.id for j in sched.get_jobs()}
+            assert f"task-{soon.id}-notify-10" in ids and f"task-{soon.id}-notify-30" not in ids
+
+            # a later window load picks up the far reminder
+            n = scheduler.load_window(now=later.deadline_utc - timedelta(minutes=90))
+            assert n >= 1
+            assert sched.get_job(f"task-{later.id}-notify-60") is not None
+
+            scheduler.on_task_deleted(soon.id)
+            assert sched.get_job(f"task-{soon.id}-notify-10") is None
+            for t in (soon, later):
+                db.session.delete(t)
+            db.session.commit()
+    finally:
+        sched.shutdown(wait=False)
+
+
+def test_send_marks_reminder_once(monkeypatch):
+    app = create_app()
+    _paused_scheduler(monkeypatch, app)
+    with app.app_context():
+        from ai_notes.models import Task
+
+        t = Task(title="Send once", deadline_utc=datetime.utcnow() + timedelta(minutes=20))
+        t.set_notify_offsets([5])
+        db.session.add(t)
+        db.session.commit()
+        task_id = t.id
+        db.session.remove()
+
+    sent = []
+    monkeypatch.setattr(scheduler, "_dispatch", sent.extend)
+    scheduler._send_notification(task_id, 5)
+    scheduler._send_notification(task_id, 5)
+    assert sent == [(task_id, 5)]
+
+    with app.app_context():
+        from ai_notes.models import Task
+
+        t = db.session.get(Task, task_id)
+        assert t.notification_rows[0].sent_at is not None
+        db.session.delete(t)
+        db.session.commit()
+    scheduler._scheduler.shutdown(wait=False)
+
+
+def test_lease_has_one_holder_and_fails_over():
+    app = create_app()
+    with app.app_context():
+        now = datetime.utcnow()
+        scheduler.release_lease("worker-a")
+        scheduler.release_lease("worker-b")
+        assert scheduler.acquire_lease("worker-a", now)
+        assert not scheduler.acquire_lease("worker-b", now)
+        # the leader renews; the other keeps losing until the lease lapses
+        assert scheduler.acquire_lease("worker-a", now + timedelta(seconds=10))
+        assert not scheduler.acquire_lease("worker-b", now + timedelta(seconds=20))
+        assert scheduler.acquire_lease("worker-b", now + timedelta(minutes=5))
+        assert not scheduler.acquire_lease("worker-a", now + timedelta(minutes=5))
+        scheduler.release_lease("worker-b")
+
+
+def test_leader_drains_due_reminders_in_batches(monkeypatch):
+    app = create_app()
+    monkeypatch.setattr(scheduler, "_app", app)
+    delivered = []
+    monkeypatch.setattr(scheduler, "_dispatch", delivered.extend)
+    with app.app_context():
+        from ai_notes.models import Task
+
+        now = datetime.utcnow()
+        tasks = []
+        for i in range(5):
+            t = Task(title=f"Due {i}", deadline_utc=now + timedelta(minutes=30))
+            t.set_notify_offsets([60, 31, 10])  # 60 and 31 are due, 10 is not
+            tasks.append(t)
+        db.session.add_all(tasks)
+        db.session.commit()
+        ids = {t.id for t in tasks}
+
+        scheduler.release_lease("worker-b")
+        assert scheduler.acquire_lease("worker-a", now)
+        # a follower never drains
+        assert scheduler.drain_due("worker-b", now=now, batch=3) == 0
+
+        n = scheduler.drain_due("worker-a", now=now, batch=3)
+        mine = [d for d in delivered if d[0] in ids]
+        assert n >= 10 and sorted(mine) == sorted((i, m) for i in ids for m in (60, 31))
+        # claimed rows are not delivered again
+        delivered.clear()
+        scheduler.drain_due("worker-a", now=now, batch=3)
+        assert [d for d in delivered if d[0] in ids] == []
+
+        # rows selected but claimed by another sender first are not delivered
+        stale = [(t.id, 60) for t in tasks]
+        monkeypatch.setattr(scheduler, "_due_batch", lambda now, limit: stale)
+        assert scheduler.drain_due("worker-a", now=now, batch=10) == 0
+        assert delivered == []
+
+        scheduler.release_lease("worker-a")
+        for t in tasks:
+            db.session.delete(t)
+        db.session.commit()
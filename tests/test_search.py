@@ -0,0 +1,48 @@
+from ai_notes.db import db
+from ai_notes.search import apply_search, search_match
+from app import create_app
+
+
+def test_search_match_prefixes_last_word():
+    assert search_match("quarterly repo") == '"quarterly" "repo"*'
+    assert search_match("  ") is None
+
+
+def test_fts_search_ranks_and_tracks_writes():
+    app = create_app()
+    with app.app_context():
+        from ai_notes.models import Task
+
+        a = Task(title="Okapi budget", description="numbers for finance")
+        b = Task(title="Team lunch", description="ask about the okapi budget plan")
+        c = Task(title="Misc")
+        c.set_tags(["okapi", "finance"])
+        db.session.add_all([a, b, c])
+        db.session.commit()
+        try:
+            q, rank = apply_search(Task.query, "okapi budg")
+            assert rank is not None
+            ids = [t.id for t in q.order_by(rank.asc()).all()]
+            # title hit outranks the same words in the description
+            assert ids[:2] == [a.id, b.id]
+
+            q, rank = apply_search(Task.query, "finance")
+            assert {t.id for t in q.all()} >= {a.id, c.id}
+
+            a.title = "Wombat budget"
+            db.session.commit()
+            q, _ = apply_search(Task.query, "okapi budget")
+            assert a.id not in [t.id for t in q.all()]
+
+            # tag edits reach the index through the task_tag triggers
+            c.set_tags(["wombat"])
+            db.session.commit()
+            q, _ = apply_search(Task.query, "finance")
+            assert c.id not in [t.id for t in q.all()]
+
+            html = app.test_client().get("/?q=okapi&sort=relevance").get_data(as_text=True)
+            assert "Team lunch" in html and "Wombat budget" not in html
+        finally:
+            for t in (a, b, c):
+                db.session.delete(t)
+            db.session.commit()
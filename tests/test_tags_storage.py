@@ -0,0 +1,68 @@
+import sqlite3
+from ai_notes.db import db
+from ai_notes.queries import filtered_tasks
+from app import create_app
+
+
+LEGACY_SCHEMA = """
+CREATE TABLE task (
+    id INTEGER NOT NULL, title VARCHAR(255) NOT NULL, status VARCHAR(32),
+    priority VARCHAR(16), estimated_duration_minutes INTEGER, deadline_utc DATETIME,
+    notify_offsets_minutes VARCHAR(255), tags VARCHAR(255), created_at DATETIME,
+    updated_at DATETIME, PRIMARY KEY (id)
+)
+"""
+
+
+def test_csv_columns_migrate_to_child_tables(tmp_path, monkeypatch):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.execute(LEGACY_SCHEMA)
+    conn.execute("INSERT INTO task (id, title, tags, notify_offsets_minutes) VALUES (1, 'Old', 'work, home,work', '60,720,x')")
+    conn.execute("INSERT INTO task (id, title) VALUES (2, 'Plain')")
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{path}")
+    app = create_app()
+    with app.app_context():
+        from ai_notes.models import Task
+
+        t = db.session.get(Task, 1)
+        assert t.tag_list() == ["home", "work"]
+        assert t.notify_list() == [60, 720]
+        assert db.session.get(Task, 2).tag_list() == []
+        # CSV cleared so the migration never repeats
+        left = db.session.execute(db.text("SELECT count(*) FROM task WHERE tags IS NOT NULL")).scalar()
+        assert left == 0
+        q, _ = filtered_tasks(tag="home")
+        assert [x.id for x in q.all()] == [1]
+        # description column was added by the same startup path
+        t.description = "migrated"
+        db.session.commit()
+        db.session.remove()
+
+
+def test_set_tags_and_offsets_dedupe_and_cascade():
+    app = create_app()
+    with app.app_context():
+        from ai_notes.models import Task, TaskTag
+
+        t = Task(title="Tagged")
+        t.set_tags(["b", "a", "b", " "])
+        t.set_notify_offsets([60, 5, 60])
+        db.session.add(t)
+        db.session.commit()
+        assert t.tag_list() == ["a", "b"]
+        assert t.notify_list() == [5, 60]
+
+        t.set_tags("a,c")
+        db.session.commit()
+        assert t.tag_list() == ["a", "c"]
+        q, _ = filtered_tasks(tag="c")
+        assert t.id in [x.id for x in q.all()]
+
+        task_id = t.id
+        db.session.delete(t)
+        db.session.commit()
+        assert TaskTag.query.filter_by(task_id=task_id).count() == 0
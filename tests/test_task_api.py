@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+from ai_notes.db import db
+from app import create_app
+
+
+def test_task_api_pages_projection_and_etag():
+    app = create_app()
+    with app.app_context():
+        from ai_notes.models import Task
+
+        base = datetime(2031, 5, 1, 9, 0)
+        made = []
+        for i in range(5):
+            t = Task(title=f"Apilist {i}", status="pending" if i % 2 else "done", priority="high",
+                     deadline_utc=base + timedelta(days=i))
+            t.set_tags(["apilist", f"n{i}"])
+            t.set_notify_offsets([60, 10])
+            made.append(t)
+        db.session.add_all(made)
+        db.session.commit()
+        try:
+            client = app.test_client()
+            r = client.get("/api/tasks?tag=apilist&limit=2")
+            body = r.get_json()
+            assert [t["title"] for t in body["tasks"]] == ["Apilist 0", "Apilist 1"]
+            first = body["tasks"][0]
+            assert first["tags"] == ["apilist", "n0"]
+            assert first["notify_offsets_minutes"] == [10, 60]
+            assert first["deadline_utc"] == "2031-05-01T09:00:00Z"
+            assert body["stats"]["total"] == Task.query.count()
+
+            # cursor pages follow the index view's keyset order
+            seen = [t["title"] for t in body["tasks"]]
+            cursor = body["next_cursor"]
+            while cursor:
+                page = client.get(f"/api/tasks?tag=apilist&limit=2&cursor={cursor}").get_json()
+                assert "stats" not in page
+                seen += [t["title"] for t in page["tasks"]]
+                cursor = page["next_cursor"]
+            assert seen == [f"Apilist {i}" for i in range(5)]
+
+            r = client.get("/api/tasks?tag=apilist&status=pending&sort=title&fields=title,status")
+            rows = r.get_json()["tasks"]
+            assert rows == [{"id": made[1].id, "title": "Apilist 1", "status": "pending"},
+                            {"id": made[3].id, "title": "Apilist 3", "status": "pending"}]
+            assert client.get("/api/tasks?fields=title,nope").status_code == 400
+
+            # unchanged list -> 304; any edit changes the validator
+            etag = r.headers["ETag"]
+            assert etag.startswith('W/"')
+            url = "/api/tasks?tag=apilist&status=pending&sort=title&fields=title,status"
+            assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+            made[3].set_tags(["apilist", "renamed"])
+            db.session.commit()
+            again = client.get(url, headers={"If-None-Match": etag})
+            assert again.status_code == 200 and again.headers["ETag"] != etag
+        finally:
+            for t in made:
+                db.session.delete(t)
+            db.session.commit()
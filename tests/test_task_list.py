@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+from ai_notes.db import db
+from ai_notes.queries import decode_cursor, encode_cursor, filtered_tasks, paginate, task_stats
+from app import create_app
+
+
+def test_cursor_roundtrip():
+    dt = datetime(2025, 9, 19, 6, 30)
+    assert decode_cursor(encode_cursor([dt, 7])) == [dt, 7]
+    assert decode_cursor(encode_cursor([2, None, 3])) == [2, None, 3]
+    assert decode_cursor("garbage!") is None
+
+
+def test_keyset_pages_cover_everything_once(monkeypatch):
+    app = create_app()
+    with app.app_context():
+        from ai_notes.models import Task
+
+        base = datetime(2030, 1, 1)
+        made = [Task(title=f"Pager {i:02d}", status="pending", priority=["low", "medium", "high", "urgent"][i % 4],
+                     deadline_utc=(base + timedelta(hours=i % 4)) if i % 3 else None)
+                for i in range(11)]
+        db.session.add_all(made)
+        db.session.commit()
+        ids = {t.id for t in made}
+        try:
+            for sort in ("deadline", "created_desc", "title", "priority"):
+                q, rank = filtered_tasks(q_text="Pager")
+                seen, cursor = [], None
+                while True:
+                    items, cursor = paginate(q, sort, rank=rank, cursor=cursor, limit=4)
+                    seen += [t.id for t in items if t.id in ids]
+                    if not cursor:
+                        break
+                assert sorted(seen) == sorted(ids), sort
+                assert len(seen) == len(set(seen)), sort
+            # deadline order keeps undated tasks last
+            q, rank = filtered_tasks(q_text="Pager")
+            items, _ = paginate(q, "deadline", rank=rank, limit=50)
+            dated = [t.deadline_utc is not None for t in items if t.id in ids]
+            assert dated == sorted(dated, reverse=True)
+
+            # priority: urgent first, then soonest deadline, computed in SQL
+            items, _ = paginate(q, "priority", rank=rank, limit=50)
+            ranks = [t.priority_rank for t in items if t.id in ids]
+            assert ranks == sorted(ranks, reverse=True) and ranks[0] == 3
+
+            stats = task_stats()
+            assert stats["total"] == Task.query.count()
+            assert stats["pending"] == Task.query.filter_by(status="pending").count()
+
+            monkeypatch.setattr("ai_notes.queries.PAGE_SIZE", 8)
+            client = app.test_client()
+            first = client.get("/?q=Pager&sort=title").get_data(as_text=True)
+            assert "Pager 07" in first and "Pager 08" not in first
+            assert 'hx-trigger="revealed"' in first
+            next_url = first.split('id="tasks-more"')[1].split('hx-get="')[1].split('"')[0]
+            more = client.get(next_url.replace("&amp;", "&"), headers={"HX-Request": "true"}).get_data(as_text=True)
+            assert "Pager 08" in more and "Pager 10" in more and "<html" not in more
+        finally:
+            for t in made:
+                db.session.delete(t)
+            db.session.commit()
@@ -1,3 +1,6 @@
+from datetime import datetime
+import pytest
+from dateutil import tz
 from ai_notes.utils.time import parse_natural_datetime, to_utc_iso
 
 
@@ -6,3 +9,46 @@ def test_parse_to_utc_iso():
     iso = to_utc_iso(dt)
     assert iso.endswith("Z")
 
+
+# Friday 2026-03-06 22:30 UTC: already Saturday in Kuwait and Dubai, and the
+# US switches to daylight time on Sunday 03-08.
+NOW = datetime(2026, 3, 6, 22, 30, 17, tzinfo=tz.UTC)
+ZONES = ["Asia/Kuwait", "UTC", "Asia/Dubai", "Europe/London", "America/New_York"]
+GOLDEN = {
+    "tomorrow 10am": ["2026-03-08T07:00:00Z", "2026-03-07T10:00:00Z", "2026-03-08T06:00:00Z",
+                      "2026-03-07T10:00:00Z", "2026-03-07T15:00:00Z"],
+    "sunday 9am": ["2026-03-08T06:00:00Z", "2026-03-08T09:00:00Z", "2026-03-08T05:00:00Z",
+                   "2026-03-08T09:00:00Z", "2026-03-08T13:00:00Z"],
+    "finish it before Friday": ["2026-03-13T20:59:00Z", "2026-03-06T23:59:00Z", "2026-03-13T19:59:00Z",
+                                "2026-03-06T23:59:00Z", "2026-03-07T04:59:00Z"],
+    "next saturday 18:30": ["2026-03-14T15:30:00Z", "2026-03-07T18:30:00Z", "2026-03-14T14:30:00Z",
+                            "2026-03-07T18:30:00Z", "2026-03-07T23:30:00Z"],
+    "in 2 hours": ["2026-03-07T00:30:00Z"] * 5,
+    "call mom tonight": ["2026-03-07T17:00:00Z", "2026-03-06T20:00:00Z", "2026-03-07T16:00:00Z",
+                         "2026-03-06T20:00:00Z", "2026-03-07T01:00:00Z"],
+    "9:30 pm": ["2026-03-07T18:30:00Z", "2026-03-06T21:30:00Z", "2026-03-07T17:30:00Z",
+                "2026-03-06T21:30:00Z", "2026-03-07T02:30:00Z"],
+    "friday": ["2026-03-12T22:30:00Z", "2026-03-06T22:30:00Z", "2026-03-12T22:30:00Z",
+               "2026-03-06T22:30:00Z", "2026-03-06T22:30:00Z"],
+    "in 3 days at noon": ["2026-03-10T09:00:00Z", "2026-03-09T12:00:00Z", "2026-03-10T08:00:00Z",
+                          "2026-03-09T12:00:00Z", "2026-03-09T16:00:00Z"],
+    # month names go to dateutil; an hour without minutes is on the hour
+    "March 20 5pm": ["2026-03-20T14:00:00Z", "2026-03-20T17:00:00Z", "2026-03-20T13:00:00Z",
+                     "2026-03-20T17:00:00Z", "2026-03-20T21:00:00Z"],
+    "March 20 5:45pm": ["2026-03-20T14:45:00Z", "2026-03-20T17:45:00Z", "2026-03-20T13:45:00Z",
+                        "2026-03-20T17:45:00Z", "2026-03-20T21:45:00Z"],
+}
+
+
+@pytest.mark.parametrize("text", sorted(GOLDEN))
+def test_golden_relative_dates(text):
+    got = [to_utc_iso(parse_natural_datetime(text, default_tz=z, now=NOW)) for z in ZONES]
+    assert got == GOLDEN[text]
+
+
+def test_no_date_phrase_still_falls_back_to_dateutil():
+    with pytest.raises(ValueError):
+        parse_natural_datetime("buy milk", default_tz="UTC", now=NOW)
+    dt = parse_natural_datetime("Move the Rise email to Friday 9:30, set high, 20m, alert 1h",
+                                default_tz="Asia/Kuwait", now=NOW)
+    assert to_utc_iso(dt) == "2026-03-13T06:30:00Z"
@@ -0,0 +1,42 @@
+from ai_notes.db import db
+from ai_notes.search import title_candidates, title_score
+from ai_notes.services.ai_router import AIRouter
+from app import create_app
+
+
+def test_title_score_prefers_substring_then_fuzzy():
+    assert title_score("rise email", "Send Rise email") > title_score("rise email", "Rise advisory emails")
+    assert title_score("rise emial", "Rise email") > title_score("rise emial", "Buy groceries")
+
+
+def test_title_index_tracks_writes_and_ranks():
+    app = create_app()
+    with app.app_context():
+        from ai_notes.models import Task
+
+        a = Task(title="Quarterly zebra report")
+        b = Task(title="Zebra report draft")
+        db.session.add_all([a, b])
+        db.session.commit()
+        try:
+            ids = [m.id for m in title_candidates("zebra report", k=5)]
+            assert a.id in ids and b.id in ids
+
+            # typo still finds it via trigram overlap + edit distance
+            top = title_candidates("quartrly zebra", k=1)[0]
+            assert top.id == a.id
+
+            # two strong matches -> stays a title target (needs clarification)
+            tgt = AIRouter().resolve_target("update 'zebra report'", "demo")
+            assert tgt.by == "title"
+
+            b.title = "Giraffe notes"
+            db.session.commit()
+            assert b.id not in [m.id for m in title_candidates("zebra report", k=5)]
+            tgt = AIRouter().resolve_target("update 'zebra report'", "demo")
+            assert tgt.by == "id" and tgt.value == a.id
+        finally:
+            db.session.delete(a)
+            db.session.delete(b)
+            db.session.commit()
+        assert all(m.id not in (a.id, b.id) for m in title_candidates("zebra", k=5))
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import time
+from ai_notes.sockets.asgi import create_asgi_app
+from ai_notes.sockets.pipeline import handle_message
+from app import create_app
+
+
+def _stub_hf(monkeypatch, delay=0.0):
+    def zs(text, labels):
+        time.sleep(delay)
+        return ("create", {})
+
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_zero_shot", zs)
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_ner", lambda t: [])
+    monkeypatch.setattr("ai_notes.services.ai_router.hf_text2json", lambda p: {})
+
+
+def test_pipeline_tags_phases_with_request_id(monkeypatch):
+    _stub_hf(monkeypatch)
+    app = create_app()
+    with app.app_context():
+        msgs = list(handle_message(json.dumps({
+            "utterance": "create 'asgi pipeline' tomorrow 9am", "request_id": "r1",
+            "context": {"now_tz": "UTC"},
+        }), "10.0.0.1"))
+        assert [m["phase"] for m in msgs][:2] == ["thinking", "parsed"]
+        assert {m["request_id"] for m in msgs} == {"r1"}
+        assert msgs[-1]["phase"] == "patch" and "asgi pipeline" in msgs[-1]["html"]
+        assert list(handle_message("{nope", None)) == [{"phase": "error", "message": "invalid_json"}]
+
+
+def test_asgi_socket_keeps_several_utterances_in_flight(monkeypatch):
+    _stub_hf(monkeypatch, delay=0.3)
+    app = create_app()
+    asgi = create_asgi_app(app, workers=4)
+
+    async def scenario():
+        inbox: asyncio.Queue = asyncio.Queue()
+        sent = []
+        done = asyncio.Event()
+
+        async def receive():
+            return await inbox.get()
+
+        async def send(event):
+            sent.append(event)
+            applied = [e for e in sent if e["type"] == "websocket.send" and '"patch"' in e["text"]]
+            if len(applied) == 3:
+                done.set()
+
+        await inbox.put({"type": "websocket.connect"})
+        for i in range(3):
+            await inbox.put({"type": "websocket.receive", "text": json.dumps({
+                "utterance": f"create 'asgi flight {i}'", "request_id": f"q{i}",
+                "context": {"now_tz": "UTC"},
+            })})
+        started = time.perf_counter()
+        runner = asyncio.create_task(asgi({"type": "websocket", "path": "/ws/ai", "client": ("10.0.0.2", 1)}, receive, send))
+        await asyncio.wait_for(done.wait(), timeout=10)
+        elapsed = time.perf_counter() - started
+        await inbox.put({"type": "websocket.disconnect"})
+        await runner
+        return sent, elapsed
+
+    sent, elapsed = asyncio.run(scenario())
+    assert sent[0] == {"type": "websocket.accept"}
+    phases = [json.loads(e["text"]) for e in sent[1:]]
+    assert {p["request_id"] for p in phases if p["phase"] == "patch"} == {"q0", "q1", "q2"}
+    # three 0.3s parses overlapped instead of queueing behind each other
+    assert elapsed < 0.8
+    asgi.pool.shutdown(wait=True)